@@ -1,14 +1,13 @@
 import os
 import json
 from typing import Dict, List
-from openai import OpenAI
 from pathlib import Path
 from dotenv import load_dotenv
-from google.cloud import bigquery
-from app.core.env import require_env
+from dataIngestion.BigQuerySearch import search_job_details
+from app.core.container import container
+from app.services.llm_cache import cached_chat_completion
+from app.services.skill_matcher import get_skill_taxonomy
 
-OPENAI_KEY = require_env("OPENAI_API_KEY")
-self.client = OpenAI(api_key=OPENAI_KEY)
 
 
 
@@ -21,8 +20,7 @@ class JobScoutAgent:
     """
 
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.bq = bigquery.Client()
+        self.client = container.openai_client()
         print("JobScoutAgent initialized with BigQuery + AI search")
 
     # ---------------------------------------------------------------------
@@ -30,28 +28,12 @@ class JobScoutAgent:
     # ---------------------------------------------------------------------
     def search_bigquery(self, query: str) -> List[Dict]:
         """
-        Run SQL over your BigQuery dataset.
-        You can tune column names to match your schema.
-        """
-
-        sql = f"""
-        SELECT 
-            job_id,
-            title,
-            company,
-            location,
-            description,
-            url,
-            detected_role,
-            detected_level
-        FROM `agentic-jobsearch.jobs.jobs_table`
-        WHERE LOWER(title) LIKE '%{query.lower()}%'
-           OR LOWER(description) LIKE '%{query.lower()}%'
-        LIMIT 20;
+        Keyword search through the configured search backend
+        (BigQuery or the local job mirror, see JOB_SEARCH_BACKEND).
         """
 
         try:
-            rows = list(self.bq.query(sql).result())
+            rows = search_job_details([query], limit=20)
         except Exception as e:
             print("BigQuery error:", e)
             return []
@@ -59,12 +41,12 @@ class JobScoutAgent:
         jobs = []
         for row in rows:
             jobs.append({
-                "title": row.title,
-                "company": row.company,
-                "location": row.location,
-                "seniority": row.detected_level or "",
-                "description": row.description,
-                "url": row.url,
+                "title": row["job_title"],
+                "company": row["company"],
+                "location": row["location"],
+                "seniority": "",
+                "description": row["description"] or "",
+                "url": row["job_url"],
                 "why_match": "Matched via BigQuery search",
                 "score": 60  # base score, will re-rank later
             })
@@ -94,7 +76,7 @@ class JobScoutAgent:
         }}
         """
 
-        resp = self.client.chat.completions.create(
+        resp = cached_chat_completion(self.client,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
@@ -113,12 +95,11 @@ class JobScoutAgent:
     def merge_and_rank(self, bq_jobs: List[Dict], ai_jobs: List[Dict], profile: Dict):
         all_jobs = bq_jobs + ai_jobs
 
-        # Example: simple score boost based on profile skills
-        skills = set(x.lower() for x in (profile.get("technical_skills") or []))
+        # Skill boost: whole-word matches of the profile skills (and their aliases)
+        matcher = get_skill_taxonomy().compile(profile.get("technical_skills") or [])
 
         for job in all_jobs:
-            desc = job["description"].lower()
-            match_count = sum(1 for s in skills if s in desc)
+            match_count = len(matcher.find((job.get("description") or "").lower()))
             job["score"] += min(match_count * 5, 20)  # skill-based boost
 
         # Highest score first
@@ -1,128 +1,46 @@
+import asyncio
 import os
 import json
-import re
-from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from dotenv import load_dotenv
-from openai import OpenAI
 
-from dataIngestion.BigQuerySearch import search_jobs, get_company_info
+from app.core.concurrency import get_blocking_executor, merge_streams, run_blocking
+from app.core.container import container
+from app.core.text import tokenize
+from app.services.document_generator import generate_documents
+from app.services.job_scoring import JobScorer, score_jobs
+from app.services.llm_cache import acached_chat_completion, astream_chat_completion, cached_chat_completion
+from app.services.semantic_match import match_jobs_semantic
+from app.services.workflow_engine import (
+    FINISHED_STATES,
+    WorkflowPlan,
+    WorkflowTask,
+    get_workflow_engine,
+    serialize_plan,
+    snapshot_lock,
+)
+from app.state.workflow_store import get_workflow_store
+from dataIngestion.BigQuerySearch import search_jobs, get_companies_info, get_jobs_by_ids
 
 load_dotenv()
 
-STOPWORDS = {
-    "find",
-    "me",
-    "job",
-    "jobs",
-    "a",
-    "an",
-    "the",
-    "and",
-    "in",
-    "for",
-    "to",
-    "with",
-    "role",
-    "position",
-    "some",
-    "of",
-    "my",
-    "about",
-    "can",
-    "you",
-    "tell",
-    "what",
-    "are",
-    "is",
-    "on",
-    "help",
-}
-
-
-@dataclass
-class WorkflowTask:
-    task_id: str
-    description: str
-    task_type: str
-    status: str = "pending"
-    output: Optional[Dict[str, Any]] = None
-
-
-@dataclass
-class WorkflowPlan:
-    plan_id: str
-    user_goal: str
-    tasks: List[WorkflowTask]
-    estimated_completion: datetime
-    plan_details: Dict[str, Any] = field(default_factory=dict)
-    status: str = "pending"
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    completed_at: Optional[datetime] = None
+# Jobs returned per search (keyword and semantic matches combined)
+JOB_RESULTS = 25
+
 
 class PlannerAgent:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, client=None, async_client=None):
+        self.client = client or container.openai_client()
+        self.async_client = async_client or container.async_openai_client()
         print("PlannerAgent initialized")
-        self.active_workflows: Dict[str, WorkflowPlan] = {}
-
-    def _normalize_terms(self, values: Optional[List[str]]) -> List[str]:
-        terms: List[str] = []
-        for value in values or []:
-            if not isinstance(value, str):
-                continue
-            token = value.strip().lower()
-            if token:
-                terms.append(token)
-        return terms
+        # Shared by every PlannerAgent and every worker process
+        self.workflows = get_workflow_store()
 
     def _score_job(self, profile: Optional[Dict[str, Any]], job: Dict[str, Any]) -> Dict[str, Any]:
-        if not profile:
-            return {"score": 0.0, "matched_skills": []}
-
-        profile_skills = set(self._normalize_terms(profile.get("skills")))
-        if isinstance(profile.get("custom_skills"), list):
-            profile_skills.update(self._normalize_terms(profile["custom_skills"]))
-
-        job_skill_terms: List[str] = []
-        job_skills = job.get("skills")
-        if isinstance(job_skills, list):
-            job_skill_terms = self._normalize_terms(job_skills)
-        elif isinstance(job_skills, str):
-            job_skill_terms = self._normalize_terms(re.split(r"[;,/\n]", job_skills))
-
-        matched_skills = []
-        job_desc = (job.get("description") or "").lower()
-        for skill in profile_skills:
-            if skill in job_skill_terms or (skill and skill in job_desc):
-                matched_skills.append(skill)
-
-        skill_score = 0.0
-        if profile_skills:
-            skill_score = (len(matched_skills) / len(profile_skills)) * 70.0
-
-        # Location bonus
-        location_score = 0.0
-        profile_location = (profile.get("location") or "").lower()
-        job_location = (job.get("location") or "").lower()
-        if profile_location and job_location and profile_location.split(",")[0] in job_location:
-            location_score = 10.0
-
-        # Title alignment bonus
-        title_score = 0.0
-        profile_title = (profile.get("title") or "").lower()
-        job_title = (job.get("job_title") or job.get("title") or "").lower()
-        if profile_title and job_title and any(token in job_title for token in profile_title.split()):
-            title_score = 20.0
-
-        final_score = min(100.0, round(skill_score + location_score + title_score, 1))
-        return {
-            "score": final_score,
-            "matched_skills": matched_skills,
-        }
+        return JobScorer(profile).score(job)
 
     def _build_profile_insights(self, profile: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(profile, dict):
@@ -175,12 +93,7 @@ class PlannerAgent:
     def _build_search_terms(self, message: str, profile: Optional[Dict[str, Any]]) -> List[str]:
         terms: List[str] = []
 
-        tokens = re.findall(r"[a-zA-Z0-9]+", (message or ""))
-        for token in tokens:
-            lower = token.lower()
-            if lower in STOPWORDS or len(lower) < 3:
-                continue
-            terms.append(lower)
+        terms.extend(tokenize(message))
 
         if isinstance(profile, dict):
             title = profile.get("title")
@@ -204,10 +117,28 @@ class PlannerAgent:
 
         return ordered or [message]
 
-    def plan(self, message: str, profile=None, language: str = "en"):
-
-        profile = profile or {}
-
+    def _semantic_jobs(self, profile: Optional[Dict[str, Any]], limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Jobs nearest to the profile's resume embedding across the whole corpus.
+        Empty when there is no profile, no job embeddings yet, or embedding fails.
+        """
+        if not profile:
+            return []
+        try:
+            hits = match_jobs_semantic(profile, k=limit)
+        except Exception as e:
+            print(f"Semantic job matching failed: {e}")
+            return []
+        if not hits:
+            return []
+
+        similarities = dict(hits)
+        jobs = get_jobs_by_ids([job_id for job_id, _ in hits])
+        for job in jobs:
+            job["semantic_score"] = round(similarities[job["job_id"]] * 100.0, 1)
+        return jobs
+
+    def _plan_request(self, message: str, profile: Dict[str, Any]) -> Dict[str, Any]:
         prompt = f"""
         You are a job-search copilot.
 
@@ -233,8 +164,7 @@ class PlannerAgent:
         }}
         """
 
-        # Generate plan using GPT
-        response = self.client.chat.completions.create(
+        return dict(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a structured planning assistant."},
@@ -243,13 +173,160 @@ class PlannerAgent:
             temperature=0.3,
         )
 
-        content = response.choices[0].message.content.strip()
+    def plan(self, message: str, profile=None, language: str = "en"):
+
+        profile = profile or {}
+
+        # The search depends only on the message and profile, so it runs while GPT writes the plan
+        search = None
+        if self._wants_jobs(message):
+            search = get_blocking_executor().submit(self._find_jobs, message, profile)
+
+        # Generate plan using GPT
+        response = cached_chat_completion(self.client, **self._plan_request(message, profile))
+        parsed = self._parse_plan(response.choices[0].message.content)
+        return self._complete_plan(parsed, message, profile, jobs=search.result() if search else None)
+
+    async def aplan(self, message: str, profile=None, language: str = "en"):
+        """plan() on the AsyncOpenAI client; the job search runs on the blocking-I/O pool alongside it."""
+        profile = profile or {}
+
+        async def _completion() -> Dict[str, Any]:
+            response = await acached_chat_completion(self.async_client, **self._plan_request(message, profile))
+            return self._parse_plan(response.choices[0].message.content)
+
+        if self._wants_jobs(message):
+            parsed, jobs = await asyncio.gather(_completion(), run_blocking(self._find_jobs, message, profile))
+        else:
+            parsed, jobs = await _completion(), None
+        return self._complete_plan(parsed, message, profile, jobs=jobs)
+
+    async def astream_plan(self, message: str, profile=None, language: str = "en") -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming plan(): yields ("token", text) as the model writes, ("jobs", [...])
+        as soon as the job search finishes (it runs alongside the LLM call), and
+        finally ("plan", result) with the same shape plan() returns.
+        """
+        profile = profile or {}
+        state: Dict[str, Any] = {"content": "", "jobs": None}
+
+        async def _tokens():
+            parts: List[str] = []
+            try:
+                async for delta in astream_chat_completion(self.async_client, **self._plan_request(message, profile)):
+                    parts.append(delta)
+                    yield "token", delta
+            except Exception as e:
+                print(f"Plan streaming failed: {e}")
+                yield "error", {"detail": f"Plan generation failed: {e}"}
+            state["content"] = "".join(parts)
+
+        async def _jobs():
+            try:
+                state["jobs"] = await run_blocking(self._find_jobs, message, profile)
+            except Exception as e:
+                print(f"Job search failed: {e}")
+                state["jobs"] = []
+            yield "jobs", state["jobs"]
+
+        streams = [_tokens()]
+        if self._wants_jobs(message):
+            streams.append(_jobs())
+        async for event in merge_streams(*streams):
+            yield event
+
+        parsed = self._parse_plan(state["content"])
+        yield "plan", self._complete_plan(parsed, message, profile, jobs=state["jobs"] or [])
+
+    def _parse_plan(self, content: Optional[str]) -> Dict[str, Any]:
+        content = (content or "").strip()
 
         try:
-            parsed = json.loads(content)
+            return json.loads(content)
         except:
-            parsed = {"text": content}
+            return {"text": content}
+
+    def _wants_jobs(self, message: str) -> bool:
+        message_lower = message.lower()
+        return any(
+            keyword in message_lower
+            for keyword in ["job", "apply", "role", "opening", "position",
+                            "engineer", "developer", "intern", "find me", "opportunity"]
+        )
+
+    def _find_jobs(self, message: str, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Keyword hits for the message interleaved with semantic profile matches,
+        enriched and scored (blocking I/O). Semantic matches fill at most half
+        of the list unless keyword search runs out, so the message still steers
+        the results.
+        """
+        search_terms = self._build_search_terms(message, profile)
+        keyword = search_jobs(search_terms, limit=JOB_RESULTS)
+        semantic = self._semantic_jobs(profile, limit=JOB_RESULTS)
+        jobs = self._interleave(keyword, semantic, JOB_RESULTS)
+        companies = get_companies_info(job.get("company_urn") for job in jobs)
+        scores = score_jobs(profile, jobs)
+
+        for job, score_details in zip(jobs, scores):
+            comp = companies.get(job.get("company_urn"))
+            if comp:
+                job["company"] = comp["company"]
+                job["company_url"] = comp["company_url"]
+            job["match_score"] = score_details.get("score", 0.0)
+            job["matched_skills"] = score_details.get("matched_skills", [])
+
+        return jobs
+
+    def _interleave(
+        self, keyword: List[Dict[str, Any]], semantic: List[Dict[str, Any]], limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Alternate keyword and semantic jobs (keyword first, no duplicates) with
+        semantic ones capped at half of limit; leftover room after keyword hits
+        run out is filled with further semantic matches.
+        """
+        jobs: List[Dict[str, Any]] = []
+        seen_ids = set()
+
+        def take(job: Dict[str, Any]) -> bool:
+            if len(jobs) >= limit or job["job_id"] in seen_ids:
+                return False
+            seen_ids.add(job["job_id"])
+            jobs.append(job)
+            return True
+
+        semantic_head = semantic[:limit // 2]
+        for index in range(max(len(keyword), len(semantic_head))):
+            if index < len(keyword):
+                take(keyword[index])
+            if index < len(semantic_head):
+                take(semantic_head[index])
+        for job in semantic[limit // 2:]:
+            take(job)
+        return jobs
+
+    def _complete_plan(
+        self,
+        parsed: Dict[str, Any],
+        message: str,
+        profile: Dict[str, Any],
+        jobs: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Adds profile insights and, for job-seeking messages, ranked jobs (searched unless given)."""
+        self._add_insights(parsed, message, profile)
+
+        # Determine whether to search BigQuery
+        should_search = self._wants_jobs(message)
+
+        parsed["searched_bigquery"] = should_search
+
+        if should_search:
+            parsed["bigquery_jobs"] = jobs if jobs is not None else self._find_jobs(message, profile)
+
+        return {"ok": True, "plan": parsed}
 
+    def _add_insights(self, parsed: Dict[str, Any], message: str, profile: Dict[str, Any]) -> None:
         message_lower = message.lower()
 
         profile_insights = self._build_profile_insights(profile)
@@ -270,44 +347,15 @@ class PlannerAgent:
                 "recent_role": profile_insights.get("recent_role"),
             }
 
-        # Determine whether to search BigQuery
-        should_search = any(
-            keyword in message_lower
-            for keyword in ["job", "apply", "role", "opening", "position",
-                            "engineer", "developer", "intern", "find me", "opportunity"]
-        )
-
-        parsed["searched_bigquery"] = should_search
-
-        if should_search:
-            search_terms = self._build_search_terms(message, profile)
-            jobs = search_jobs(search_terms, limit=25)
-
-            for job in jobs:
-                comp = get_company_info(job["company_urn"])
-                if comp:
-                    job["company"] = comp["company"]
-                    job["company_url"] = comp["company_url"]
-                score_details = self._score_job(profile, job)
-                job["match_score"] = score_details.get("score", 0.0)
-                job["matched_skills"] = score_details.get("matched_skills", [])
-
-            parsed["bigquery_jobs"] = jobs
-
-        return {"ok": True, "plan": parsed}
-
     # ------------------------------------------------------------------
     # Workflow helpers for FastAPI routes
     # ------------------------------------------------------------------
     def create_workflow_plan(self, user_message: str, user_data: Optional[Dict[str, Any]] = None) -> WorkflowPlan:
+        """Registers the workflow and starts it in the background; returns immediately."""
         user_data = user_data or {}
-        language = user_data.get("language", "en")
-        profile = user_data.get("profile")
-
-        plan_response = self.plan(user_message, profile=profile, language=language)
-        plan_details = plan_response.get("plan", {})
 
         plan_id = str(uuid4())
+        # Goal analysis (LLM) and job search (BigQuery) are independent and run concurrently
         tasks = [
             WorkflowTask(
                 task_id="goal_understanding",
@@ -320,52 +368,116 @@ class PlannerAgent:
                 task_type="job_search",
             ),
         ]
+        documents_top_n = int(user_data.get("documents_top_n") or 0)
+        if documents_top_n > 0:
+            tasks.append(
+                WorkflowTask(
+                    task_id="documents",
+                    description=f"Draft a resume and cover letter for each of the top {documents_top_n} matches.",
+                    task_type="document_fanout",
+                    depends_on=["job_search"],
+                    params={"top_n": documents_top_n},
+                )
+            )
 
         workflow_plan = WorkflowPlan(
             plan_id=plan_id,
-            user_goal=plan_details.get("goal") or user_message,
+            user_goal=user_message,
             tasks=tasks,
             estimated_completion=datetime.utcnow() + timedelta(seconds=30),
-            plan_details=plan_details,
+            inputs={
+                "message": user_message,
+                "profile": user_data.get("profile") or {},
+                "language": user_data.get("language", "en"),
+            },
         )
 
-        self.active_workflows[plan_id] = workflow_plan
+        self.workflows.save(workflow_plan)
+        get_workflow_engine().submit(workflow_plan, self._task_handlers(), on_change=self.workflows.save)
         return workflow_plan
 
-    def execute_workflow(self, plan: WorkflowPlan) -> Dict[str, Any]:
-        if plan.status == "completed":
-            return self._serialize_plan(plan)
-
-        for task in plan.tasks:
-            if task.task_type == "analysis":
-                task.status = "completed"
-                task.output = {
-                    "goal": plan.plan_details.get("goal", plan.user_goal),
-                    "actions": plan.plan_details.get("actions", []),
-                    "notes": plan.plan_details.get("notes"),
-                    "profile_insights": plan.plan_details.get("profile_insights"),
-                    "insight_summary": plan.plan_details.get("insight_summary"),
-                }
-            elif task.task_type == "job_search":
-                task.status = "completed"
-                task.output = {
-                    "top_matches": plan.plan_details.get("bigquery_jobs", []),
-                    "searched": plan.plan_details.get("searched_bigquery", False),
-                }
-
-        plan.status = "completed"
-        plan.completed_at = datetime.utcnow()
+    def get_workflow(self, workflow_id: str) -> Optional[WorkflowPlan]:
+        return self.workflows.get(workflow_id)
+
+    def _task_handlers(self):
+        return {
+            "analysis": self._run_analysis_task,
+            "job_search": self._run_job_search_task,
+            "document_fanout": self._run_document_fanout_task,
+            "document_generation": self._run_document_task,
+        }
+
+    def _run_analysis_task(self, plan: WorkflowPlan, task: WorkflowTask, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        message, profile = plan.inputs["message"], plan.inputs["profile"]
+        response = cached_chat_completion(self.client, **self._plan_request(message, profile))
+        parsed = self._parse_plan(response.choices[0].message.content)
+        self._add_insights(parsed, message, profile)
+
+        # Other tasks of this plan run concurrently and the store snapshots it; change it under the engine lock
+        with snapshot_lock():
+            plan.plan_details = parsed
+            plan.user_goal = parsed.get("goal") or plan.user_goal
+            goal = plan.user_goal
+        return {
+            "goal": goal,
+            "actions": parsed.get("actions", []),
+            "notes": parsed.get("notes"),
+            "profile_insights": parsed.get("profile_insights"),
+            "insight_summary": parsed.get("insight_summary"),
+        }
+
+    def _run_job_search_task(self, plan: WorkflowPlan, task: WorkflowTask, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        message, profile = plan.inputs["message"], plan.inputs["profile"]
+        searched = self._wants_jobs(message)
+        jobs = self._find_jobs(message, profile) if searched else []
+        return {
+            "top_matches": jobs,
+            "searched": searched,
+        }
+
+    def _run_document_fanout_task(self, plan: WorkflowPlan, task: WorkflowTask, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        """Adds one document_generation task per top match; they all run in parallel."""
+        matches = (upstream.get("job_search") or {}).get("top_matches") or []
+        top = sorted(matches, key=lambda job: job.get("match_score") or 0.0, reverse=True)[: task.params["top_n"]]
+        if top and not plan.inputs["profile"]:
+            raise ValueError("Upload a resume before generating documents.")
+
+        children = [
+            WorkflowTask(
+                task_id=f"documents_{job['job_id']}",
+                description=f"Draft a resume and cover letter for {job.get('job_title') or job['job_id']}.",
+                task_type="document_generation",
+                params={"job": job},
+            )
+            for job in top
+        ]
+        get_workflow_engine().add_tasks(plan, children)
+        return {"task_ids": [child.task_id for child in children]}
+
+    def _run_document_task(self, plan: WorkflowPlan, task: WorkflowTask, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        job = task.params["job"]
+        documents = generate_documents(plan.inputs["profile"], job)
+        return {"job_id": job.get("job_id"), **documents}
+
+    def runs_elsewhere(self, plan: WorkflowPlan) -> bool:
+        """
+        True when the plan is unfinished but not running in this process: it was
+        loaded from the store, so another worker runs it (or a restart orphaned it).
+        """
+        with snapshot_lock():
+            finished = plan.status in FINISHED_STATES
+        return not finished and not get_workflow_engine().is_running(plan.plan_id)
+
+    def execute_workflow(self, plan: WorkflowPlan, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Waits for a workflow running in this process to finish and returns its final state."""
+        get_workflow_engine().wait(plan.plan_id, timeout=timeout)
         return self._serialize_plan(plan)
 
     def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
-        plan = self.active_workflows.get(workflow_id)
+        plan = self.workflows.get(workflow_id)
         if not plan:
             return {"status": "not_found", "workflow_id": workflow_id}
 
-        if plan.status != "completed":
-            # execute lazily so polling eventually completes
-            self.execute_workflow(plan)
-
         return self._serialize_plan(plan)
 
     def combine_results(self, workflow_id: str) -> Dict[str, Any]:
@@ -379,11 +491,4 @@ class PlannerAgent:
         }
 
     def _serialize_plan(self, plan: WorkflowPlan) -> Dict[str, Any]:
-        return {
-            "workflow_id": plan.plan_id,
-            "status": plan.status,
-            "user_goal": plan.user_goal,
-            "estimated_completion": plan.estimated_completion.isoformat(),
-            "tasks": [asdict(task) for task in plan.tasks],
-            "completed_at": plan.completed_at.isoformat() if plan.completed_at else None,
-        }
+        return serialize_plan(plan)
@@ -1,22 +1,23 @@
 import os
 import json
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
-from google.cloud import bigquery
-from google.oauth2 import service_account
-from openai import OpenAI
-from app.core.env import require_env
+from app.services.bigquery_client import get_bq_client
+from app.core.container import container
+from app.services.llm_cache import cached_chat_completion
+from dataIngestion.BigQuerySearch import search_job_details
+
+if TYPE_CHECKING:
+    from google.cloud import bigquery
 
-OPENAI_KEY = require_env("OPENAI_API_KEY")
-self.client = OpenAI(api_key=OPENAI_KEY)
 
 
 # QA Agent for Job Search
 class QAAgent:
     def __init__(self):
         # Initialize OpenAI client
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai_client = container.openai_client()
         
         # Initialize BigQuery client
         self.bigquery_client = self._init_bigquery_client()
@@ -38,14 +39,9 @@ class QAAgent:
         print("QA Agent initialized successfully!")
     
     # Initialize BigQuery client
-    def _init_bigquery_client(self) -> bigquery.Client:
+    def _init_bigquery_client(self) -> "bigquery.Client":
         """Initialize BigQuery client using service account credentials"""
-        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        if credentials_path:
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            return bigquery.Client(credentials=credentials, project='agentic-jobsearch')
-        else:
-            return bigquery.Client(project='agentic-jobsearch')
+        return get_bq_client('agentic-jobsearch')
     
     # Analyze user query to extract search parameters
     def analyze_user_query(self, user_question: str) -> Dict[str, Any]:
@@ -77,7 +73,7 @@ class QAAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
+            response = cached_chat_completion(self.openai_client,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": analysis_prompt}],
                 temperature=0.1
@@ -96,93 +92,20 @@ class QAAgent:
     
     # Query BigQuery database for jobs
     def query_database(self, search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Query BigQuery database based on search parameters"""
-        base_query = """
-        SELECT 
-            jd.job_id,
-            jd.job_title,
-            c.company,
-            c.company_url,
-            jd.location,
-            jd.work_type,
-            jd.salary,
-            jd.skills,
-            jd.description,
-            jd.posted_at,
-            jd.job_url,
-            jd.applicant_count,
-            jd.is_easy_apply,
-            jd.benefits
-        FROM `agentic-jobsearch.job_search.job_details` jd
-        JOIN `agentic-jobsearch.job_search.company` c 
-            ON jd.company_urn = c.company_urn
-        WHERE 1=1
-        """
-        
-        conditions = []
-        
-        # Add keyword search: Use LIKE instead of CONTAINS
-        if search_params.get('keywords'):
-            keywords = search_params['keywords']
-            keyword_conditions = []
-            for keyword in keywords:
-                # Escape single quotes and use proper SQL syntax
-                safe_keyword = keyword.replace("'", "\\'")
-                keyword_conditions.append(
-                    f"(LOWER(jd.job_title) LIKE LOWER('%{safe_keyword}%') OR "
-                    f"LOWER(jd.description) LIKE LOWER('%{safe_keyword}%') OR "
-                    f"LOWER(jd.skills) LIKE LOWER('%{safe_keyword}%'))"
-                )
-       ### If you want to be more specific, you can use AND between keywords instead of OR
+        """Query the configured search backend (BigQuery or local mirror) based on search parameters"""
+        filters = {
+            key: search_params.get(key)
+            for key in ("location", "company", "work_type")
+            if search_params.get(key)
+        }
 
-            if keyword_conditions:
-                conditions.append(f"({' OR '.join(keyword_conditions)})")
-        
-        # Add location filter
-        if search_params.get('location'):
-            safe_location = search_params['location'].replace("'", "\\'")
-            conditions.append(f"LOWER(jd.location) LIKE LOWER('%{safe_location}%')")
-        
-        # Add company filter 
-        if search_params.get('company'):
-            safe_company = search_params['company'].replace("'", "\\'")
-            conditions.append(f"LOWER(c.company) LIKE LOWER('%{safe_company}%')")
-        
-        # Add work type filter
-        if search_params.get('work_type'):
-            safe_work_type = search_params['work_type'].replace("'", "\\'")
-            conditions.append(f"LOWER(jd.work_type) LIKE LOWER('%{safe_work_type}%')")
-        
-        # Add conditions to query
-        if conditions:
-            base_query += " AND " + " AND ".join(conditions)
-        
-        # Order by posted date and limit results
-        base_query += " ORDER BY jd.posted_at DESC LIMIT 10"
-        
-       # print(f"Executing SQL: {base_query}")
-        
         try:
-            results = self.bigquery_client.query(base_query)
+            rows = search_job_details(search_params.get('keywords') or [], filters=filters, limit=10)
             jobs = []
             
-            for row in results:
-                job = {
-                    'job_id': row.job_id,
-                    'job_title': row.job_title,
-                    'company': row.company,
-                    'company_url': row.company_url,
-                    'location': row.location,
-                    'work_type': row.work_type,
-                    'salary': row.salary,
-                    'skills': row.skills,
-                    'description': row.description,
-                    'posted_at': str(row.posted_at) if row.posted_at else None,
-                    'job_url': row.job_url,
-                    'applicant_count': row.applicant_count,
-                    'is_easy_apply': row.is_easy_apply,
-                    'benefits': row.benefits
-                }
+            for row in rows:
+                job = dict(row)
+                job['posted_at'] = str(row['posted_at']) if row.get('posted_at') else None
                 jobs.append(job)
             
             return jobs
@@ -238,7 +161,7 @@ class QAAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
+            response = cached_chat_completion(self.openai_client,
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": self.system_prompt},
@@ -1,74 +1,55 @@
 import os
+import copy
 import json
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import PyPDF2
-from docx import Document
-from openai import OpenAI
 from dotenv import load_dotenv
-from app.core.env import require_env
+from app.core.concurrency import run_blocking
+from app.core.container import container
+from app.services.llm_cache import acached_chat_completion, cached_chat_completion
+from app.services.text_extraction import aextract_text, extract_text as extract_document_text
+from app.state.resume_cache import digest_bytes, get_resume_cache
 
 load_dotenv()
 
-# FIX: load required key at module level
-OPENAI_API_KEY = require_env("OPENAI_API_KEY")
-
+# Bump whenever the prompt or the profile schema changes: cached parses from older versions are ignored
+PARSER_VERSION = "1"
 
 class ResumeParser:
     """Parse uploaded resumes and convert to UserProfile JSON"""
 
-    def __init__(self):
-        # FIX: use the validated key
-        self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self, client=None, async_client=None):
+        self.openai_client = client or container.openai_client()
         self.client = self.openai_client
+        self.async_client = async_client or container.async_openai_client()
+        self.cache = get_resume_cache()
         print("ResumeParser initialized successfully")
 
 
     # -------------------------
     # FILE EXTRACTION
     # -------------------------
-    def _extract_pdf(self, path: str) -> str:
+    def _read(self, path: str) -> Optional[bytes]:
         try:
             with open(path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                return "\n".join(page.extract_text() or "" for page in reader.pages).strip()
-        except (FileNotFoundError, PermissionError, PyPDF2.errors.PdfReadError, Exception) as e:
-            print(f"Error extracting PDF: {e}")
-            return ""
-
-    def _extract_docx(self, path: str) -> str:
-        try:
-            doc = Document(path)
-            return "\n".join(p.text for p in doc.paragraphs).strip()
-        except (FileNotFoundError, PermissionError, Exception) as e:
-            print(f"Error extracting DOCX: {e}")
-            return ""
-
-    def _extract_txt(self, path: str) -> str:
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return f.read().strip()
-        except (FileNotFoundError, PermissionError, UnicodeDecodeError, Exception) as e:
-            print(f"Error extracting TXT: {e}")
-            return ""
+                return f.read()
+        except (FileNotFoundError, PermissionError, OSError) as e:
+            print(f"Error reading {path}: {e}")
+            return None
 
     def extract_text(self, path: str) -> str:
-        ext = os.path.splitext(path)[1].lower()
-        if ext == ".pdf":
-            return self._extract_pdf(path)
-        if ext == ".docx":
-            return self._extract_docx(path)
-        if ext == ".txt":
-            return self._extract_txt(path)
-        return ""
+        data = self._read(path)
+        if not data:
+            return ""
+        return extract_document_text(data, os.path.splitext(path)[1])
 
     # -------------------------
     # AI PARSING
     # -------------------------
-    def parse_with_ai(self, text: str) -> Dict:
+    def _parse_request(self, text: str) -> Dict[str, Any]:
         """
-        Converts resume text → clean user profile JSON.
+        Chat request that converts resume text → clean user profile JSON.
         Schema is intentionally small & useful for downstream agents.
         """
 
@@ -106,33 +87,46 @@ class ResumeParser:
         {text}
         """
 
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You extract structured info from resumes. Respond ONLY in JSON."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2
+        )
+
+    def _parse_response(self, raw: str) -> Dict:
+        raw = (raw or "").strip()
+        cleaned = raw
+
+        if cleaned.startswith("```"):
+            cleaned = cleaned[3:]
+            if cleaned.startswith("json"):
+                newline_idx = cleaned.find("\n")
+                cleaned = cleaned[newline_idx + 1 :] if newline_idx != -1 else ""
+            if cleaned.endswith("```"):
+                cleaned = cleaned[:-3]
+            cleaned = cleaned.strip()
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You extract structured info from resumes. Respond ONLY in JSON."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2
-            )
-
-            raw = response.choices[0].message.content.strip()
-            cleaned = raw.strip()
-
-            if cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-                if cleaned.startswith("json"):
-                    newline_idx = cleaned.find("\n")
-                    cleaned = cleaned[newline_idx + 1 :] if newline_idx != -1 else ""
-                if cleaned.endswith("```"):
-                    cleaned = cleaned[:-3]
-                cleaned = cleaned.strip()
-
-            try:
-                return json.loads(cleaned)
-            except json.JSONDecodeError:
-                return {"raw": raw, "error": "Invalid JSON from model"}
+            return json.loads(cleaned)
+        except json.JSONDecodeError:
+            return {"raw": raw, "error": "Invalid JSON from model"}
 
+    def parse_with_ai(self, text: str) -> Dict:
+        """Converts resume text → clean user profile JSON."""
+        try:
+            response = cached_chat_completion(self.client, **self._parse_request(text))
+            return self._parse_response(response.choices[0].message.content)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def aparse_with_ai(self, text: str) -> Dict:
+        """parse_with_ai on the AsyncOpenAI client."""
+        try:
+            response = await acached_chat_completion(self.async_client, **self._parse_request(text))
+            return self._parse_response(response.choices[0].message.content)
         except Exception as e:
             return {"error": str(e)}
 
@@ -142,17 +136,102 @@ class ResumeParser:
     def process(self, path: str) -> Dict:
         """
         Full pipeline:
+        - Return the cached parse when this exact file was seen before
         - Extract text
         - AI parse
         - Add metadata
         """
 
-        text = self.extract_text(path)
-        if not text:
+        data = self._read(path)
+        if not data:
             return {"error": f"Could not extract text from {path}"}
+        return self.process_bytes(data, path)
+
+    async def aprocess(self, path: str) -> Dict:
+        """process() for async callers: file I/O on the blocking-I/O pool, extraction on the process pool, parsing on AsyncOpenAI."""
+        data = await run_blocking(self._read, path)
+        if not data:
+            return {"error": f"Could not extract text from {path}"}
+        return await self.aprocess_bytes(data, path)
+
+    def process_bytes(self, data: bytes, filename: str) -> Dict:
+        """process() for an upload already in memory (bytes or memoryview); nothing touches the disk."""
+        profile, _ = self._process_bytes(data, filename)
+        return profile
+
+    async def aprocess_bytes(self, data: bytes, filename: str) -> Dict:
+        profile, _ = await self._aprocess_bytes(data, filename)
+        return profile
+
+    def process_file_bytes(self, file_bytes: bytes, filename: str) -> Dict:
+        """
+        Parse an uploaded file from memory and return its text and skills
+        alongside the full profile (used by /upload/documents).
+        """
+        profile, text = self._process_bytes(file_bytes, filename)
+        return self._file_result(profile, text)
+
+    async def aprocess_file_bytes(self, file_bytes: bytes, filename: str) -> Dict:
+        profile, text = await self._aprocess_bytes(file_bytes, filename)
+        return self._file_result(profile, text)
+
+    def _process_bytes(self, data: bytes, filename: str) -> Tuple[Dict, str]:
+        digest, cached = self._lookup(data)
+        if cached is not None:
+            return self._from_cache(cached, filename), cached["text"]
+
+        text = extract_document_text(data, os.path.splitext(filename)[1])
+        if not text:
+            return {"error": f"Could not extract text from {filename}"}, ""
 
         parsed = self.parse_with_ai(text)
+        self._store(digest, parsed, text)
+        return self._with_metadata(parsed, filename, text), text
+
+    async def _aprocess_bytes(self, data: bytes, filename: str) -> Tuple[Dict, str]:
+        digest, cached = await run_blocking(self._lookup, data)
+        if cached is not None:
+            return self._from_cache(cached, filename), cached["text"]
+
+        text = await aextract_text(data, os.path.splitext(filename)[1])
+        if not text:
+            return {"error": f"Could not extract text from {filename}"}, ""
+
+        parsed = await self.aparse_with_ai(text)
+        await run_blocking(self._store, digest, parsed, text)
+        return self._with_metadata(parsed, filename, text), text
 
+    def _file_result(self, profile: Dict, text: str) -> Dict:
+        result = {
+            "text": text,
+            "skills": profile.get("skills", []),
+            "profile": profile,
+        }
+        if "error" in profile:
+            result["error"] = profile["error"]
+        return result
+
+    # -------------------------
+    # PARSE CACHE
+    # -------------------------
+    def _lookup(self, data: bytes):
+        """(content digest, cached entry or None) for the file contents."""
+        digest = digest_bytes(data)
+        return digest, self.cache.get(PARSER_VERSION, digest)
+
+    def _store(self, digest: Optional[str], parsed: Dict, text: str) -> None:
+        # Failed parses are not cached so a transient OpenAI error is retried on the next upload
+        if digest is None or "error" in parsed:
+            return
+        self.cache.set(PARSER_VERSION, digest, {"profile": copy.deepcopy(parsed), "text": text})
+
+    def _from_cache(self, cached: Dict, path: str) -> Dict:
+        parsed = copy.deepcopy(cached["profile"])
+        result = self._with_metadata(parsed, path, cached["text"])
+        result["_metadata"]["cache_hit"] = True
+        return result
+
+    def _with_metadata(self, parsed: Dict, path: str, text: str) -> Dict:
         parsed["_metadata"] = {
             "source_file": os.path.basename(path),
             "processed_at": datetime.now().isoformat(),
@@ -1,17 +1,18 @@
 import os
 import json
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
-from google.cloud import bigquery
-from google.oauth2 import service_account
-from openai import OpenAI
+from app.services.bigquery_client import get_bq_client
 from dataclasses import dataclass
 from datetime import datetime
-from app.core.env import require_env
+from app.core.container import container
+from app.services.llm_cache import cached_chat_completion
+from app.services.skill_matcher import get_skill_taxonomy
+
+if TYPE_CHECKING:
+    from google.cloud import bigquery
 
-OPENAI_KEY = require_env("OPENAI_API_KEY")
-self.client = OpenAI(api_key=OPENAI_KEY)
 
 
 @dataclass
@@ -137,7 +138,7 @@ class UserProfile:
 class WriterAgent:
     def __init__(self, profile_path: str = "user_profile.json"):
         # Initialize OpenAI client
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai_client = container.openai_client()
         
         # Initialize BigQuery client for job data
         self.bigquery_client = self._init_bigquery_client()
@@ -149,14 +150,9 @@ class WriterAgent:
         print("WriterAgent initialized successfully")
         print(f"Loaded profile for: {self.user_profile.name}")
     
-    def _init_bigquery_client(self) -> bigquery.Client:
+    def _init_bigquery_client(self) -> "bigquery.Client":
         """Initialize BigQuery client"""
-        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        if credentials_path:
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            return bigquery.Client(credentials=credentials, project='agentic-jobsearch')
-        else:
-            return bigquery.Client(project='agentic-jobsearch')
+        return get_bq_client('agentic-jobsearch')
     
     def _load_user_profile(self) -> UserProfile:
         """Load user profile from file or create sample"""
@@ -243,6 +239,8 @@ class WriterAgent:
         """
         
         try:
+            from google.cloud import bigquery
+
             job_config = bigquery.QueryJobConfig(
                 query_parameters=[
                     bigquery.ScalarQueryParameter("job_id", "STRING", job_id)
@@ -360,7 +358,7 @@ class WriterAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
+            response = cached_chat_completion(self.openai_client,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": analysis_prompt}],
                 temperature=0.1
@@ -380,17 +378,19 @@ class WriterAgent:
             user_profile.tools
         )
         
-        user_skills_lower = [skill.lower() for skill in all_user_skills]
+        # Compare canonical names so aliases line up ("K8s" vs "Kubernetes")
+        taxonomy = get_skill_taxonomy()
+        user_skills = set(taxonomy.canonicalize_all(all_user_skills))
         
         matching_required = []
         matching_preferred = []
         
         for skill in job_analysis.get('required_skills', []):
-            if skill.lower() in user_skills_lower:
+            if taxonomy.canonicalize(skill) in user_skills:
                 matching_required.append(skill)
         
         for skill in job_analysis.get('preferred_skills', []):
-            if skill.lower() in user_skills_lower:
+            if taxonomy.canonicalize(skill) in user_skills:
                 matching_preferred.append(skill)
         
         total_required = len(job_analysis.get('required_skills', []))
@@ -430,7 +430,7 @@ class WriterAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
+            response = cached_chat_completion(self.openai_client,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": resume_prompt}],
                 temperature=0.3
@@ -464,7 +464,7 @@ class WriterAgent:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
+            response = cached_chat_completion(self.openai_client,
                 model="gpt-3.5-turbo", 
                 messages=[{"role": "user", "content": cover_letter_prompt}],
                 temperature=0.4
@@ -6,8 +6,6 @@ from google.cloud import bigquery
 from google.oauth2 import service_account
 from app.core.env import require_env
 
-OPENAI_KEY = require_env("OPENAI_API_KEY")
-self.client = OpenAI(api_key=OPENAI_KEY)
 
 
 # Test BigQuery connection
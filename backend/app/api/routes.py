@@ -1,53 +1,63 @@
+import os
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, Form, HTTPException
 from app.agents.UploadResume import ResumeParser
+from app.core.concurrency import run_blocking
 from app.agents.PlannerAgent import PlannerAgent
-from app.state.user_profiles import set_profile, get_profile, get_files, set_files
-from app.services.document_generator import generate_documents
+from app.core.container import get_planner, get_resume_parser
+from app.state.user_profiles import set_profile, get_profile, get_files
+from app.api.sse import sse_response
+from app.services.document_generator import agenerate_documents, astream_documents
+from app.services.semantic_match import profile_embedding
 
 api_router = APIRouter()
 
-parser = ResumeParser()
-planner = PlannerAgent()
+# Keep a copy of every upload under storage/uploads (written after the response); 0 for stateless containers
+PERSIST_UPLOADS = os.getenv("PERSIST_UPLOADS", "1") != "0"
 
 @api_router.post("/api/upload-docs")
 async def upload_docs(
+    background_tasks: BackgroundTasks,
     cv: UploadFile = File(None),
     transcript: UploadFile = File(None),
-    userId: str = Form(...)
+    userId: str = Form(...),
+    parser: ResumeParser = Depends(get_resume_parser),
 ):
     if not (cv or transcript):
         raise HTTPException(status_code=400, detail="Upload at least one document.")
 
     saved_files = {}
-    parsed_profile = None
-
-    async def _save_file(upload: UploadFile):
-        user_dir = Path("storage") / "uploads" / userId
-        user_dir.mkdir(parents=True, exist_ok=True)
-        path = user_dir / upload.filename
-        with open(path, "wb") as f:
-            f.write(await upload.read())
-        saved_files[upload.filename] = str(path)
-        return str(path)
-
-    cv_path = None
-    transcript_path = None
-
-    if cv:
-        cv_path = await _save_file(cv)
-    if transcript:
-        transcript_path = await _save_file(transcript)
-
-    files_record = get_files(userId)
+
+    def _write_file(path: Path, data: bytes):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        except OSError as e:
+            print(f"Could not save upload {path}: {e}")
+
+    uploads = {}
+    for upload in (cv, transcript):
+        if upload:
+            data = await upload.read()
+            uploads[upload.filename] = data
+            if PERSIST_UPLOADS:
+                # Parsing works from memory; the copy on disk is only kept for reference
+                path = Path("storage") / "uploads" / userId / upload.filename
+                background_tasks.add_task(_write_file, path, data)
+                saved_files[upload.filename] = str(path)
+
+    # Profile files live on disk; keep their reads and writes off the event loop
+    files_record = await run_blocking(get_files, userId)
     files_record.update(saved_files)
 
-    source_path = cv_path or transcript_path
-    if source_path:
-        parsed_profile = parser.process(source_path)
-        set_profile(userId, parsed_profile, files_record)
-    else:
-        set_files(userId, files_record)
+    source = cv or transcript
+    parsed_profile = await parser.aprocess_bytes(uploads[source.filename], source.filename)
+    await run_blocking(set_profile, userId, parsed_profile, files_record)
+    try:
+        # Embed the resume now so /api/chat can rank jobs by similarity right away
+        await run_blocking(profile_embedding, parsed_profile)
+    except Exception as e:
+        print(f"Could not embed profile: {e}")
 
     return {
         "ok": True,
@@ -56,12 +66,12 @@ async def upload_docs(
     }
 
 @api_router.post("/api/chat")
-async def chat_endpoint(payload: dict):
+async def chat_endpoint(payload: dict, planner: PlannerAgent = Depends(get_planner)):
     message = payload["message"]
     language = payload.get("language", "en")
-    user_profile = get_profile(payload.get("userId"))
+    user_profile = await run_blocking(get_profile, payload.get("userId"))
 
-    result = planner.plan(
+    result = await planner.aplan(
         message=message,
         profile=user_profile,
         language=language
@@ -69,8 +79,19 @@ async def chat_endpoint(payload: dict):
 
     return result
 
-@api_router.post("/api/apply")
-async def apply(payload: dict):
+@api_router.post("/api/chat/stream")
+async def chat_stream(payload: dict, planner: PlannerAgent = Depends(get_planner)):
+    """
+    /api/chat as Server-Sent Events: "token" events while the plan is written,
+    a "jobs" event as soon as the search finishes, then "plan" and "done".
+    """
+    message = payload["message"]
+    language = payload.get("language", "en")
+    user_profile = await run_blocking(get_profile, payload.get("userId"))
+
+    return sse_response(planner.astream_plan(message, profile=user_profile, language=language))
+
+async def _apply_profile(payload: dict):
     user_id = payload.get("userId")
     job = payload.get("job")
 
@@ -79,11 +100,16 @@ async def apply(payload: dict):
     if not job:
         raise HTTPException(status_code=400, detail="Missing job details")
 
-    profile = get_profile(user_id)
+    profile = await run_blocking(get_profile, user_id)
     if not profile:
         raise HTTPException(status_code=400, detail="Upload a resume before applying.")
+    return profile, job
 
-    documents = generate_documents(profile, job)
+@api_router.post("/api/apply")
+async def apply(payload: dict):
+    profile, job = await _apply_profile(payload)
+
+    documents = await agenerate_documents(profile, job)
 
     return {
         "ok": True,
@@ -92,3 +118,13 @@ async def apply(payload: dict):
         "resume_pdf": documents["resume_pdf"],
         "cover_letter_pdf": documents["cover_letter_pdf"]
     }
+
+@api_router.post("/api/apply/stream")
+async def apply_stream(payload: dict):
+    """
+    /api/apply as Server-Sent Events: "resume_token" and "cover_letter_token"
+    events while both documents are written, then "resume" and "cover_letter"
+    (text + base64 PDF) as each is rendered, then "done".
+    """
+    profile, job = await _apply_profile(payload)
+    return sse_response(astream_documents(profile, job))
@@ -0,0 +1,31 @@
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(event: str, data: Any) -> str:
+    """One Server-Sent Events frame; data is JSON (datetimes etc. encoded like a normal response)."""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _frames(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception as e:
+        print(f"Stream failed: {e}")
+        yield format_sse("error", {"detail": str(e)})
+    yield format_sse("done", {})
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Stream (event, data) pairs as text/event-stream, ending with a "done" event."""
+    return StreamingResponse(
+        _frames(events),
+        media_type="text/event-stream",
+        # Keep proxies (nginx, Cloud Run front ends) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,76 @@
+# app/core/concurrency.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Blocking I/O (BigQuery, file writes, synchronous SDK calls) runs here so async
+# handlers never stall the event loop. Bounded, so a burst of requests queues up
+# instead of opening an unbounded number of BigQuery connections.
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+    return _executor
+
+
+def _reset_after_fork() -> None:
+    # A forked child inherits the pool object but none of its threads
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await fn(*args, **kwargs) on the bounded blocking-I/O pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), partial(fn, *args, **kwargs))
+
+
+async def merge_streams(*streams: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    Yield items from several async iterators as soon as any of them produces one.
+    An exception in one stream cancels the others and is re-raised.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump(stream: AsyncIterator[T]) -> None:
+        try:
+            async for item in stream:
+                await queue.put(("item", item))
+        except Exception as exc:
+            await queue.put(("error", exc))
+        finally:
+            await queue.put(("end", None))
+
+    tasks = [asyncio.create_task(pump(stream)) for stream in streams]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            kind, value = await queue.get()
+            if kind == "end":
+                remaining -= 1
+            elif kind == "error":
+                raise value
+            else:
+                yield value
+    finally:
+        for task in tasks:
+            task.cancel()
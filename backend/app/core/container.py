@@ -0,0 +1,109 @@
+# app/core/container.py
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, TypeVar
+
+from app.core.env import require_env
+
+T = TypeVar("T")
+
+
+class Container:
+    """
+    Creates each shared client and agent once, on first use. Nothing here
+    touches credentials or the network at import time, so importing the app
+    (and forking workers) stays cheap. Heavy modules are imported inside the
+    providers for the same reason.
+    """
+
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        # Re-entrant: building an agent asks the container for its clients
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, factory: Callable[[], T]) -> T:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    def loaded(self) -> List[str]:
+        """Names of the components created so far."""
+        return list(self._instances)
+
+    def reset(self) -> None:
+        """Forget every instance (forked children must not share HTTP connection pools)."""
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    # -------------------------
+    # CLIENTS
+    # -------------------------
+    def openai_client(self):
+        def factory():
+            from openai import OpenAI
+
+            return OpenAI(api_key=require_env("OPENAI_API_KEY"))
+
+        return self._get("openai_client", factory)
+
+    def async_openai_client(self):
+        def factory():
+            from openai import AsyncOpenAI
+
+            return AsyncOpenAI(api_key=require_env("OPENAI_API_KEY"))
+
+        return self._get("async_openai_client", factory)
+
+    # -------------------------
+    # AGENTS & STORES
+    # -------------------------
+    def planner(self):
+        def factory():
+            from app.agents.PlannerAgent import PlannerAgent
+
+            return PlannerAgent()
+
+        return self._get("planner", factory)
+
+    def resume_parser(self):
+        def factory():
+            from app.agents.UploadResume import ResumeParser
+
+            return ResumeParser()
+
+        return self._get("resume_parser", factory)
+
+    def resume_store(self):
+        def factory():
+            from app.memory.vector import VectorStore
+
+            return VectorStore("resumes")
+
+        return self._get("resume_store", factory)
+
+
+container = Container()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=container.reset)
+
+
+# ------------------------------------------------------
+# FastAPI dependencies
+# ------------------------------------------------------
+def get_planner():
+    return container.planner()
+
+
+def get_resume_parser():
+    return container.resume_parser()
+
+
+def get_resume_store():
+    return container.resume_store()
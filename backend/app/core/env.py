@@ -4,11 +4,17 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+REQUIRED_ENV = [
+    "OPENAI_API_KEY",
+    "GOOGLE_APPLICATION_CREDENTIALS",
+]
+
 
 def load_env():
     """
     Walk upward from this file until we find a directory containing `.env`.
-    Loads the first match.
+    Loads the first match and returns its path. Without a file, the process
+    environment is used as is (containers inject it via env_file).
     """
     current_dir = Path(__file__).resolve().parent
 
@@ -19,12 +25,16 @@ def load_env():
         if env_file.exists():
             load_dotenv(env_file)
             print(f"✔ Loaded .env from: {env_file}")
-            return
+            return env_file
 
         if infra_env_file.exists():
             load_dotenv(infra_env_file)
             print(f"✔ Loaded .env from: {infra_env_file}")
-            return
+            return infra_env_file
+
+    if all(os.getenv(key) for key in REQUIRED_ENV):
+        print("✔ No .env file found; using the process environment")
+        return None
 
     raise FileNotFoundError(
         "❌ Could not find .env file anywhere above the backend directory."
@@ -39,11 +49,7 @@ def require_env(name: str):
 
 
 def validate_environment():
-    required = [
-        "OPENAI_API_KEY",
-        "GOOGLE_APPLICATION_CREDENTIALS",
-    ]
-    for key in required:
+    for key in REQUIRED_ENV:
         require_env(key)
 
     print("✔ Environment validation successful from env.py")
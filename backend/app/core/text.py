@@ -0,0 +1,49 @@
+# app/core/text.py
+
+import re
+from typing import List
+
+STOPWORDS = {
+    "find",
+    "me",
+    "job",
+    "jobs",
+    "a",
+    "an",
+    "the",
+    "and",
+    "in",
+    "for",
+    "to",
+    "with",
+    "role",
+    "position",
+    "some",
+    "of",
+    "my",
+    "about",
+    "can",
+    "you",
+    "tell",
+    "what",
+    "are",
+    "is",
+    "on",
+    "help",
+}
+
+_TOKEN_RE = re.compile(r"[a-zA-Z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased alphanumeric tokens, dropping stopwords and tokens shorter than 3 chars.
+    Shared by search-term building and the BM25 job index.
+    """
+    tokens: List[str] = []
+    for token in _TOKEN_RE.findall(text or ""):
+        lower = token.lower()
+        if lower in STOPWORDS or len(lower) < 3:
+            continue
+        tokens.append(lower)
+    return tokens
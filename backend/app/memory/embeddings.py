@@ -0,0 +1,66 @@
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.container import container
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "128"))
+# Roughly the 8k token input limit of the embedding models
+MAX_EMBED_CHARS = 24000
+
+
+def _get_client():
+    return container.openai_client()
+
+
+def embed_texts(texts: List[str], model: Optional[str] = None) -> np.ndarray:
+    """
+    Embed texts with the OpenAI embeddings API in batches of EMBED_BATCH_SIZE.
+    Returns a float32 matrix with one row per input text.
+    """
+    model = model or EMBEDDING_MODEL
+    client = _get_client()
+    rows: List[List[float]] = []
+
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = [(text or " ")[:MAX_EMBED_CHARS] for text in texts[start:start + EMBED_BATCH_SIZE]]
+        response = client.embeddings.create(model=model, input=batch)
+        rows.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+
+    return np.asarray(rows, dtype=np.float32)
+
+
+def embed_text(text: str, model: Optional[str] = None) -> np.ndarray:
+    return embed_texts([text], model=model)[0]
+
+
+def job_embedding_text(job: Dict[str, Any]) -> str:
+    """Text used to embed a job posting: title, skills, then description."""
+    skills = job.get("skills") or ""
+    if isinstance(skills, list):
+        skills = ", ".join(str(skill) for skill in skills)
+    parts = [
+        job.get("job_title") or job.get("title") or "",
+        f"Skills: {skills}" if skills else "",
+        job.get("description") or "",
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+def resume_embedding_text(profile: Dict[str, Any]) -> str:
+    """Text used to embed a parsed resume profile."""
+    skills = profile.get("skills") or []
+    work = profile.get("work_experience") or []
+    roles = []
+    for entry in work[:5] if isinstance(work, list) else []:
+        if isinstance(entry, dict):
+            roles.append(" ".join(str(entry.get(key) or "") for key in ("title", "company", "description")).strip())
+    parts = [
+        profile.get("title") or "",
+        f"Skills: {', '.join(str(skill) for skill in skills)}" if skills else "",
+        "\n".join(role for role in roles if role),
+        profile.get("summary") or "",
+    ]
+    return "\n".join(part for part in parts if part)
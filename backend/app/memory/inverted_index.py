@@ -0,0 +1,304 @@
+"""
+In-process BM25 inverted index over job_details (job_title, description, skills).
+
+Postings are append-only typed arrays (doc slot, weighted term frequency) so
+scoring a query is a handful of vectorized NumPy gathers instead of a rescan
+of every description. Re-indexing a job tombstones its old slot; save()
+compacts tombstones away once they make up a noticeable share of the index.
+
+Build from the configured search backend (BigQuery or the local mirror) with:
+    python -m app.memory.inverted_index
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import pickle
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.text import tokenize
+
+INDEX_PATH = Path(os.getenv("JOB_INDEX_PATH", "storage/index/job_details.bm25"))
+INDEX_RELOAD_SECONDS = float(os.getenv("JOB_INDEX_RELOAD_SECONDS", "30"))
+
+# BM25F-style field weights: a hit in the title counts more than one in the description
+FIELD_WEIGHTS = {
+    "job_title": 3.0,
+    "skills": 2.0,
+    "description": 1.0,
+}
+
+
+class InvertedIndex:
+    """BM25 index keyed by job_id."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._doc_ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._lengths = array("f")
+        self._alive = bytearray()
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # -------------------------
+    # INDEXING
+    # -------------------------
+    def _remove_slot(self, slot: int) -> None:
+        self._alive[slot] = 0
+        self._total_length -= self._lengths[slot]
+
+    def add_documents(self, docs: Iterable[Dict]) -> int:
+        """Index (or re-index) job rows; returns the number of rows indexed."""
+        count = 0
+        with self._lock:
+            for doc in docs:
+                job_id = doc.get("job_id")
+                if not job_id:
+                    continue
+                job_id = str(job_id)
+
+                old_slot = self._slots.get(job_id)
+                if old_slot is not None:
+                    self._remove_slot(old_slot)
+
+                weighted_tf: Dict[str, float] = {}
+                for field_name, weight in FIELD_WEIGHTS.items():
+                    value = doc.get(field_name)
+                    if isinstance(value, list):
+                        value = " ".join(str(v) for v in value)
+                    for token in tokenize(value if isinstance(value, str) else ""):
+                        weighted_tf[token] = weighted_tf.get(token, 0.0) + weight
+
+                slot = len(self._doc_ids)
+                self._doc_ids.append(job_id)
+                self._slots[job_id] = slot
+                length = float(sum(weighted_tf.values()))
+                self._lengths.append(length)
+                self._alive.append(1)
+                self._total_length += length
+
+                for token, tf in weighted_tf.items():
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = (array("i"), array("f"))
+                        self._postings[token] = postings
+                    postings[0].append(slot)
+                    postings[1].append(tf)
+                count += 1
+        return count
+
+    def remove_documents(self, job_ids: Iterable[str]) -> None:
+        with self._lock:
+            for job_id in job_ids:
+                slot = self._slots.pop(str(job_id), None)
+                if slot is not None:
+                    self._remove_slot(slot)
+
+    # -------------------------
+    # QUERY
+    # -------------------------
+    def search(self, terms: Iterable[str], k: int = 25) -> List[Tuple[str, float]]:
+        """
+        Top-k (job_id, score) pairs for the query terms, best first.
+        Terms go through the same tokenizer as the indexed fields.
+        """
+        tokens = set()
+        for term in terms or []:
+            tokens.update(tokenize(term))
+
+        with self._lock:
+            live = len(self._slots)
+            if not tokens or not live or k <= 0:
+                return []
+
+            avgdl = max(self._total_length / live, 1e-9)
+            alive = np.frombuffer(self._alive, dtype=np.uint8)
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                slots = np.frombuffer(postings[0], dtype=np.int32)
+                tfs = np.frombuffer(postings[1], dtype=np.float32)
+                df = int(alive[slots].sum())
+                if not df:
+                    continue
+                idf = math.log(1.0 + (live - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[slots] / avgdl)
+                scores[slots] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+            scores *= alive
+            candidates = np.flatnonzero(scores)
+            if candidates.size > k:
+                candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._doc_ids[slot], float(scores[slot])) for slot in ranked]
+
+    # -------------------------
+    # PERSISTENCE
+    # -------------------------
+    def _compacted(self) -> "InvertedIndex":
+        """Copy without tombstoned slots."""
+        fresh = InvertedIndex(self.k1, self.b)
+        remap = {}
+        for job_id, slot in sorted(self._slots.items(), key=lambda item: item[1]):
+            remap[slot] = len(fresh._doc_ids)
+            fresh._doc_ids.append(job_id)
+            fresh._slots[job_id] = remap[slot]
+            fresh._lengths.append(self._lengths[slot])
+            fresh._alive.append(1)
+            fresh._total_length += self._lengths[slot]
+        for token, (slots, tfs) in self._postings.items():
+            new_slots, new_tfs = array("i"), array("f")
+            for slot, tf in zip(slots, tfs):
+                mapped = remap.get(slot)
+                if mapped is not None:
+                    new_slots.append(mapped)
+                    new_tfs.append(tf)
+            if new_slots:
+                fresh._postings[token] = (new_slots, new_tfs)
+        return fresh
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        with self._lock:
+            target = self
+            if len(self._doc_ids) > 1.25 * len(self._slots):
+                target = self._compacted()
+            state = {
+                "k1": target.k1,
+                "b": target.b,
+                "doc_ids": target._doc_ids,
+                "lengths": target._lengths,
+                "alive": target._alive,
+                "postings": target._postings,
+                "total_length": target._total_length,
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "InvertedIndex":
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        index = cls(state["k1"], state["b"])
+        index._doc_ids = state["doc_ids"]
+        index._lengths = state["lengths"]
+        index._alive = state["alive"]
+        index._postings = state["postings"]
+        index._total_length = state["total_length"]
+        index._slots = {
+            job_id: slot for slot, job_id in enumerate(index._doc_ids) if index._alive[slot]
+        }
+        return index
+
+
+# -------------------------
+# SHARED INSTANCE
+# -------------------------
+_index: Optional[InvertedIndex] = None
+_index_mtime = 0.0
+_index_checked = 0.0
+_index_lock = threading.Lock()
+
+
+def get_job_index() -> Optional[InvertedIndex]:
+    """
+    Process-wide index loaded from INDEX_PATH, reloaded when ingestion rewrites it.
+    Returns None when no index has been built yet.
+    """
+    global _index, _index_mtime, _index_checked
+    now = time.monotonic()
+    if _index is not None and now - _index_checked < INDEX_RELOAD_SECONDS:
+        return _index
+
+    with _index_lock:
+        _index_checked = now
+        try:
+            mtime = INDEX_PATH.stat().st_mtime
+        except FileNotFoundError:
+            return _index
+        if _index is None or mtime > _index_mtime:
+            _index = InvertedIndex.load(INDEX_PATH)
+            _index_mtime = mtime
+    return _index
+
+
+class PersistedIndexUpdater:
+    """
+    The on-disk index loaded once and updated in memory across many ingestion
+    flushes; save() rewrites the file. One load and one rewrite per save
+    instead of per flush, so a run costs O(corpus) rather than O(corpus x flushes).
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = Path(path)
+        self._index: Optional[InvertedIndex] = None
+        self._dirty = False
+
+    def add(self, docs: Iterable[Dict]) -> int:
+        if self._index is None:
+            self._index = InvertedIndex.load(self.path) if self.path.exists() else InvertedIndex()
+        count = self._index.add_documents(docs)
+        self._dirty = self._dirty or count > 0
+        return count
+
+    def save(self) -> None:
+        if self._index is not None and self._dirty:
+            self._index.save(self.path)
+            self._dirty = False
+
+
+def update_persisted_index(docs: Iterable[Dict], path: Path = INDEX_PATH) -> int:
+    """Add job rows to the on-disk index in one load + save (see PersistedIndexUpdater for batches)."""
+    updater = PersistedIndexUpdater(path)
+    count = updater.add(docs)
+    updater.save()
+    return count
+
+
+def build_index(batch_size: int = 50000, path: Path = INDEX_PATH) -> InvertedIndex:
+    """Build a fresh index from a snapshot of job_details on the configured search backend."""
+    from dataIngestion.BigQuerySearch import get_search_backend
+
+    engine = get_search_backend()
+    index = InvertedIndex()
+    offset = 0
+    while True:
+        rows = engine.query(
+            f"""
+            SELECT job_id, job_title, description, skills
+            FROM {engine.table("job_details")}
+            ORDER BY job_id
+            LIMIT {engine.param("limit")} OFFSET {engine.param("offset")}
+            """,
+            {"limit": batch_size, "offset": offset},
+        )
+        if not rows:
+            break
+        index.add_documents(rows)
+        offset += len(rows)
+        print(f"Indexed {offset} jobs")
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    build_index()
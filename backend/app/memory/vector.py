@@ -1,8 +1,291 @@
-# Minimal vector store placeholder (swap with FAISS)
+"""
+Vector memory: L2-normalized float32 matrix with batched cosine top-k.
+
+Rows live in a growable NumPy matrix; deletes tombstone a slot and are
+compacted away on save(). Persisted stores are memory-mapped on load, so
+opening a large job corpus costs no RAM until it is queried or written to.
+Above ANN_MIN_VECTORS rows an HNSW index (faiss, optional) answers queries
+once build_ann() has run; loading a large store builds it in the background.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+VECTOR_DIR = Path(os.getenv("VECTOR_STORE_DIR", "storage/vectors"))
+ANN_MIN_VECTORS = int(os.getenv("ANN_MIN_VECTORS", "50000"))
+HNSW_NEIGHBORS = 32
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
 class VectorStore:
-    def __init__(self):
-        self.docs = []
-    def add(self, text: str):
-        self.docs.append(text)
-    def search(self, q: str):
-        return self.docs[:3]
+    def __init__(
+        self,
+        name: str = "default",
+        embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+        storage_dir: Path = VECTOR_DIR,
+    ):
+        self.name = name
+        self.path = Path(storage_dir) / name
+        self._embed_fn = embed_fn
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._count = 0
+        self._ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._ann = None
+        self._ann_size = 0
+        self._dirty = False  # changed since the last save()/load()
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, vector_id: str) -> bool:
+        return vector_id in self._slots
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self._embed_fn is None:
+            from app.memory.embeddings import embed_texts
+
+            self._embed_fn = embed_texts
+        return self._embed_fn(texts)
+
+    # -------------------------
+    # WRITES
+    # -------------------------
+    def _reserve(self, extra: int, dim: int) -> None:
+        if self._matrix is None:
+            self._matrix = np.empty((max(64, extra), dim), dtype=np.float32)
+            self._alive = np.zeros(len(self._matrix), dtype=bool)
+            return
+        if dim != self._matrix.shape[1]:
+            raise ValueError(f"Vector store '{self.name}' expects dim {self._matrix.shape[1]}, got {dim}")
+        needed = self._count + extra
+        # Memory-mapped matrices are read-only; the first write copies them into RAM.
+        if needed > len(self._matrix) or not self._matrix.flags.writeable:
+            capacity = max(needed, 2 * len(self._matrix), 64)
+            grown = np.empty((capacity, dim), dtype=np.float32)
+            grown[: self._count] = self._matrix[: self._count]
+            alive = np.zeros(capacity, dtype=bool)
+            alive[: self._count] = self._alive[: self._count]
+            self._matrix, self._alive = grown, alive
+
+    def add_vectors(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        """Insert or replace vectors by id."""
+        vectors = _normalize(np.atleast_2d(vectors))
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if not len(ids):
+            return
+
+        with self._lock:
+            self.delete(ids)
+            self._reserve(len(ids), vectors.shape[1])
+            start = self._count
+            self._matrix[start : start + len(ids)] = vectors
+            self._alive[start : start + len(ids)] = True
+            for offset, vector_id in enumerate(ids):
+                self._ids.append(vector_id)
+                self._slots[vector_id] = start + offset
+                if metadata and metadata[offset] is not None:
+                    self._metadata[vector_id] = metadata[offset]
+            self._count += len(ids)
+            self._dirty = True
+
+    def add_vector(self, vector_id: str, vector: np.ndarray, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.add_vectors([vector_id], np.asarray(vector)[None, :], [metadata])
+
+    def add_texts(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        """Embed texts in one batched call and store them under ids."""
+        if not ids:
+            return
+        self.add_vectors(ids, self._embed(list(texts)), metadata)
+
+    def add_text(self, vector_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.add_texts([vector_id], [text], [metadata])
+
+    def delete(self, ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for vector_id in ids:
+                slot = self._slots.pop(vector_id, None)
+                if slot is None:
+                    continue
+                self._alive[slot] = False
+                self._metadata.pop(vector_id, None)
+                self._dirty = True
+                removed += 1
+        return removed
+
+    # -------------------------
+    # QUERY
+    # -------------------------
+    def ids(self) -> List[str]:
+        return list(self._slots)
+
+    def get_vector(self, vector_id: str) -> Optional[np.ndarray]:
+        slot = self._slots.get(vector_id)
+        return None if slot is None else np.array(self._matrix[slot])
+
+    def get_metadata(self, vector_id: str) -> Optional[Dict[str, Any]]:
+        return self._metadata.get(vector_id)
+
+    def build_ann(self) -> None:
+        """
+        Build the HNSW index over the current rows. Runs outside the lock so
+        queries keep using brute force until the index is ready.
+        """
+        try:
+            import faiss
+        except ImportError:
+            return
+        with self._lock:
+            if self._matrix is None:
+                return
+            size = self._count
+            rows = np.ascontiguousarray(self._matrix[:size])
+        index = faiss.IndexHNSWFlat(rows.shape[1], HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+        index.add(rows)
+        with self._lock:
+            self._ann, self._ann_size = index, size
+
+    def _ann_index(self):
+        """The built HNSW index, extended with rows added since it was built."""
+        if self._ann is None or self._count < ANN_MIN_VECTORS:
+            return None
+        if self._ann_size < self._count:
+            self._ann.add(np.ascontiguousarray(self._matrix[self._ann_size : self._count]))
+            self._ann_size = self._count
+        return self._ann
+
+    def search_vectors(self, queries: np.ndarray, k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Batched cosine top-k: one result list per query row, best first."""
+        queries = _normalize(np.atleast_2d(queries))
+        with self._lock:
+            if not self._slots or k <= 0:
+                return [[] for _ in range(len(queries))]
+
+            ann = self._ann_index()
+            if ann is not None:
+                # Over-fetch to make up for tombstoned slots
+                fetch = min(self._count, k + (self._count - len(self._slots)))
+                scores, slots = ann.search(np.ascontiguousarray(queries), fetch)
+            else:
+                scores = queries @ self._matrix[: self._count].T
+                scores[:, ~self._alive[: self._count]] = -np.inf
+                fetch = min(k, len(self._slots))
+                slots = np.argpartition(-scores, fetch - 1, axis=1)[:, :fetch]
+                scores = np.take_along_axis(scores, slots, axis=1)
+
+            results = []
+            for row_scores, row_slots in zip(scores, slots):
+                order = np.argsort(-row_scores, kind="stable")
+                hits = []
+                for i in order:
+                    slot = int(row_slots[i])
+                    if slot < 0 or not self._alive[slot]:
+                        continue
+                    vector_id = self._ids[slot]
+                    hits.append({
+                        "id": vector_id,
+                        "score": float(row_scores[i]),
+                        "metadata": self._metadata.get(vector_id),
+                    })
+                    if len(hits) == k:
+                        break
+                results.append(hits)
+            return results
+
+    def search_vector(self, vector: np.ndarray, k: int = 3) -> List[Dict[str, Any]]:
+        return self.search_vectors(np.asarray(vector)[None, :], k)[0]
+
+    def search(self, q: Union[str, np.ndarray], k: int = 3) -> List[Dict[str, Any]]:
+        if isinstance(q, str):
+            q = self._embed([q])[0]
+        return self.search_vector(q, k)
+
+    # -------------------------
+    # PERSISTENCE
+    # -------------------------
+    def save(self) -> None:
+        """Write live rows to <storage_dir>/<name>/vectors.npy + ids.json (compacting deletes)."""
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            live_slots = np.flatnonzero(self._alive[: self._count])
+            matrix = (
+                self._matrix[live_slots]
+                if self._matrix is not None
+                else np.zeros((0, 0), dtype=np.float32)
+            )
+            ids = [self._ids[slot] for slot in live_slots]
+
+            tmp_matrix = self.path / "vectors.tmp.npy"
+            np.save(tmp_matrix, matrix)
+            tmp_ids = self.path / "ids.tmp.json"
+            tmp_ids.write_text(json.dumps({"ids": ids, "metadata": self._metadata}), encoding="utf-8")
+            tmp_matrix.replace(self.path / "vectors.npy")
+            tmp_ids.replace(self.path / "ids.json")
+            self._dirty = False
+
+    def save_if_dirty(self) -> bool:
+        """
+        save() unless nothing changed since the last one. Run after each write
+        (e.g. as a background task) so a burst of writes shares one save.
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            self.save()
+            return True
+
+    def load(self) -> None:
+        matrix_path = self.path / "vectors.npy"
+        ids_path = self.path / "ids.json"
+        if not (matrix_path.exists() and ids_path.exists()):
+            return
+        with self._lock:
+            state = json.loads(ids_path.read_text(encoding="utf-8"))
+            matrix = np.load(matrix_path, mmap_mode="r")
+            ids = state.get("ids", [])
+            if matrix.ndim != 2 or len(ids) != len(matrix) or not len(ids):
+                return
+            self._matrix = matrix
+            self._count = len(ids)
+            self._ids = list(ids)
+            self._slots = {vector_id: slot for slot, vector_id in enumerate(ids)}
+            self._alive = np.ones(self._count, dtype=bool)
+            self._metadata = state.get("metadata", {})
+            self._ann = None
+            self._ann_size = 0
+            self._dirty = False
+        if self._count >= ANN_MIN_VECTORS:
+            threading.Thread(target=self.build_ann, daemon=True).start()
@@ -1,5 +1,90 @@
+from __future__ import annotations
+
 import os
-from google.cloud import bigquery
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    # google-cloud-bigquery pulls in pandas/pyarrow; import it only when a client is built
+    from google.cloud import bigquery
+
+DEFAULT_PROJECT = "agentic-jobsearch"
+BQ_HTTP_POOL_SIZE = int(os.getenv("BQ_HTTP_POOL_SIZE", "32"))
+
+_SCOPES = ("https://www.googleapis.com/auth/cloud-platform",)
+
+# Process-wide client registry keyed by (project, location)
+_clients: Dict[Tuple[str, Optional[str]], bigquery.Client] = {}
+_credentials = None
+_lock = threading.Lock()
+
+
+def _load_credentials():
+    """Parse the service account file once per process (falls back to ADC)."""
+    global _credentials
+    if _credentials is None:
+        credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        if credentials_path:
+            from google.oauth2 import service_account
+
+            _credentials = service_account.Credentials.from_service_account_file(
+                credentials_path, scopes=_SCOPES
+            )
+        else:
+            import google.auth
+
+            _credentials, _ = google.auth.default(scopes=_SCOPES)
+    return _credentials
+
+
+def _pooled_session(credentials):
+    """Authorized HTTP session whose connection pool is shared by all threads."""
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=BQ_HTTP_POOL_SIZE, pool_maxsize=BQ_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_bq_client(project: Optional[str] = None, location: Optional[str] = None) -> bigquery.Client:
+    """
+    Returns the shared BigQuery client for (project, location), creating it on first use.
+    Credentials are parsed once and every client reuses a pooled HTTP session.
+    """
+    project = project or os.getenv("GOOGLE_PROJECT_ID") or DEFAULT_PROJECT
+    key = (project, location)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            from google.cloud import bigquery
+
+            credentials = _load_credentials()
+            client = bigquery.Client(
+                project=project,
+                credentials=credentials,
+                location=location,
+                _http=_pooled_session(credentials),
+            )
+            _clients[key] = client
+    return client
+
+
+def reset_bq_clients() -> None:
+    """Drop all cached clients (sockets must not be shared across a fork)."""
+    global _credentials
+    _clients.clear()
+    _credentials = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_bq_clients)
 
 
 class BigQueryClient:
@@ -10,7 +95,7 @@ class BigQueryClient:
         if not project:
             raise ValueError("GOOGLE_PROJECT_ID environment variable not set")
 
-        self.client = bigquery.Client(project=project)
+        self.client = get_bq_client(project)
 
     def fetch_recent_jobs(self, limit: int = 20):
         """
@@ -31,6 +116,7 @@ class BigQueryClient:
         ORDER BY created_at DESC
         LIMIT @limit
         """
+        from google.cloud import bigquery
 
         job_config = bigquery.QueryJobConfig(
             query_parameters=[
@@ -1,18 +1,14 @@
+import asyncio
 import json
 import base64
 import re
 from io import BytesIO
 from textwrap import wrap
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Tuple
 
-from openai import OpenAI
-from reportlab.lib.pagesizes import LETTER
-from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
-
-from app.core.env import require_env
-
-_client = OpenAI(api_key=require_env("OPENAI_API_KEY"))
+from app.core.concurrency import get_blocking_executor, merge_streams, run_blocking
+from app.core.container import container
+from app.services.llm_cache import acached_chat_completion, astream_chat_completion, cached_chat_completion
 
 
 def _format_profile(profile: Dict[str, Any]) -> str:
@@ -50,8 +46,8 @@ Additional Requirements: {requirements}
 """
 
 
-def _chat_completion(prompt: str, temperature: float = 0.2) -> str:
-    response = _client.chat.completions.create(
+def _completion_request(prompt: str, temperature: float) -> Dict[str, Any]:
+    return dict(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "You are an assistant that writes professional job application materials using only the provided information."},
@@ -59,10 +55,19 @@ def _chat_completion(prompt: str, temperature: float = 0.2) -> str:
         ],
         temperature=temperature,
     )
+
+
+def _chat_completion(prompt: str, temperature: float = 0.2) -> str:
+    response = cached_chat_completion(container.openai_client(), **_completion_request(prompt, temperature))
     return response.choices[0].message.content.strip()
 
 
-def generate_documents(profile: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, str]:
+async def _achat_completion(prompt: str, temperature: float = 0.2) -> str:
+    response = await acached_chat_completion(container.async_openai_client(), **_completion_request(prompt, temperature))
+    return response.choices[0].message.content.strip()
+
+
+def _document_prompts(profile: Dict[str, Any], job: Dict[str, Any]) -> Tuple[str, str, str]:
     formatted_profile = _format_profile(profile)
     formatted_job = _format_job(job)
     contact_block = _contact_block(profile)
@@ -90,38 +95,137 @@ Candidate Info:
 Job Info:
 {formatted_job}
 """
+    return resume_prompt, cover_prompt, contact_block
+
 
+def generate_documents(profile: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, str]:
+    resume_prompt, cover_prompt, contact_block = _document_prompts(profile, job)
+
+    # The two documents are independent: each branch makes its LLM call and
+    # renders its PDF, and both branches run at once on the blocking-I/O pool.
+    # Callers are workflow threads, never that pool itself, so this cannot deadlock.
+    executor = get_blocking_executor()
+    resume_future = executor.submit(_build_resume, resume_prompt, contact_block)
+    cover_future = executor.submit(_build_cover_letter, cover_prompt, contact_block)
+    return _assemble(resume_future.result(), cover_future.result())
+
+
+async def agenerate_documents(profile: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, str]:
+    """
+    generate_documents for async callers: both completions go out concurrently
+    on the AsyncOpenAI client and PDF rendering runs on the blocking-I/O pool,
+    so the event loop is never blocked.
+    """
+    resume_prompt, cover_prompt, contact_block = _document_prompts(profile, job)
+    resume, cover = await asyncio.gather(
+        _abuild_resume(resume_prompt, contact_block),
+        _abuild_cover_letter(cover_prompt, contact_block),
+    )
+    return _assemble(resume, cover)
+
+
+async def _abuild_resume(resume_prompt: str, contact_block: str) -> Tuple[str, bytes]:
     try:
-        resume_text = _chat_completion(resume_prompt, temperature=0.3)
+        resume_text = await _achat_completion(resume_prompt, temperature=0.3)
     except Exception as exc:
         resume_text = f"Unable to generate resume: {exc}"
+    return await run_blocking(_finish_resume, resume_text, contact_block)
 
+
+async def _abuild_cover_letter(cover_prompt: str, contact_block: str) -> Tuple[str, bytes]:
     try:
-        cover_letter = _chat_completion(cover_prompt, temperature=0.25)
+        cover_letter = await _achat_completion(cover_prompt, temperature=0.25)
     except Exception as exc:
         cover_letter = f"Unable to generate cover letter: {exc}"
     else:
         cover_letter = _remove_placeholder_lines(cover_letter)
+    return await run_blocking(_finish_cover_letter, cover_letter, contact_block)
+
+
+async def astream_documents(profile: Dict[str, Any], job: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming agenerate_documents: yields ("resume_token", text) and
+    ("cover_letter_token", text) while both completions run, then
+    ("resume", {...}) and ("cover_letter", {...}) with the final text and
+    base64 PDF as each document is rendered.
+    """
+    resume_prompt, cover_prompt, contact_block = _document_prompts(profile, job)
+
+    async def _resume():
+        parts = []
+        try:
+            async for delta in astream_chat_completion(container.async_openai_client(), **_completion_request(resume_prompt, 0.3)):
+                parts.append(delta)
+                yield "resume_token", delta
+            resume_text = "".join(parts).strip()
+        except Exception as exc:
+            resume_text = f"Unable to generate resume: {exc}"
+        text, pdf = await run_blocking(_finish_resume, resume_text, contact_block)
+        yield "resume", {"text": text, "pdf": base64.b64encode(pdf).decode("utf-8")}
+
+    async def _cover_letter():
+        parts = []
+        try:
+            async for delta in astream_chat_completion(container.async_openai_client(), **_completion_request(cover_prompt, 0.25)):
+                parts.append(delta)
+                yield "cover_letter_token", delta
+        except Exception as exc:
+            cover_letter = f"Unable to generate cover letter: {exc}"
+        else:
+            cover_letter = _remove_placeholder_lines("".join(parts).strip())
+        text, pdf = await run_blocking(_finish_cover_letter, cover_letter, contact_block)
+        yield "cover_letter", {"text": text, "pdf": base64.b64encode(pdf).decode("utf-8")}
+
+    async for event in merge_streams(_resume(), _cover_letter()):
+        yield event
+
+
+def _build_resume(resume_prompt: str, contact_block: str) -> Tuple[str, bytes]:
+    try:
+        resume_text = _chat_completion(resume_prompt, temperature=0.3)
+    except Exception as exc:
+        resume_text = f"Unable to generate resume: {exc}"
+    return _finish_resume(resume_text, contact_block)
+
 
+def _finish_resume(resume_text: str, contact_block: str) -> Tuple[str, bytes]:
     core_resume_text = _clean_resume_sections(_strip_existing_contact(resume_text, contact_block))
     resume_text_full = _prepend_contact_block(core_resume_text, contact_block)
-    cover_letter = _prepend_contact_block(cover_letter, contact_block)
-
     resume_plain = _markdown_to_plain(core_resume_text, is_resume=True)
-    cover_plain = _markdown_to_plain(cover_letter)
 
     try:
         resume_pdf = _render_resume_pdf(resume_plain, contact_block)
     except Exception as exc:
         resume_pdf = _render_resume_pdf(resume_plain[:2000], contact_block)
         resume_text_full = f"{resume_text_full}\n\n(Note: PDF fallback due to error: {exc})"
+    return resume_text_full, resume_pdf
+
+
+def _build_cover_letter(cover_prompt: str, contact_block: str) -> Tuple[str, bytes]:
+    try:
+        cover_letter = _chat_completion(cover_prompt, temperature=0.25)
+    except Exception as exc:
+        cover_letter = f"Unable to generate cover letter: {exc}"
+    else:
+        cover_letter = _remove_placeholder_lines(cover_letter)
+    return _finish_cover_letter(cover_letter, contact_block)
+
+
+def _finish_cover_letter(cover_letter: str, contact_block: str) -> Tuple[str, bytes]:
+    cover_letter = _prepend_contact_block(cover_letter, contact_block)
+    cover_plain = _markdown_to_plain(cover_letter)
 
     try:
         cover_pdf = _render_pdf(cover_plain, "Cover Letter", show_title=False)
     except Exception as exc:
         cover_pdf = _render_pdf(cover_plain[:2000], "Cover Letter (fallback)")
         cover_letter = f"{cover_letter}\n\n(Note: PDF fallback due to error: {exc})"
+    return cover_letter, cover_pdf
+
 
+def _assemble(resume: Tuple[str, bytes], cover: Tuple[str, bytes]) -> Dict[str, str]:
+    resume_text_full, resume_pdf = resume
+    cover_letter, cover_pdf = cover
     return {
         "resume_text": resume_text_full,
         "cover_letter": cover_letter,
@@ -131,6 +235,11 @@ Job Info:
 
 
 def _render_pdf(text: str, title: str, show_title: bool = True) -> bytes:
+    # reportlab is only needed once a document is rendered; keep it off the startup path
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen import canvas
+
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=LETTER)
     width, height = LETTER
@@ -165,6 +274,10 @@ def _render_pdf(text: str, title: str, show_title: bool = True) -> bytes:
 
 
 def _render_resume_pdf(body_text: str, contact_block: str) -> bytes:
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen import canvas
+
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=LETTER)
     width, height = LETTER
@@ -0,0 +1,78 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.skill_matcher import get_skill_taxonomy
+
+_SKILL_SPLIT = re.compile(r"[;,/\n]")
+
+
+class JobScorer:
+    """
+    Scores jobs against one profile. Everything derived from the profile
+    (canonical skill set, skill automaton, location and title tokens) is
+    computed once, so scoring a job is a single pass over its description.
+    Skills match as whole words and through aliases ("k8s" counts for
+    "kubernetes"); precomputed job skill_tags are used when present.
+    """
+
+    def __init__(self, profile: Optional[Dict[str, Any]]):
+        self.profile = profile or {}
+
+        self._taxonomy = get_skill_taxonomy()
+        skills = list(self.profile.get("skills") or [])
+        if isinstance(self.profile.get("custom_skills"), list):
+            skills.extend(self.profile["custom_skills"])
+        self.skills: List[str] = self._taxonomy.canonicalize_all(skills)
+        self._matcher = self._taxonomy.compile(self.skills)
+
+        profile_location = (self.profile.get("location") or "").lower()
+        self._location = profile_location.split(",")[0] if profile_location else ""
+        self._title_tokens = (self.profile.get("title") or "").lower().split()
+
+    def score(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.profile:
+            return {"score": 0.0, "matched_skills": []}
+
+        job_skills = job.get("skills")
+        if isinstance(job_skills, str):
+            job_skills = _SKILL_SPLIT.split(job_skills)
+        job_skill_terms = set(self._taxonomy.canonicalize_all(job_skills if isinstance(job_skills, list) else []))
+        skill_tags = job.get("skill_tags")
+        if skill_tags is not None:
+            job_skill_terms.update(skill_tags)
+
+        found = self._matcher.find((job.get("description") or "").lower())
+        matched_skills = [
+            skill for skill in self.skills
+            if skill in found or skill in job_skill_terms
+        ]
+
+        skill_score = 0.0
+        if self.skills:
+            skill_score = (len(matched_skills) / len(self.skills)) * 70.0
+
+        # Location bonus
+        location_score = 0.0
+        job_location = (job.get("location") or "").lower()
+        if self._location and job_location and self._location in job_location:
+            location_score = 10.0
+
+        # Title alignment bonus
+        title_score = 0.0
+        job_title = (job.get("job_title") or job.get("title") or "").lower()
+        if self._title_tokens and job_title and any(token in job_title for token in self._title_tokens):
+            title_score = 20.0
+
+        final_score = min(100.0, round(skill_score + location_score + title_score, 1))
+        return {
+            "score": final_score,
+            "matched_skills": matched_skills,
+        }
+
+    def score_jobs(self, jobs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.score(job) for job in jobs]
+
+
+def score_jobs(profile: Optional[Dict[str, Any]], jobs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score many jobs for one profile; same score/matched_skills contract as PlannerAgent._score_job."""
+    return JobScorer(profile).score_jobs(jobs)
@@ -0,0 +1,288 @@
+"""
+Content-addressed cache for OpenAI chat completions.
+
+The key is the SHA-256 of the canonical JSON of the request (model, messages,
+temperature and any other sampling arguments), so an identical prompt is
+answered from cache no matter which agent sends it. Two tiers:
+
+- an in-process LRU (LLM_CACHE_MEMORY_ITEMS entries), and
+- a SQLite file (LLM_CACHE_PATH) shared by every worker process, bounded to
+  LLM_CACHE_MAX_BYTES by evicting the least recently used rows.
+
+Entries expire after LLM_CACHE_TTL_SECONDS. Set LLM_CACHE_ENABLED=0 to bypass.
+The async helpers read the LRU inline and do SQLite I/O on the blocking-I/O
+pool, so a slow or locked database never stalls the event loop.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional, Tuple
+
+from app.core.concurrency import run_blocking
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", "storage/llm_cache.sqlite3"))
+CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_MEMORY_ITEMS = int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "512"))
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _completion_type():
+    # The openai package takes most of a second to import; defer it to the first LLM call
+    from openai.types.chat import ChatCompletion
+
+    return ChatCompletion
+
+
+def request_key(**kwargs: Any) -> str:
+    """Hash of the request arguments; key order and whitespace do not matter."""
+    payload = json.dumps(kwargs, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        memory_items: int = CACHE_MEMORY_ITEMS,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+
+    # -------------------------
+    # SQLITE TIER
+    # -------------------------
+    def _db(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not shareable across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions(accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM completions WHERE expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until we are back under 90% of the budget
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM completions ORDER BY accessed_at"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+    def get(self, key: str) -> Optional[str]:
+        hit = self.get_memory(key)
+        return hit if hit is not None else self._get_disk(key)
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = self._remember(key, value)
+        self._set_disk(key, value, expires_at)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for async callers: the LRU is read inline, SQLite on the blocking-I/O pool."""
+        hit = self.get_memory(key)
+        return hit if hit is not None else await run_blocking(self._get_disk, key)
+
+    async def aset(self, key: str, value: str) -> None:
+        """set() for async callers: the LRU is updated inline, SQLite on the blocking-I/O pool."""
+        expires_at = self._remember(key, value)
+        await run_blocking(self._set_disk, key, value, expires_at)
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """In-process LRU lookup only; never touches SQLite."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+        return None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT value, expires_at FROM completions WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"LLM cache read failed: {e}")
+            return None
+
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def _set_disk(self, key: str, value: str, expires_at: float) -> None:
+        now = time.time()
+        try:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO completions (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), expires_at, now),
+                )
+                with self._lock:
+                    self._writes += 1
+                    evict = self._writes % 100 == 1
+                if evict:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float] = None) -> float:
+        if expires_at is None:
+            expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        return expires_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        with self._db() as conn:
+            conn.execute("DELETE FROM completions")
+
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CompletionCache()
+    return _cache
+
+
+def cached_chat_completion(client: Any, **kwargs: Any) -> ChatCompletion:
+    """
+    Drop-in for client.chat.completions.create(**kwargs): identical requests
+    are served from cache. Streaming requests always go to the API.
+    """
+    if not CACHE_ENABLED or kwargs.get("stream"):
+        return client.chat.completions.create(**kwargs)
+
+    cache = get_completion_cache()
+    key = request_key(**kwargs)
+    hit = cache.get(key)
+    if hit is not None:
+        return _completion_type().model_validate_json(hit)
+
+    response = client.chat.completions.create(**kwargs)
+    cache.set(key, response.model_dump_json())
+    return response
+
+
+async def acached_chat_completion(client: Any, **kwargs: Any) -> ChatCompletion:
+    """cached_chat_completion for an AsyncOpenAI client; SQLite I/O stays off the event loop."""
+    if not CACHE_ENABLED or kwargs.get("stream"):
+        return await client.chat.completions.create(**kwargs)
+
+    cache = get_completion_cache()
+    key = request_key(**kwargs)
+    hit = await cache.aget(key)
+    if hit is not None:
+        return _completion_type().model_validate_json(hit)
+
+    response = await client.chat.completions.create(**kwargs)
+    await cache.aset(key, response.model_dump_json())
+    return response
+
+
+async def astream_chat_completion(client: Any, **kwargs: Any) -> AsyncIterator[str]:
+    """
+    Stream content deltas from an AsyncOpenAI client as they arrive. A cached
+    response is replayed as a single delta; a freshly streamed one is cached
+    under the same key as the non-streaming request once it completes.
+    """
+    cache = get_completion_cache() if CACHE_ENABLED else None
+    key = request_key(**kwargs)
+    if cache is not None:
+        hit = await cache.aget(key)
+        if hit is not None:
+            content = _completion_type().model_validate_json(hit).choices[0].message.content or ""
+            if content:
+                yield content
+            return
+
+    stream = await client.chat.completions.create(**kwargs, stream=True)
+    parts = []
+    header: dict = {}
+    finish_reason = None
+    async for chunk in stream:
+        if not header:
+            header = {"id": chunk.id, "created": chunk.created, "model": chunk.model}
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta and choice.delta.content:
+            parts.append(choice.delta.content)
+            yield choice.delta.content
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+
+    if cache is not None and finish_reason:
+        completion = _completion_type().model_validate({
+            **header,
+            "object": "chat.completion",
+            "choices": [{
+                "index": 0,
+                "finish_reason": finish_reason,
+                "message": {"role": "assistant", "content": "".join(parts)},
+            }],
+        })
+        await cache.aset(key, completion.model_dump_json())
@@ -0,0 +1,84 @@
+import hashlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.memory.embeddings import EMBEDDING_MODEL, embed_text, resume_embedding_text
+from app.memory.vector import VECTOR_DIR, VectorStore
+
+JOB_STORE_NAME = "jobs"
+PROFILE_STORE_NAME = "profiles"
+STORE_RELOAD_SECONDS = 30.0
+
+_job_store: Optional[VectorStore] = None
+_job_store_mtime = 0.0
+_job_store_checked = 0.0
+_profile_store: Optional[VectorStore] = None
+_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    """Cache key for an embedding: the model plus the exact embedded text."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+
+
+def get_job_store() -> VectorStore:
+    """Job posting embeddings written by ingestion; reloaded when the files change."""
+    global _job_store, _job_store_mtime, _job_store_checked
+    now = time.monotonic()
+    if _job_store is not None and now - _job_store_checked < STORE_RELOAD_SECONDS:
+        return _job_store
+
+    with _lock:
+        _job_store_checked = now
+        ids_path = VECTOR_DIR / JOB_STORE_NAME / "ids.json"
+        mtime = ids_path.stat().st_mtime if ids_path.exists() else 0.0
+        # _job_store_mtime is the ids.json the current instance was loaded from
+        # (0.0 = none yet), so the first ingest after an empty start is picked up
+        if _job_store is None or mtime > _job_store_mtime:
+            _job_store = VectorStore(JOB_STORE_NAME)
+            _job_store_mtime = mtime
+    return _job_store
+
+
+def get_profile_store() -> VectorStore:
+    global _profile_store
+    if _profile_store is None:
+        with _lock:
+            if _profile_store is None:
+                _profile_store = VectorStore(PROFILE_STORE_NAME)
+    return _profile_store
+
+
+def profile_embedding(profile: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    Resume embedding for a parsed profile, cached by content hash so it is
+    computed once per resume rather than once per chat message.
+    """
+    text = resume_embedding_text(profile or {})
+    if not text:
+        return None
+
+    digest = content_hash(text)
+    store = get_profile_store()
+    vector = store.get_vector(digest)
+    if vector is None:
+        vector = embed_text(text)
+        store.add_vector(digest, vector)
+        store.save()
+    return vector
+
+
+def match_jobs_semantic(profile: Dict[str, Any], k: int = 25) -> List[Tuple[str, float]]:
+    """Top-k (job_id, cosine similarity) for the profile across the whole job corpus."""
+    store = get_job_store()
+    if not len(store):
+        return []
+
+    vector = profile_embedding(profile)
+    if vector is None:
+        return []
+
+    return [(hit["id"], hit["score"]) for hit in store.search_vector(vector, k=k)]
@@ -0,0 +1,285 @@
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:  # pragma: no cover - pure-Python fallback below
+    _ahocorasick = None
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher: one pass over the text finds every
+    occurrence of every pattern. Uses pyahocorasick when installed and a
+    pure-Python automaton otherwise. Patterns are matched as given, so
+    callers lowercase both patterns and text for case-insensitive search.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(dict.fromkeys(p for p in patterns if p))
+        self._automaton = None
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        if not self.patterns:
+            return
+        if _ahocorasick is not None:
+            automaton = _ahocorasick.Automaton()
+            for pattern_id, pattern in enumerate(self.patterns):
+                automaton.add_word(pattern, pattern_id)
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            self._build()
+
+    def _build(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].append(pattern_id)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fallback = goto[f].get(ch, 0)
+                fail[nxt] = fallback if fallback != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yields (end_index, pattern_id) for every occurrence, end_index inclusive."""
+        if not self.patterns or not text:
+            return
+        if self._automaton is not None:
+            yield from self._automaton.iter(text)
+            return
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                yield i, pattern_id
+
+    def find_all(self, text: str) -> Set[int]:
+        """Ids of all patterns occurring anywhere in text."""
+        return {pattern_id for _, pattern_id in self.iter(text)}
+
+
+# Canonical skill -> aliases. Every canonical skill is also matched as written.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "python": [],
+    "java": [],
+    "javascript": ["js", "ecmascript"],
+    "typescript": ["ts"],
+    "go": ["golang", "go programming", "go language"],
+    "rust": [],
+    "c": ["ansi c", "c programming", "c language", "embedded c"],
+    "c++": ["cpp"],
+    "c#": ["csharp", "c sharp"],
+    "ruby": [],
+    "php": [],
+    "scala": [],
+    "kotlin": [],
+    "swift": ["swiftui", "swift programming", "swift language"],
+    "r": ["r programming", "r language", "rstudio"],
+    "sql": [],
+    "postgresql": ["postgres", "psql"],
+    "mysql": [],
+    "sql server": ["mssql", "microsoft sql server"],
+    "mongodb": ["mongo"],
+    "redis": [],
+    "elasticsearch": ["elastic search"],
+    "bigquery": ["big query"],
+    "snowflake": [],
+    "spark": ["apache spark", "pyspark"],
+    "hadoop": [],
+    "kafka": ["apache kafka"],
+    "airflow": ["apache airflow"],
+    "dbt": [],
+    "pandas": [],
+    "numpy": [],
+    "tensorflow": [],
+    "pytorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "machine learning": ["ml"],
+    "deep learning": [],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "computer vision": [],
+    "large language models": ["llm", "llms"],
+    "react": ["reactjs", "react.js"],
+    "angular": ["angularjs"],
+    "vue": ["vue.js", "vuejs"],
+    "node.js": ["nodejs", "node js"],
+    "django": [],
+    "flask": [],
+    "fastapi": [],
+    "spring": ["spring boot", "spring framework", "spring mvc"],
+    ".net": ["dotnet"],
+    "graphql": [],
+    "rest": ["rest api", "rest apis", "restful"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "terraform": [],
+    "ansible": [],
+    "linux": [],
+    "git": [],
+    "ci/cd": ["cicd", "ci cd", "continuous integration"],
+    "jenkins": [],
+    "microservices": [],
+    "agile": ["scrum"],
+    "tableau": [],
+    "power bi": ["powerbi"],
+    "excel": ["microsoft excel", "ms excel"],
+}
+
+# Surface forms that are also everyday English words ("go", "rest", "spring",
+# "ai" in names...). They still canonicalize a skill someone listed, but are
+# never searched for in free text, where only the qualified aliases count.
+AMBIGUOUS_SURFACES: Set[str] = {"go", "r", "c", "rest", "spring", "swift", "excel", "ai", "ts"}
+
+# Characters that continue a token: "c" must not match inside "c++", "sql" not inside "mysql".
+_WORD_EXTRA = "+#"
+
+
+def _is_word_char(text: str, i: int, step: int) -> bool:
+    ch = text[i]
+    if ch.isalnum() or ch in _WORD_EXTRA:
+        return True
+    # An inner dot as in "node.js" joins two tokens; a sentence-ending dot does not
+    nxt = i + step
+    return ch == "." and 0 <= nxt < len(text) and text[nxt].isalnum()
+
+
+def _at_word_boundary(text: str, start: int, end: int) -> bool:
+    if start > 0 and _is_word_char(text, start - 1, -1):
+        return False
+    if end + 1 < len(text) and _is_word_char(text, end + 1, 1):
+        return False
+    return True
+
+
+class SkillSetMatcher:
+    """Finds a fixed set of canonical skills (and their aliases) as whole words."""
+
+    def __init__(self, canonical_by_surface: Dict[str, str]):
+        self._canonical = list(canonical_by_surface.values())
+        self._automaton = AhoCorasick(canonical_by_surface.keys())
+
+    def find(self, text: str) -> Set[str]:
+        """Canonical skills present in text; text must already be lowercased."""
+        found: Set[str] = set()
+        for end, pattern_id in self._automaton.iter(text):
+            start = end - len(self._automaton.patterns[pattern_id]) + 1
+            if _at_word_boundary(text, start, end):
+                found.add(self._canonical[pattern_id])
+        return found
+
+    def find_ordered(self, text: str) -> List[str]:
+        """Like find(), in order of first appearance."""
+        ordered: Dict[str, None] = {}
+        for end, pattern_id in sorted(self._automaton.iter(text)):
+            start = end - len(self._automaton.patterns[pattern_id]) + 1
+            if _at_word_boundary(text, start, end):
+                ordered.setdefault(self._canonical[pattern_id], None)
+        return list(ordered)
+
+
+class SkillTaxonomy:
+    """
+    Skill vocabulary with alias canonicalisation ("k8s" -> "kubernetes").
+    extract() runs one automaton over the whole vocabulary; compile() builds
+    (and caches) a matcher for an arbitrary skill list such as a profile's.
+    """
+
+    def __init__(self, aliases: Dict[str, Iterable[str]] = SKILL_ALIASES):
+        self._canonical_by_surface: Dict[str, str] = {}
+        self._surfaces: Dict[str, List[str]] = {}
+        for canonical, names in aliases.items():
+            canonical = canonical.strip().lower()
+            surfaces = [canonical] + [name.strip().lower() for name in names if name.strip()]
+            self._surfaces[canonical] = surfaces
+            for surface in surfaces:
+                self._canonical_by_surface.setdefault(surface, canonical)
+        self._vocabulary = SkillSetMatcher(self._searchable(self._canonical_by_surface))
+        self._compiled: Dict[frozenset, SkillSetMatcher] = {}
+
+    @staticmethod
+    def _searchable(canonical_by_surface: Dict[str, str]) -> Dict[str, str]:
+        return {
+            surface: canonical
+            for surface, canonical in canonical_by_surface.items()
+            if surface not in AMBIGUOUS_SURFACES
+        }
+
+    def __contains__(self, skill: str) -> bool:
+        return self.canonicalize(skill) in self._surfaces
+
+    def canonicalize(self, skill: str) -> str:
+        name = (skill or "").strip().lower()
+        return self._canonical_by_surface.get(name, name)
+
+    def canonicalize_all(self, skills: Iterable[Any]) -> List[str]:
+        """Canonical, de-duplicated skills in input order (non-strings and blanks dropped)."""
+        result: Dict[str, None] = {}
+        for skill in skills or []:
+            if isinstance(skill, str):
+                canonical = self.canonicalize(skill)
+                if canonical:
+                    result.setdefault(canonical, None)
+        return list(result)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical vocabulary skills mentioned in text, in order of first appearance."""
+        return self._vocabulary.find_ordered((text or "").lower())
+
+    def compile(self, skills: Iterable[str]) -> SkillSetMatcher:
+        """Matcher for the given skills plus their known aliases (cached per skill set)."""
+        key = frozenset(self.canonicalize_all(skills))
+        matcher = self._compiled.get(key)
+        if matcher is None:
+            surfaces: Dict[str, str] = {}
+            for canonical in key:
+                for surface in self._surfaces.get(canonical, [canonical]):
+                    surfaces.setdefault(surface, canonical)
+            matcher = SkillSetMatcher(self._searchable(surfaces))
+            if len(self._compiled) >= 1024:
+                self._compiled.clear()
+            self._compiled[key] = matcher
+        return matcher
+
+
+_taxonomy: Optional[SkillTaxonomy] = None
+
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy; built once, on first use or at startup."""
+    global _taxonomy
+    if _taxonomy is None:
+        _taxonomy = SkillTaxonomy()
+    return _taxonomy
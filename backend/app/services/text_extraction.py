@@ -0,0 +1,233 @@
+"""
+Document text extraction on a bounded process pool.
+
+PDF text extraction is pure-Python and CPU-bound: on a request thread it holds
+the GIL and stalls every other request. Extraction runs in worker processes
+(EXTRACTION_WORKERS; 0 runs inline) and works on the file bytes, so nothing
+has to be written to disk first. PDFs are read one page at a time and reading
+stops once EXTRACTION_MAX_CHARS characters (the parse prompt budget) have
+been collected. A file that takes longer than EXTRACTION_TIMEOUT_SECONDS is
+abandoned and the pool is retired: new files go to a fresh pool, and the old
+one's processes are terminated (a running worker cannot be interrupted any
+other way) once the other extractions still running on it have finished.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict, Iterator, Optional, Set
+
+from app.core.concurrency import run_blocking
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "30"))
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", "40000"))
+
+
+# -------------------------
+# EXTRACTORS (run in worker processes; module-level so they pickle)
+# -------------------------
+def iter_pdf_pages(data: bytes) -> Iterator[str]:
+    """Text of each page, parsed lazily one page at a time."""
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _collect(chunks: Iterator[str], max_chars: int) -> str:
+    parts = []
+    collected = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        collected += len(chunk) + 1
+        if collected >= max_chars:
+            break
+    return "\n".join(parts).strip()[:max_chars]
+
+
+def extract_pdf(data: bytes, max_chars: int = EXTRACTION_MAX_CHARS) -> str:
+    return _collect(iter_pdf_pages(data), max_chars)
+
+
+def extract_docx(data: bytes, max_chars: int = EXTRACTION_MAX_CHARS) -> str:
+    from docx import Document
+
+    doc = Document(BytesIO(data))
+    return _collect((p.text for p in doc.paragraphs), max_chars)
+
+
+def extract_txt(data: bytes, max_chars: int = EXTRACTION_MAX_CHARS) -> str:
+    # Decode straight from a slice of the buffer; at most 4 bytes per character
+    return str(memoryview(data)[: max_chars * 4], "utf-8", "replace").strip()[:max_chars]
+
+
+_EXTRACTORS = {
+    ".pdf": extract_pdf,
+    ".docx": extract_docx,
+    ".txt": extract_txt,
+}
+
+
+def _extract(data: bytes, ext: str, max_chars: int) -> str:
+    return _EXTRACTORS[ext](data, max_chars)
+
+
+# -------------------------
+# PROCESS POOL
+# -------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# pool -> futures a caller is still waiting on; retired pools are terminated once theirs drain
+_in_flight: Dict[ProcessPoolExecutor, Set[Future]] = {}
+_retired: Set[ProcessPoolExecutor] = set()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded server process is not safe
+                _pool = ProcessPoolExecutor(
+                    max_workers=EXTRACTION_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _submit(pool: ProcessPoolExecutor, data: bytes, ext: str, max_chars: int) -> Future:
+    future = pool.submit(_extract, _picklable(data), ext, max_chars)
+    with _pool_lock:
+        _in_flight.setdefault(pool, set()).add(future)
+    future.add_done_callback(lambda done: _settle(pool, done))
+    return future
+
+
+def _settle(pool: ProcessPoolExecutor, future: Future) -> None:
+    with _pool_lock:
+        waiting = _in_flight.get(pool)
+        if waiting is not None:
+            waiting.discard(future)
+        drained = pool in _retired and not waiting
+    if drained:
+        _terminate(pool)
+
+
+def _retire_pool(stale: ProcessPoolExecutor, abandoned: Future) -> None:
+    """
+    Stop sending work to a pool with a worker stuck on `abandoned`; the next
+    call starts a fresh pool. The stale pool is terminated once every other
+    extraction on it has finished.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is stale:
+            _pool = None
+        _retired.add(stale)
+        waiting = _in_flight.get(stale)
+        if waiting is not None:
+            waiting.discard(abandoned)
+        drained = not waiting
+    if drained:
+        _terminate(stale)
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    with _pool_lock:
+        if pool not in _retired:
+            return
+        _retired.discard(pool)
+        _in_flight.pop(pool, None)
+    # ProcessPoolExecutor cannot cancel a running task, so stop its processes directly
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _reset_after_fork() -> None:
+    global _pool, _pool_lock, _in_flight, _retired
+    _pool = None
+    _pool_lock = threading.Lock()
+    _in_flight = {}
+    _retired = set()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _picklable(data: bytes) -> bytes:
+    # memoryviews cannot be sent to a worker; bytes go as-is
+    return data if isinstance(data, bytes) else bytes(data)
+
+
+def _failed(ext: str, error: Exception) -> str:
+    print(f"Error extracting {ext.lstrip('.').upper()}: {error!r}")
+    return ""
+
+
+def extract_text(
+    data: bytes,
+    ext: str,
+    timeout: float = EXTRACTION_TIMEOUT_SECONDS,
+    max_chars: int = EXTRACTION_MAX_CHARS,
+) -> str:
+    """Text of a .pdf/.docx/.txt file given its bytes; "" when unsupported or unreadable."""
+    ext = ext.lower()
+    if ext not in _EXTRACTORS or not data:
+        return ""
+    if EXTRACTION_WORKERS <= 0:
+        try:
+            return _extract(data, ext, max_chars)
+        except Exception as e:
+            return _failed(ext, e)
+
+    pool = _get_pool()
+    future = _submit(pool, data, ext, max_chars)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        _retire_pool(pool, future)
+        return _failed(ext, TimeoutError(f"extraction took longer than {timeout:g}s"))
+    except BrokenProcessPool as e:
+        _retire_pool(pool, future)
+        return _failed(ext, e)
+    except Exception as e:
+        return _failed(ext, e)
+
+
+async def aextract_text(
+    data: bytes,
+    ext: str,
+    timeout: float = EXTRACTION_TIMEOUT_SECONDS,
+    max_chars: int = EXTRACTION_MAX_CHARS,
+) -> str:
+    """extract_text() without blocking the event loop."""
+    ext = ext.lower()
+    if ext not in _EXTRACTORS or not data:
+        return ""
+    if EXTRACTION_WORKERS <= 0:
+        try:
+            return await run_blocking(_extract, data, ext, max_chars)
+        except Exception as e:
+            return _failed(ext, e)
+
+    pool = _get_pool()
+    future = _submit(pool, data, ext, max_chars)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        _retire_pool(pool, future)
+        return _failed(ext, TimeoutError(f"extraction took longer than {timeout:g}s"))
+    except BrokenProcessPool as e:
+        _retire_pool(pool, future)
+        return _failed(ext, e)
+    except Exception as e:
+        return _failed(ext, e)
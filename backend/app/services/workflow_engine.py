@@ -0,0 +1,257 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+WORKFLOW_WORKERS = int(os.getenv("WORKFLOW_WORKERS", "8"))
+
+FINISHED_STATES = {"completed", "failed", "cancelled"}
+
+
+@dataclass
+class WorkflowTask:
+    task_id: str
+    description: str
+    task_type: str
+    status: str = "pending"
+    output: Optional[Dict[str, Any]] = None
+    depends_on: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None
+
+
+@dataclass
+class WorkflowPlan:
+    plan_id: str
+    user_goal: str
+    tasks: List[WorkflowTask]
+    estimated_completion: datetime
+    plan_details: Dict[str, Any] = field(default_factory=dict)
+    status: str = "pending"
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    version: int = 0  # bumped on every state change; lets stores drop out-of-order snapshots
+
+
+# handler(plan, task, upstream) -> task output; upstream maps each dependency's task_id to its output
+TaskHandler = Callable[[WorkflowPlan, WorkflowTask, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# Guards every status/output change so serialize_plan() sees a consistent snapshot
+_state_lock = threading.RLock()
+
+
+def snapshot_lock() -> threading.RLock:
+    """Hold while reading a plan that may be running, to get a consistent view."""
+    return _state_lock
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def serialize_plan(plan: WorkflowPlan) -> Dict[str, Any]:
+    with _state_lock:
+        finished = sum(1 for task in plan.tasks if task.status in FINISHED_STATES)
+        total = len(plan.tasks)
+        return {
+            "workflow_id": plan.plan_id,
+            "status": plan.status,
+            "user_goal": plan.user_goal,
+            "estimated_completion": plan.estimated_completion.isoformat(),
+            "progress": {
+                "percentage": round(100.0 * finished / total) if total else 100,
+                "completed_tasks": finished,
+                "total_tasks": total,
+            },
+            "tasks": [
+                {
+                    "task_id": task.task_id,
+                    "description": task.description,
+                    "task_type": task.task_type,
+                    "status": task.status,
+                    "output": task.output,
+                    "depends_on": list(task.depends_on),
+                    "error": task.error,
+                    "started_at": _iso(task.started_at),
+                    "completed_at": _iso(task.completed_at),
+                    "duration_ms": task.duration_ms,
+                }
+                for task in plan.tasks
+            ],
+            "created_at": _iso(plan.created_at),
+            "completed_at": _iso(plan.completed_at),
+        }
+
+
+class WorkflowEngine:
+    """
+    Runs workflow plans in the background as a DAG on a bounded worker pool.
+
+    Every task whose dependencies have completed is started at once, so
+    independent tasks overlap; a task's handler receives its dependencies'
+    outputs. When a task fails, everything downstream of it is cancelled
+    while unrelated branches run to completion. Handlers may fan out by
+    calling add_tasks() while they run. Starting a workflow returns
+    immediately; status polls see each task's status and timing.
+    """
+
+    def __init__(self, max_workers: int = WORKFLOW_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow")
+        self._futures: Dict[str, Future] = {}
+        self._handlers: Dict[str, Dict[str, TaskHandler]] = {}
+        self._listeners: Dict[str, Callable[[WorkflowPlan], None]] = {}
+
+    def submit(
+        self,
+        plan: WorkflowPlan,
+        handlers: Dict[str, TaskHandler],
+        on_change: Optional[Callable[[WorkflowPlan], None]] = None,
+    ) -> Future:
+        """
+        Start the plan; the returned future resolves when every task has finished.
+        on_change(plan) is called after every state change (e.g. to persist it).
+        """
+        done: Future = Future()
+        with _state_lock:
+            self._futures[plan.plan_id] = done
+            self._handlers[plan.plan_id] = handlers
+            if on_change is not None:
+                self._listeners[plan.plan_id] = on_change
+            plan.status = "running"
+            self._validate(plan)
+            self._schedule(plan)
+        self._notify(plan, on_change)
+        return done
+
+    def add_tasks(self, plan: WorkflowPlan, tasks: List[WorkflowTask]) -> None:
+        """Add tasks to a running plan (fan-out); they start once their dependencies complete."""
+        with _state_lock:
+            plan.tasks.extend(tasks)
+            self._validate(plan)
+            self._schedule(plan)
+        self._notify(plan, self._listeners.get(plan.plan_id))
+
+    def is_running(self, plan_id: str) -> bool:
+        """True while the plan's tasks run in this process."""
+        return plan_id in self._futures
+
+    def wait(self, plan_id: str, timeout: Optional[float] = None) -> None:
+        """Block until the workflow finishes (no-op when it is not running here)."""
+        future = self._futures.get(plan_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    # -------------------------
+    # SCHEDULING (callers hold _state_lock)
+    # -------------------------
+    def _validate(self, plan: WorkflowPlan) -> None:
+        known = {task.task_id for task in plan.tasks}
+        for task in plan.tasks:
+            missing = [dep for dep in task.depends_on if dep not in known]
+            if missing and task.status == "pending":
+                task.status = "failed"
+                task.error = f"Unknown dependencies: {', '.join(missing)}"
+
+    def _schedule(self, plan: WorkflowPlan) -> None:
+        plan.version += 1
+        by_id = {task.task_id: task for task in plan.tasks}
+
+        # Cancel everything downstream of a failure (repeat until no more changes)
+        changed = True
+        while changed:
+            changed = False
+            for task in plan.tasks:
+                if task.status == "pending" and any(
+                    by_id[dep].status in ("failed", "cancelled") for dep in task.depends_on
+                ):
+                    task.status = "cancelled"
+                    task.error = "Upstream task failed"
+                    changed = True
+
+        for task in plan.tasks:
+            if task.status == "pending" and all(by_id[dep].status == "completed" for dep in task.depends_on):
+                task.status = "running"
+                task.started_at = datetime.utcnow()
+                upstream = {dep: by_id[dep].output for dep in task.depends_on}
+                self._executor.submit(self._run_task, plan, task, upstream)
+
+        # Pending tasks with nothing running can never become ready: a dependency cycle
+        if not any(task.status == "running" for task in plan.tasks):
+            for task in plan.tasks:
+                if task.status == "pending":
+                    task.status = "failed"
+                    task.error = "Dependency cycle"
+
+        if all(task.status in FINISHED_STATES for task in plan.tasks):
+            self._finish(plan)
+
+    def _finish(self, plan: WorkflowPlan) -> None:
+        if plan.status != "running":
+            return
+        plan.status = "failed" if any(task.status == "failed" for task in plan.tasks) else "completed"
+        plan.completed_at = datetime.utcnow()
+        self._handlers.pop(plan.plan_id, None)
+        done = self._futures.pop(plan.plan_id, None)
+        if done is not None:
+            done.set_result(None)
+
+    # -------------------------
+    # EXECUTION (worker threads)
+    # -------------------------
+    def _run_task(self, plan: WorkflowPlan, task: WorkflowTask, upstream: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        handler = self._handlers.get(plan.plan_id, {}).get(task.task_type)
+        listener = self._listeners.get(plan.plan_id)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for task type '{task.task_type}'")
+            output = handler(plan, task, upstream)
+        except Exception as e:
+            print(f"Workflow {plan.plan_id} task {task.task_id} failed: {e}")
+            with _state_lock:
+                task.status = "failed"
+                task.error = str(e)
+                self._complete(plan, task, start)
+        else:
+            with _state_lock:
+                task.output = output
+                task.status = "completed"
+                self._complete(plan, task, start)
+
+        self._notify(plan, listener)
+
+    def _notify(self, plan: WorkflowPlan, listener: Optional[Callable[[WorkflowPlan], None]]) -> None:
+        if plan.status in FINISHED_STATES:
+            self._listeners.pop(plan.plan_id, None)
+        if listener is None:
+            return
+        try:
+            listener(plan)
+        except Exception as e:
+            print(f"Workflow {plan.plan_id} listener failed: {e}")
+
+    def _complete(self, plan: WorkflowPlan, task: WorkflowTask, start: float) -> None:
+        task.completed_at = datetime.utcnow()
+        task.duration_ms = round((time.perf_counter() - start) * 1000.0, 1)
+        self._schedule(plan)
+
+
+_engine: Optional[WorkflowEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_workflow_engine() -> WorkflowEngine:
+    """Process-wide engine shared by every PlannerAgent instance."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = WorkflowEngine()
+    return _engine
@@ -0,0 +1,89 @@
+"""
+Parsed-resume cache keyed by the content of the uploaded file.
+
+The key is the SHA-256 of the file bytes, namespaced by the parser version,
+so re-uploading the same CV (under any name, by any user) skips extraction
+and the OpenAI parse entirely. Bumping PARSER_VERSION in UploadResume.py
+starts a fresh namespace, so old entries are never read with a new schema.
+
+Entries are small JSON files under RESUME_CACHE_DIR/<version>/, written
+atomically so every worker process can share them, with an in-process LRU
+(RESUME_CACHE_ITEMS entries) in front.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+RESUME_CACHE_DIR = Path(os.getenv("RESUME_CACHE_DIR", "storage/parsed_resumes"))
+RESUME_CACHE_ITEMS = int(os.getenv("RESUME_CACHE_ITEMS", "256"))
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeCache:
+    def __init__(self, directory: Path = RESUME_CACHE_DIR, max_items: int = RESUME_CACHE_ITEMS):
+        self.directory = Path(directory)
+        self.max_items = max_items
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, version: str, digest: str) -> Path:
+        return self.directory / version / f"{digest}.json"
+
+    def get(self, version: str, digest: str) -> Optional[Dict[str, Any]]:
+        key = f"{version}:{digest}"
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        try:
+            entry = json.loads(self._path(version, digest).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Resume cache read failed: {e}")
+            return None
+
+        self._remember(key, entry)
+        return entry
+
+    def set(self, version: str, digest: str, entry: Dict[str, Any]) -> None:
+        self._remember(f"{version}:{digest}", entry)
+        path = self._path(version, digest)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Resume cache write failed: {e}")
+            tmp.unlink(missing_ok=True)
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+
+_cache: Optional[ResumeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_resume_cache() -> ResumeCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResumeCache()
+    return _cache
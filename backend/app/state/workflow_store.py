@@ -0,0 +1,256 @@
+"""
+Workflow repository: a bounded in-memory tier in front of a durable backend.
+
+Plans are saved on every state change as compact JSON (default-valued fields
+omitted, datetimes as epoch seconds, zlib above a few KB). The SQLite backend
+lives in one file shared by every uvicorn worker, so a status poll can land on
+any process. The memory tier only answers for plans that are finished
+(immutable) or were saved by this process; anything else is re-read so polls
+see progress made elsewhere. Expired workflows are dropped from both tiers.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.workflow_engine import FINISHED_STATES, WorkflowPlan, WorkflowTask, snapshot_lock
+
+WORKFLOW_STORE_BACKEND = os.getenv("WORKFLOW_STORE_BACKEND", "sqlite")
+WORKFLOW_STORE_PATH = Path(os.getenv("WORKFLOW_STORE_PATH", "storage/workflows.sqlite3"))
+WORKFLOW_TTL_SECONDS = float(os.getenv("WORKFLOW_TTL_SECONDS", str(24 * 3600)))
+WORKFLOW_CACHE_ITEMS = int(os.getenv("WORKFLOW_CACHE_ITEMS", "1000"))
+
+_COMPRESS_ABOVE = 4096
+_DATETIME_FIELDS = {"estimated_completion", "created_at", "completed_at", "started_at"}
+
+
+# -------------------------
+# SERIALIZATION
+# -------------------------
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _compact(obj: Any) -> Dict[str, Any]:
+    """Dataclass -> dict without default-valued fields; datetimes as epoch seconds."""
+    data: Dict[str, Any] = {}
+    for f in fields(obj):
+        value = getattr(obj, f.name)
+        if f.name == "tasks":
+            value = [_compact(task) for task in value]
+        elif value is None or value == [] or value == {}:
+            continue
+        elif f.name in _DATETIME_FIELDS:
+            value = value.timestamp()
+        elif f.name == "status" and value == "pending":
+            continue
+        data[f.name] = value
+    return data
+
+
+def _expand(cls, data: Dict[str, Any]):
+    values = dict(data)
+    for name in _DATETIME_FIELDS & values.keys():
+        values[name] = datetime.fromtimestamp(values[name])
+    if "tasks" in values:
+        values["tasks"] = [_expand(WorkflowTask, task) for task in values["tasks"]]
+    return cls(**values)
+
+
+def dump_plan(plan: WorkflowPlan) -> bytes:
+    with snapshot_lock():
+        payload = json.dumps(_compact(plan), separators=(",", ":"), default=_json_default).encode("utf-8")
+    if len(payload) > _COMPRESS_ABOVE:
+        return b"z" + zlib.compress(payload, 6)
+    return b"j" + payload
+
+
+def load_plan(blob: bytes) -> WorkflowPlan:
+    blob = bytes(blob)
+    payload = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    return _expand(WorkflowPlan, json.loads(payload))
+
+
+# -------------------------
+# BACKENDS
+# -------------------------
+class MemoryWorkflowBackend:
+    """Process-local backend (tests, single-worker dev servers)."""
+
+    def __init__(self):
+        self._rows: Dict[str, Tuple[int, float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, plan_id: str, version: int, blob: bytes, updated_at: float) -> None:
+        with self._lock:
+            current = self._rows.get(plan_id)
+            if current is None or version >= current[0]:
+                self._rows[plan_id] = (version, updated_at, blob)
+
+    def get(self, plan_id: str, min_updated_at: float) -> Optional[bytes]:
+        row = self._rows.get(plan_id)
+        if row is None or row[1] < min_updated_at:
+            return None
+        return row[2]
+
+    def delete_older_than(self, cutoff: float) -> None:
+        with self._lock:
+            for plan_id in [k for k, row in self._rows.items() if row[1] < cutoff]:
+                del self._rows[plan_id]
+
+
+class SQLiteWorkflowBackend:
+    """One SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path: Path = WORKFLOW_STORE_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS workflows (
+                    plan_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS workflows_updated ON workflows(updated_at)")
+            self._local.conn = conn
+        return conn
+
+    def put(self, plan_id: str, version: int, blob: bytes, updated_at: float) -> None:
+        # Snapshots can be written out of order by concurrent tasks; never let an older one win
+        with self._db() as conn:
+            conn.execute(
+                """
+                INSERT INTO workflows (plan_id, version, updated_at, data) VALUES (?, ?, ?, ?)
+                ON CONFLICT(plan_id) DO UPDATE SET
+                    version = excluded.version, updated_at = excluded.updated_at, data = excluded.data
+                WHERE excluded.version >= workflows.version
+                """,
+                (plan_id, version, updated_at, sqlite3.Binary(blob)),
+            )
+
+    def get(self, plan_id: str, min_updated_at: float) -> Optional[bytes]:
+        row = self._db().execute(
+            "SELECT data FROM workflows WHERE plan_id = ? AND updated_at >= ?", (plan_id, min_updated_at)
+        ).fetchone()
+        return row[0] if row else None
+
+    def delete_older_than(self, cutoff: float) -> None:
+        with self._db() as conn:
+            conn.execute("DELETE FROM workflows WHERE updated_at < ?", (cutoff,))
+
+
+_BACKENDS = {
+    "memory": MemoryWorkflowBackend,
+    "sqlite": SQLiteWorkflowBackend,
+}
+
+
+# -------------------------
+# REPOSITORY
+# -------------------------
+class WorkflowStore:
+    def __init__(
+        self,
+        backend=None,
+        ttl_seconds: float = WORKFLOW_TTL_SECONDS,
+        max_items: int = WORKFLOW_CACHE_ITEMS,
+    ):
+        self.backend = backend or _BACKENDS[WORKFLOW_STORE_BACKEND]()
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        # plan_id -> (saved_at, plan); plans saved here are live objects owned by this process
+        self._memory: "OrderedDict[str, Tuple[float, WorkflowPlan]]" = OrderedDict()
+        self._owned: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._saves = 0
+
+    def save(self, plan: WorkflowPlan) -> None:
+        now = time.time()
+        try:
+            self.backend.put(plan.plan_id, plan.version, dump_plan(plan), now)
+        except Exception as e:
+            print(f"Could not persist workflow {plan.plan_id}: {e}")
+        with self._lock:
+            self._owned[plan.plan_id] = now
+            self._remember(plan.plan_id, now, plan)
+            self._saves += 1
+            purge = self._saves % 200 == 1
+        if purge:
+            self.purge_expired()
+
+    def get(self, plan_id: str) -> Optional[WorkflowPlan]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(plan_id)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                saved_at, plan = entry
+                if plan_id in self._owned or plan.status in FINISHED_STATES:
+                    self._memory.move_to_end(plan_id)
+                    return plan
+
+        try:
+            blob = self.backend.get(plan_id, now - self.ttl_seconds)
+        except Exception as e:
+            print(f"Could not load workflow {plan_id}: {e}")
+            blob = None
+        if blob is None:
+            return None
+
+        plan = load_plan(blob)
+        with self._lock:
+            self._remember(plan_id, now, plan)
+        return plan
+
+    def _remember(self, plan_id: str, saved_at: float, plan: WorkflowPlan) -> None:
+        self._memory[plan_id] = (saved_at, plan)
+        self._memory.move_to_end(plan_id)
+        while len(self._memory) > self.max_items:
+            evicted, _ = self._memory.popitem(last=False)
+            self._owned.pop(evicted, None)
+
+    def purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for plan_id in [k for k, (saved_at, _) in self._memory.items() if saved_at < cutoff]:
+                del self._memory[plan_id]
+                self._owned.pop(plan_id, None)
+        try:
+            self.backend.delete_older_than(cutoff)
+        except Exception as e:
+            print(f"Could not purge workflows: {e}")
+
+
+_store: Optional[WorkflowStore] = None
+_store_lock = threading.Lock()
+
+
+def get_workflow_store() -> WorkflowStore:
+    """Process-wide store shared by every PlannerAgent instance."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = WorkflowStore()
+    return _store
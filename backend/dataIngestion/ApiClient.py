@@ -1,128 +1,305 @@
+import argparse
 import os
 import requests
-import pandas as pd
-from pathlib import Path
+import pyarrow as pa
 from dotenv import load_dotenv
-from google.cloud import bigquery
-from google.oauth2 import service_account
+from typing import Callable, Dict, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 
 # Add the project root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from backend.dataIngestion.BigqueryUpsert import upsert_dataframe_to_bigquery
+from backend.dataIngestion.BigqueryUpsert import upsert_arrow_to_bigquery
+from backend.dataIngestion.IngestState import IngestState
+from backend.dataIngestion.JobTransform import transform_page
 from app.core.env import require_env
+from app.memory.inverted_index import PersistedIndexUpdater, update_persisted_index
+from backend.dataIngestion.JobEmbeddings import JobEmbeddingWriter, embed_jobs
 
-OPENAI_KEY = require_env("OPENAI_API_KEY")
-self.client = OpenAI(api_key=OPENAI_KEY)
 
+# API setup
+DATASET_URL = "https://api.apify.com/v2/datasets/GHL1cZOFH5JAEpkmI/items"
 
-# Set up credentials
-credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-credentials = service_account.Credentials.from_service_account_file(credentials_path)
-client = bigquery.Client(credentials=credentials, project='agentic-jobsearch')
+# Items per request; each page is transformed and released before the next one is fetched
+PAGE_SIZE = int(os.getenv("APIFY_PAGE_SIZE", "1000"))
+# Rows buffered before an upsert (each upsert is a load job + MERGE, so not once per page)
+UPLOAD_ROWS = int(os.getenv("INGEST_UPLOAD_ROWS", "5000"))
+REQUEST_TIMEOUT = float(os.getenv("APIFY_TIMEOUT_SECONDS", "60"))
+# Jobs upserted between rewrites of the keyword index and job vectors (and the checkpoint that follows)
+INDEX_SAVE_ROWS = int(os.getenv("INGEST_INDEX_SAVE_ROWS", "50000"))
 
-# API setup
-url = "https://api.apify.com/v2/datasets/GHL1cZOFH5JAEpkmI/items"
-API_TOKEN = os.getenv('APIFY_API_KEY')
-
-payload = {}
-headers = {
-    'Accept': 'application/json',
-    'Authorization': f'Bearer {API_TOKEN}'
-}
-
-try:
-    response = requests.request("GET", url, headers=headers, data=payload)
-    response.raise_for_status()
-    
-    data = response.json()
-    df = pd.DataFrame(data)
-    
-    # Create company DataFrame
-    company_df = df[['company', 'company_url', 'company_urn']].drop_duplicates()
-    
-    # Remove rows where company_urn is null or empty
-    company_df = company_df.dropna(subset=['company_urn'])
-    company_df = company_df[company_df['company_urn'].str.strip() != '']
-    
-    # Create job details DataFrame
-    job_details_df = df[[
-        'job_id', 'job_title', 'job_url', 'location', 'work_type', 'salary',
-        'posted_at', 'posted_at_epoch', 'skills', 'benefits', 'is_easy_apply',
-        'is_promoted', 'applicant_count', 'description', 'created_at',
-        'created_at_epoch', 'geo_id', 'navigation_subtitle', 'is_verified',
-        'job_insights', 'apply_url', 'company_urn'
-    ]].copy()  # Add .copy() to avoid SettingWithCopyWarning
-    
-    # Convert array columns to strings
-    if 'skills' in job_details_df.columns:
-        job_details_df['skills'] = job_details_df['skills'].apply(
-            lambda x: ', '.join(x) if isinstance(x, list) else str(x) if x is not None else ''
-        )
-    
-    if 'benefits' in job_details_df.columns:
-        job_details_df['benefits'] = job_details_df['benefits'].apply(
-            lambda x: ', '.join(x) if isinstance(x, list) else str(x) if x is not None else ''
-        )
-    
-    if 'job_insights' in job_details_df.columns:
-        job_details_df['job_insights'] = job_details_df['job_insights'].apply(
-            lambda x: ', '.join(x) if isinstance(x, list) else str(x) if x is not None else ''
+COMPANY_TABLE = "agentic-jobsearch.job_search.company"
+JOB_DETAILS_TABLE = "agentic-jobsearch.job_search.job_details"
+JOB_EMBEDDINGS_TABLE = "agentic-jobsearch.job_search.job_embeddings"
+PROJECT = "agentic-jobsearch"
+
+
+# -------------------------
+# FETCHING
+# -------------------------
+def make_session(api_token: str) -> requests.Session:
+    """Keep-alive session that retries throttling and transient server errors with backoff."""
+    retry = Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.headers.update({
+        'Accept': 'application/json',
+        'Authorization': f'Bearer {api_token}'
+    })
+    return session
+
+
+def iter_pages(
+    session: requests.Session,
+    url: str = DATASET_URL,
+    page_size: int = PAGE_SIZE,
+    offset: int = 0,
+) -> Iterator[List[Dict]]:
+    """Dataset items one page at a time (offset/limit), until a short or empty page."""
+    while True:
+        response = session.get(
+            url,
+            params={"offset": offset, "limit": page_size, "format": "json", "clean": "true"},
+            timeout=REQUEST_TIMEOUT,
         )
-    
-    # Convert numeric columns to integers (for BigQuery INT64)
-    if 'applicant_count' in job_details_df.columns:
-        job_details_df['applicant_count'] = pd.to_numeric(job_details_df['applicant_count'], errors='coerce').fillna(0).astype(int)
-    
-    if 'posted_at_epoch' in job_details_df.columns:
-        job_details_df['posted_at_epoch'] = pd.to_numeric(job_details_df['posted_at_epoch'], errors='coerce').fillna(0).astype(int)
-    
-    if 'created_at_epoch' in job_details_df.columns:
-        job_details_df['created_at_epoch'] = pd.to_numeric(job_details_df['created_at_epoch'], errors='coerce').fillna(0).astype(int)
-    
-    # Convert timestamp columns from string to timezone-aware datetime (for TIMESTAMP type)
-    if 'posted_at' in job_details_df.columns:
-        job_details_df['posted_at'] = pd.to_datetime(job_details_df['posted_at'], errors='coerce', utc=True)
-    
-    if 'created_at' in job_details_df.columns:
-        job_details_df['created_at'] = pd.to_datetime(job_details_df['created_at'], errors='coerce', utc=True)
-    
-    # Remove rows where job_id or company_urn is null
-    job_details_df = job_details_df.dropna(subset=['job_id', 'company_urn'])
-    job_details_df = job_details_df[job_details_df['job_id'].str.strip() != '']
-    job_details_df = job_details_df[job_details_df['company_urn'].str.strip() != '']
-    
-    print(f"Company DataFrame shape: {company_df.shape}")
-    print(f"Job Details DataFrame shape: {job_details_df.shape}")
-    
-    # Check data types
-    print("\nData types:")
-    print(job_details_df[['posted_at', 'created_at', 'skills', 'applicant_count', 'is_easy_apply']].dtypes)
-    
-    # Load data into BigQuery only if we have valid data
-    if not company_df.empty:
-        company_df_copy = company_df.copy()
-        upsert_dataframe_to_bigquery(
-            df=company_df_copy,
-            destination="agentic-jobsearch.job_search.company",
+        response.raise_for_status()
+        items = response.json()
+        if not items:
+            return
+        yield items
+        offset += len(items)
+        if len(items) < page_size:
+            return
+
+
+# -------------------------
+# UPLOADING
+# -------------------------
+def upload_companies(batches: List[pa.RecordBatch]) -> int:
+    rows = sum(batch.num_rows for batch in batches)
+    if rows:
+        upsert_arrow_to_bigquery(
+            data=batches,
+            destination=COMPANY_TABLE,
             key_columns="company_urn",
-            project="agentic-jobsearch"
+            project=PROJECT
         )
-        print("Company data successfully loaded!")
-    else:
-        print("No valid company data to load (all company_urn values are null)")
-    
-    if not job_details_df.empty:
-        upsert_dataframe_to_bigquery(
-            df=job_details_df,
-            destination="agentic-jobsearch.job_search.job_details",
+    return rows
+
+
+def upload_jobs(
+    batches: List[pa.RecordBatch],
+    index: Optional[PersistedIndexUpdater] = None,
+    embeddings: Optional[JobEmbeddingWriter] = None,
+) -> int:
+    """
+    Upsert job rows, then index and embed them. With an index updater and an
+    embedding writer the keyword index and the jobs vector store are updated
+    in memory and the caller decides when to save them; without them both
+    files are updated right away.
+    """
+    rows = sum(batch.num_rows for batch in batches)
+    if not rows:
+        return 0
+
+    job_details = pa.Table.from_batches(batches)
+    upsert_arrow_to_bigquery(
+        data=job_details,
+        destination=JOB_DETAILS_TABLE,
+        key_columns="job_id",
+        project=PROJECT
+    )
+
+    # Keep the BM25 search index in step with the upserted rows
+    docs = job_details.select(['job_id', 'job_title', 'description', 'skills']).to_pylist()
+    indexed = index.add(docs) if index is not None else update_persisted_index(docs)
+    print(f"Indexed {indexed} jobs for keyword search")
+
+    # Embed new/changed postings once, here, instead of at query time
+    embedding_rows = embeddings.embed(docs) if embeddings is not None else embed_jobs(docs)
+    if embedding_rows:
+        upsert_arrow_to_bigquery(
+            data=pa.Table.from_pylist(embedding_rows),
+            destination=JOB_EMBEDDINGS_TABLE,
             key_columns="job_id",
-            project="agentic-jobsearch"
+            project=PROJECT,
+            create_if_missing=True,
         )
-        print("Job details data successfully loaded!")
-    else:
-        print("No valid job details data to load (all key values are null)")
+        print(f"Stored {len(embedding_rows)} job embeddings")
+    return rows
+
+
+class BatchBuffer:
+    """
+    Collects record batches and hands them to upload() every `rows` rows.
+    before() runs ahead of each upload; after(hashes) runs once it succeeded,
+    with the content hashes of the rows it covered.
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[List[pa.RecordBatch]], int],
+        rows: int = UPLOAD_ROWS,
+        before: Optional[Callable[[], None]] = None,
+        after: Optional[Callable[[Dict[str, str]], None]] = None,
+    ):
+        self.upload = upload
+        self.rows = rows
+        self.before = before
+        self.after = after
+        self.batches: List[pa.RecordBatch] = []
+        self.hashes: Dict[str, str] = {}
+        self.buffered = 0
+        self.uploaded = 0
+
+    def add(self, batch: pa.RecordBatch, hashes: Optional[Dict[str, str]] = None) -> None:
+        if batch.num_rows:
+            self.batches.append(batch)
+            self.hashes.update(hashes or {})
+            self.buffered += batch.num_rows
+        if self.buffered >= self.rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.batches:
+            return
+        if self.before is not None:
+            self.before()
+        self.uploaded += self.upload(self.batches)
+        hashes = self.hashes
+        self.batches = []
+        self.hashes = {}
+        self.buffered = 0
+        if self.after is not None:
+            self.after(hashes)
+
+
+# -------------------------
+# PIPELINE
+# -------------------------
+def ingest(
+    session: requests.Session,
+    url: str = DATASET_URL,
+    page_size: int = PAGE_SIZE,
+    state: Optional[IngestState] = None,
+    full: bool = False,
+) -> Dict[str, int]:
+    """
+    Stream the dataset page by page: transform each page into Arrow batches and
+    upsert them in UPLOAD_ROWS chunks. Only one page plus one upload chunk is
+    held in memory at a time.
+
+    With a state store the run is incremental: fetching resumes at the
+    checkpointed offset (unless full=True) and only rows whose content hash
+    changed since their last upload are sent, so MERGE work tracks the delta
+    rather than the whole history.
+    """
+    offset = 0
+    if state is not None and not full:
+        offset = state.checkpoint(url)
+    progress = {"offset": offset, "committed_jobs": 0}
+
+    index = PersistedIndexUpdater()
+    embeddings = JobEmbeddingWriter()
+    # Job hashes are remembered only once the keyword index and vectors covering
+    # them are on disk, so rows lost by a crash are re-upserted and re-indexed
+    unsaved_job_hashes: Dict[str, str] = {}
+
+    def commit():
+        index.save()
+        embeddings.save()
+        if state is not None:
+            state.remember("job", unsaved_job_hashes)
+            state.save_checkpoint(url, progress["offset"])
+        unsaved_job_hashes.clear()
+        progress["committed_jobs"] = jobs.uploaded
+
+    def companies_uploaded(hashes):
+        if state is not None:
+            state.remember("company", hashes)
+
+    def jobs_uploaded(hashes):
+        unsaved_job_hashes.update(hashes)
+        # Every page read so far is fully upserted (companies flush before jobs);
+        # the index and vector files are rewritten, and the checkpoint moved, every INDEX_SAVE_ROWS jobs
+        if jobs.uploaded - progress["committed_jobs"] >= INDEX_SAVE_ROWS:
+            commit()
+
+    companies = BatchBuffer(upload_companies, after=companies_uploaded)
+    # Companies are always upserted before the jobs that reference them
+    jobs = BatchBuffer(lambda batches: upload_jobs(batches, index, embeddings), before=companies.flush, after=jobs_uploaded)
+    seen_companies = set()
+    items_seen = 0
+    unchanged = 0
+
+    if offset:
+        print(f"Resuming at item {offset}")
+
+    for page in iter_pages(session, url, page_size, offset=offset):
+        items_seen += len(page)
+        company_batch, job_batch = transform_page(page, seen_companies)
+
+        company_hashes = job_hashes = None
+        if state is not None:
+            valid_jobs = job_batch.num_rows
+            company_batch, company_hashes = state.changed_rows("company", company_batch, "company_urn")
+            job_batch, job_hashes = state.changed_rows("job", job_batch, "job_id")
+            unchanged += valid_jobs - job_batch.num_rows
+
+        progress["offset"] += len(page)
+
+        companies.add(company_batch, company_hashes)
+        jobs.add(job_batch, job_hashes)
+        print(
+            f"Fetched {items_seen} items "
+            f"({jobs.uploaded + jobs.buffered} new or changed jobs, {unchanged} unchanged)"
+        )
+
+    jobs.flush()
+    companies.flush()
+    commit()
+
+    return {
+        "items": items_seen,
+        "companies": companies.uploaded,
+        "jobs": jobs.uploaded,
+        "unchanged_jobs": unchanged,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the Apify job dataset into BigQuery")
+    parser.add_argument("--full", action="store_true", help="re-read the dataset from the start (unchanged rows are still skipped)")
+    parser.add_argument("--force", action="store_true", help="forget content hashes and re-upsert every row")
+    args = parser.parse_args()
+
+    load_dotenv()
+    session = make_session(require_env('APIFY_API_KEY'))
+    state = IngestState()
+    if args.force:
+        state.forget(["company", "job"])
+    try:
+        stats = ingest(session, state=state, full=args.full or args.force)
+        print(
+            f"Ingested {stats['items']} items: "
+            f"{stats['companies']} companies, {stats['jobs']} job details "
+            f"({stats['unchanged_jobs']} unchanged jobs skipped)"
+        )
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    finally:
+        session.close()
+        state.close()
+
 
-except Exception as e:
-    print(f"An error occurred: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,124 @@
+from __future__ import annotations
+
 import os
-from typing import Iterable, List
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from google.cloud import bigquery
+
+from app.services.bigquery_client import get_bq_client as shared_bq_client
+
+# "bigquery" (default) or "mirror" (local DuckDB/Parquet copy, see JobMirror.py)
+SEARCH_BACKEND = os.getenv("JOB_SEARCH_BACKEND", "bigquery")
+# "recency" (LIKE match ordered by posted_at) or "bm25" (in-process index, see app/memory/inverted_index.py)
+SEARCH_RANKING = os.getenv("JOB_SEARCH_RANKING", "recency")
+
+JOB_COLUMNS = [
+    "job_id",
+    "job_title",
+    "company_urn",
+    "job_url",
+    "description",
+    "skills",
+    "location",
+    "posted_at",
+    "applicant_count",
+    "skill_tags",
+]
+
+JOB_DETAIL_COLUMNS = [
+    "jd.job_id",
+    "jd.job_title",
+    "c.company",
+    "c.company_url",
+    "jd.location",
+    "jd.work_type",
+    "jd.salary",
+    "jd.skills",
+    "jd.description",
+    "jd.posted_at",
+    "jd.job_url",
+    "jd.applicant_count",
+    "jd.is_easy_apply",
+    "jd.benefits",
+    "jd.skill_tags",
+]
 
-from google.cloud import bigquery
-from google.oauth2 import service_account
+# Optional AND-ed filters accepted by search_job_details: filter name -> column
+DETAIL_FILTERS = {
+    "location": "jd.location",
+    "company": "c.company",
+    "work_type": "jd.work_type",
+}
 
 
 def get_bq_client() -> bigquery.Client:
     """
-    Initializes a BigQuery client using GOOGLE_APPLICATION_CREDENTIALS.
+    Returns the shared, pooled BigQuery client for GOOGLE_PROJECT_ID.
     """
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if not credentials_path:
-        raise RuntimeError("Missing GOOGLE_APPLICATION_CREDENTIALS")
+    return shared_bq_client(os.getenv("GOOGLE_PROJECT_ID"))
+
+
+class BigQueryBackend:
+    """Runs search SQL directly against the job_search dataset in BigQuery."""
+
+    name = "bigquery"
+
+    def table(self, name: str) -> str:
+        return f"`agentic-jobsearch.job_search.{name}`"
+
+    def param(self, name: str) -> str:
+        return f"@{name}"
 
-    project_id = os.getenv("GOOGLE_PROJECT_ID")
-    if not project_id:
-        raise RuntimeError("Missing GOOGLE_PROJECT_ID")
+    def in_list(self, column: str, name: str) -> str:
+        return f"{column} IN UNNEST(@{name})"
 
-    credentials = service_account.Credentials.from_service_account_file(
-        credentials_path
-    )
+    def query(self, sql: str, params: Dict[str, Any]) -> List[Dict]:
+        from google.cloud import bigquery
 
-    return bigquery.Client(credentials=credentials, project=project_id)
+        query_parameters = []
+        for key, value in params.items():
+            if isinstance(value, (list, tuple)):
+                query_parameters.append(bigquery.ArrayQueryParameter(key, "STRING", list(value)))
+            elif isinstance(value, int):
+                query_parameters.append(bigquery.ScalarQueryParameter(key, "INT64", value))
+            else:
+                query_parameters.append(bigquery.ScalarQueryParameter(key, "STRING", value))
+
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+        results = get_bq_client().query(sql, job_config=job_config).result()
+        return [dict(row) for row in results]
+
+
+_backends: Dict[str, Any] = {}
+_backends_lock = threading.Lock()
+
+
+def get_search_backend(name: Optional[str] = None):
+    """
+    Returns the search backend registered under `name` (defaults to JOB_SEARCH_BACKEND).
+    """
+    name = (name or SEARCH_BACKEND).lower()
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name == "bigquery":
+                backend = BigQueryBackend()
+            elif name == "mirror":
+                from dataIngestion.JobMirror import MirrorBackend
+
+                backend = MirrorBackend()
+            else:
+                raise ValueError(f"Unknown search backend: {name}")
+            _backends[name] = backend
+    return backend
 
 
 def _normalize_terms(terms: Iterable[str]) -> List[str]:
@@ -30,10 +127,7 @@ def _normalize_terms(terms: Iterable[str]) -> List[str]:
     for term in terms or []:
         if not term:
             continue
-        cleaned = (
-            term.replace("'", "''")
-            .strip()
-        )
+        cleaned = term.strip()
         if not cleaned:
             continue
         lowered = cleaned.lower()
@@ -44,7 +138,24 @@ def _normalize_terms(terms: Iterable[str]) -> List[str]:
     return normalized
 
 
-def search_jobs(terms: Iterable[str], limit: int = 10):
+def _keyword_clause(backend, terms: List[str], prefix: str, params: Dict[str, Any]) -> str:
+    """OR of case-insensitive LIKE matches over title, description and skills."""
+    conditions = []
+    for i, term in enumerate(terms):
+        key = f"term{i}"
+        params[key] = f"%{term.lower()}%"
+        placeholder = backend.param(key)
+        conditions.append(
+            f"""(
+                LOWER({prefix}job_title) LIKE {placeholder} OR
+                LOWER({prefix}description) LIKE {placeholder} OR
+                LOWER({prefix}skills) LIKE {placeholder}
+            )"""
+        )
+    return " OR ".join(conditions)
+
+
+def search_jobs(terms: Iterable[str], limit: int = 10, backend: Optional[str] = None):
     """
     Performs a keyword search across job_details using multiple terms combined with OR.
     """
@@ -53,55 +164,180 @@ def search_jobs(terms: Iterable[str], limit: int = 10):
     if not normalized_terms:
         return []
 
-    client = get_bq_client()
+    engine = get_search_backend(backend)
 
-    conditions = []
-    for term in normalized_terms:
-        like_clause = f"%{term}%"
-        conditions.append(
-            f"""(
-                LOWER(job_title) LIKE LOWER('{like_clause}') OR
-                LOWER(description) LIKE LOWER('{like_clause}') OR
-                LOWER(skills) LIKE LOWER('{like_clause}')
-            )"""
-        )
+    if SEARCH_RANKING == "bm25":
+        ranked = _search_index(engine, normalized_terms, limit)
+        if ranked is not None:
+            return ranked
 
-    where_clause = " OR ".join(conditions)
+    params: Dict[str, Any] = {"limit": int(limit)}
+    where_clause = _keyword_clause(engine, normalized_terms, "", params)
 
     sql = f"""
     SELECT
-        job_id,
-        job_title,
-        company_urn,
-        job_url,
-        description,
-        skills,
-        location,
-        posted_at,
-        applicant_count
-    FROM `agentic-jobsearch.job_search.job_details`
+        {", ".join(JOB_COLUMNS)}
+    FROM {engine.table("job_details")}
     WHERE {where_clause}
     ORDER BY posted_at DESC
-    LIMIT {limit}
+    LIMIT {engine.param("limit")}
     """
 
-    results = client.query(sql).result()
-    return [dict(row) for row in results]
+    return engine.query(sql, params)
 
 
-def get_company_info(company_urn: str):
+def _search_index(engine, terms: List[str], limit: int) -> Optional[List[Dict]]:
     """
-    Fetch company name + URL from company table.
+    BM25 top-k from the in-process index, hydrated with one lookup by job_id.
+    Returns None when no index has been built so callers fall back to SQL.
     """
+    from app.memory.inverted_index import get_job_index
+
+    index = get_job_index()
+    if index is None:
+        return None
+
+    hits = index.search(terms, k=limit)
+    if not hits:
+        return []
+
+    rows = get_jobs_by_ids([job_id for job_id, _ in hits], engine=engine)
+    scores = dict(hits)
+    for row in rows:
+        row["relevance"] = round(scores[row["job_id"]], 4)
+    return rows
 
-    client = get_bq_client()
 
+def get_jobs_by_ids(job_ids: List[str], backend: Optional[str] = None, engine=None) -> List[Dict]:
+    """
+    Fetch job rows for the given ids with one query, preserving the order of job_ids.
+    """
+    if not job_ids:
+        return []
+
+    engine = engine or get_search_backend(backend)
     sql = f"""
-    SELECT company, company_url
-    FROM `agentic-jobsearch.job_search.company`
-    WHERE company_urn = '{company_urn}'
-    LIMIT 1
+    SELECT
+        {", ".join(JOB_COLUMNS)}
+    FROM {engine.table("job_details")}
+    WHERE {engine.in_list("job_id", "job_ids")}
+    """
+    rows = {row["job_id"]: row for row in engine.query(sql, {"job_ids": list(job_ids)})}
+    return [rows[job_id] for job_id in job_ids if job_id in rows]
+
+
+def search_job_details(
+    keywords: Iterable[str],
+    filters: Optional[Dict[str, str]] = None,
+    limit: int = 10,
+    backend: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Keyword search joined with company info, with optional location/company/work_type filters.
+    """
+
+    engine = get_search_backend(backend)
+    params: Dict[str, Any] = {"limit": int(limit)}
+    conditions = []
+
+    normalized_terms = _normalize_terms(keywords)
+    if normalized_terms:
+        conditions.append(f"({_keyword_clause(engine, normalized_terms, 'jd.', params)})")
+
+    for key, column in DETAIL_FILTERS.items():
+        value = (filters or {}).get(key)
+        if value:
+            params[key] = f"%{value.lower()}%"
+            conditions.append(f"LOWER({column}) LIKE {engine.param(key)}")
+
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+    sql = f"""
+    SELECT
+        {", ".join(JOB_DETAIL_COLUMNS)}
+    FROM {engine.table("job_details")} jd
+    JOIN {engine.table("company")} c
+        ON jd.company_urn = c.company_urn
+    WHERE {where_clause}
+    ORDER BY jd.posted_at DESC
+    LIMIT {engine.param("limit")}
+    """
+
+    return engine.query(sql, params)
+
+
+# Process-local LRU company cache: (backend name, company_urn) -> (expires_at, row or None)
+COMPANY_CACHE_TTL_SECONDS = int(os.getenv("COMPANY_CACHE_TTL_SECONDS", "3600"))
+COMPANY_CACHE_MAX_ITEMS = int(os.getenv("COMPANY_CACHE_MAX_ITEMS", "10000"))
+_company_cache: "OrderedDict[Tuple[str, str], Tuple[float, Optional[Dict]]]" = OrderedDict()
+_company_cache_lock = threading.Lock()
+
+
+def _remember_companies(backend_name: str, rows: Dict[str, Optional[Dict]], expires_at: float) -> None:
+    now = time.monotonic()
+    with _company_cache_lock:
+        for urn, row in rows.items():
+            _company_cache[(backend_name, urn)] = (expires_at, row)
+            _company_cache.move_to_end((backend_name, urn))
+        # Drop expired entries from the least recently used end, then bound the size
+        while _company_cache:
+            key, (entry_expires_at, _) = next(iter(_company_cache.items()))
+            if entry_expires_at > now and len(_company_cache) <= COMPANY_CACHE_MAX_ITEMS:
+                break
+            del _company_cache[key]
+
+
+def get_companies_info(company_urns: Iterable[str], backend: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Fetch company name + URL for many companies with a single query.
+    Results (including misses) are cached per process and backend for
+    COMPANY_CACHE_TTL_SECONDS, keeping at most COMPANY_CACHE_MAX_ITEMS urns.
+    Returns a dict keyed by company_urn; unknown urns are omitted.
+    """
+
+    urns = list(dict.fromkeys(urn for urn in company_urns or [] if urn))
+    if not urns:
+        return {}
+
+    engine = get_search_backend(backend)
+    now = time.monotonic()
+    found: Dict[str, Dict] = {}
+    missing: List[str] = []
+
+    with _company_cache_lock:
+        for urn in urns:
+            cached = _company_cache.get((engine.name, urn))
+            if cached and cached[0] > now:
+                _company_cache.move_to_end((engine.name, urn))
+                if cached[1] is not None:
+                    found[urn] = cached[1]
+            else:
+                missing.append(urn)
+
+    if not missing:
+        return found
+
+    sql = f"""
+    SELECT company_urn, company, company_url
+    FROM {engine.table("company")}
+    WHERE {engine.in_list("company_urn", "urns")}
+    """
+
+    fetched: Dict[str, Dict] = {}
+    for record in engine.query(sql, {"urns": missing}):
+        urn = record.pop("company_urn")
+        fetched.setdefault(urn, record)
+
+    expires_at = time.monotonic() + COMPANY_CACHE_TTL_SECONDS
+    _remember_companies(engine.name, {urn: fetched.get(urn) for urn in missing}, expires_at)
+
+    found.update(fetched)
+    return found
+
+
+def get_company_info(company_urn: str):
+    """
+    Fetch company name + URL from company table.
     """
 
-    rows = [dict(r) for r in client.query(sql).result()]
-    return rows[0] if rows else None
+    return get_companies_info([company_urn]).get(company_urn)
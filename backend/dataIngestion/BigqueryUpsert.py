@@ -1,16 +1,50 @@
 """
-bq_upsert.py — Upsert a pandas DataFrame into BigQuery
+bq_upsert.py — Upsert a pandas DataFrame or Arrow data into BigQuery
 Requires: google-cloud-bigquery, pandas, pyarrow
+
+Each upsert is one load job into a staging table plus one MERGE query.
+Destination schemas are fetched once per process and cached (clear_schema_cache()
+after an ALTER TABLE), and the MERGE statement is built once per
+(destination, columns, keys) and reused with the staging table substituted in.
+Arrow tables and record batches are written to Parquet in memory and loaded
+with load_table_from_file, without going through pandas.
 """
 
 from __future__ import annotations
+import io
+import threading
 import uuid
-from typing import Iterable, Sequence, Optional, Union
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Optional, Tuple, Union
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from google.api_core.exceptions import NotFound
+from google.api_core.exceptions import BadRequest, NotFound
 from google.cloud import bigquery
 
+from app.services.bigquery_client import get_bq_client
+
+ArrowData = Union[pa.Table, pa.RecordBatch, Sequence[pa.RecordBatch]]
+
+# Arrow type each scalar BigQuery type is loaded from (others are passed through as-is)
+_ARROW_TYPES = {
+    "STRING": pa.string(),
+    "INTEGER": pa.int64(),
+    "INT64": pa.int64(),
+    "FLOAT": pa.float64(),
+    "FLOAT64": pa.float64(),
+    "BOOLEAN": pa.bool_(),
+    "BOOL": pa.bool_(),
+    "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+    "DATETIME": pa.timestamp("us"),
+    "DATE": pa.date32(),
+}
+
+# destination table id -> schema, fetched once per process
+_schemas: Dict[str, List[bigquery.SchemaField]] = {}
+_schemas_lock = threading.Lock()
+
 
 def _fq(table: str) -> str:
     # Ensure table id is backtick-quoted and fully qualified
@@ -21,17 +55,185 @@ def _fq(table: str) -> str:
     raise ValueError("table must be fully qualified as project.dataset.table")
 
 
-def _list_cols_from_table(client: bigquery.Client, table_fq: str) -> Sequence[str]:
-    tbl = client.get_table(table_fq.strip("`"))
-    return [f.name for f in tbl.schema]
+def _bigquery_type(arrow_type: pa.DataType) -> str:
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "STRING"
+    if pa.types.is_integer(arrow_type):
+        return "INT64"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT64"
+    if pa.types.is_boolean(arrow_type):
+        return "BOOL"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP" if arrow_type.tz else "DATETIME"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    raise ValueError(f"No BigQuery column type for Arrow type {arrow_type}")
+
+
+def _bigquery_schema(schema: pa.Schema) -> List[bigquery.SchemaField]:
+    """BigQuery columns for an Arrow schema (list<T> columns become REPEATED T)."""
+    fields = []
+    for field in schema:
+        arrow_type, mode = field.type, "NULLABLE"
+        if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+            arrow_type, mode = arrow_type.value_type, "REPEATED"
+        fields.append(bigquery.SchemaField(field.name, _bigquery_type(arrow_type), mode=mode))
+    return fields
+
 
+def _destination_schema(
+    client: bigquery.Client,
+    dest_fq: str,
+    create_schema: Optional[Sequence[bigquery.SchemaField]] = None,
+    clustering_fields: Optional[Sequence[str]] = None,
+    time_partitioning: Optional[bigquery.TimePartitioning] = None,
+) -> List[bigquery.SchemaField]:
+    """The destination's schema; a missing table is created with create_schema when given."""
+    table_id = dest_fq.strip("`")
+    schema = _schemas.get(table_id)
+    if schema is not None:
+        return schema
 
-def _table_exists(client: bigquery.Client, table_fq: str) -> bool:
     try:
-        client.get_table(table_fq.strip("`"))
-        return True
+        schema = list(client.get_table(table_id).schema)
     except NotFound:
-        return False
+        if create_schema is None:
+            raise NotFound(f"Destination table {dest_fq} not found and create_if_missing=False")
+        table = bigquery.Table(table_id, schema=list(create_schema))
+        if clustering_fields:
+            table.clustering_fields = list(clustering_fields)
+        if time_partitioning is not None:
+            table.time_partitioning = time_partitioning
+        schema = list(client.create_table(table, exists_ok=True).schema)
+    with _schemas_lock:
+        _schemas[table_id] = schema
+    return schema
+
+
+def clear_schema_cache(destination: Optional[str] = None) -> None:
+    """Forget cached destination schemas (all of them, or one table's)."""
+    with _schemas_lock:
+        if destination is None:
+            _schemas.clear()
+        else:
+            _schemas.pop(destination.strip("`"), None)
+
+
+@lru_cache(maxsize=64)
+def _merge_template(dest_fq: str, merge_columns: Tuple[str, ...], key_cols: Tuple[str, ...]) -> str:
+    """MERGE statement for one (destination, columns, keys) with a {staging} placeholder."""
+    # Deduplicate staging on key in case the data has duplicates
+    key_expr = ", ".join([f"`{c}`" for c in key_cols])
+    on_expr = " AND ".join([f"T.`{c}` = S.`{c}`" for c in key_cols])
+
+    # Build update set list excluding key columns by default
+    update_cols = [c for c in merge_columns if c not in key_cols]
+    update_set = ", ".join([f"`{c}` = S.`{c}`" for c in update_cols]) if update_cols else ""
+
+    insert_cols = ", ".join([f"`{c}`" for c in merge_columns])
+    insert_vals = ", ".join([f"S.`{c}`" for c in merge_columns])
+
+    merge_sql = f"""
+    MERGE {dest_fq} T
+    USING (
+      SELECT * EXCEPT(rn) FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY {key_expr} ORDER BY CURRENT_TIMESTAMP()) rn
+        FROM {{staging}}
+      )
+      WHERE rn = 1
+    ) S
+    ON {on_expr}
+    {"WHEN MATCHED THEN UPDATE SET " + update_set if update_set else ""}
+    WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals})
+    """
+    return merge_sql
+
+
+def _key_list(key_columns: Union[str, Iterable[str]]) -> List[str]:
+    if isinstance(key_columns, str):
+        key_cols = [key_columns]
+    else:
+        key_cols = list(key_columns)
+    if not key_cols:
+        raise ValueError("key_columns must be provided")
+    return key_cols
+
+
+def _arrow_type(field: bigquery.SchemaField) -> Optional[pa.DataType]:
+    arrow_type = _ARROW_TYPES.get(field.field_type)
+    if arrow_type is not None and field.mode == "REPEATED":
+        return pa.list_(arrow_type)
+    return arrow_type
+
+
+def _as_table(data: ArrowData) -> pa.Table:
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    if isinstance(data, pa.Table):
+        return data
+    return pa.Table.from_batches(list(data))
+
+
+def _arrow_schema(data: ArrowData) -> pa.Schema:
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return data.schema
+    batches = list(data)
+    return batches[0].schema if batches else pa.schema([])
+
+
+def _column_names(data: ArrowData) -> List[str]:
+    return list(_arrow_schema(data).names)
+
+
+def _to_arrow_table(data: ArrowData, schema: Sequence[bigquery.SchemaField]) -> pa.Table:
+    """The destination columns present in data, in destination order, cast to their load types."""
+    table = _as_table(data)
+
+    columns, fields = [], []
+    for field in schema:
+        if field.name not in table.column_names:
+            continue
+        column = table.column(field.name)
+        arrow_type = _arrow_type(field)
+        if arrow_type is not None and column.type != arrow_type:
+            column = column.cast(arrow_type)
+        columns.append(column)
+        fields.append(pa.field(field.name, column.type))
+    return pa.Table.from_arrays(columns, schema=pa.schema(fields))
+
+
+def _merge_from_staging(
+    client: bigquery.Client,
+    destination: str,
+    dest_fq: str,
+    merge_columns: List[str],
+    key_cols: List[str],
+    staging_table: Optional[str],
+    load,
+) -> None:
+    """load(staging table id) into staging, MERGE it into the destination, drop staging."""
+    if not set(key_cols).issubset(set(merge_columns)):
+        missing = set(key_cols) - set(merge_columns)
+        raise ValueError(f"Key columns {missing} not found in DataFrame/staging table")
+
+    # Create a temporary staging table if not provided
+    if staging_table is None:
+        project_id, dataset_id, table_id = destination.strip("`").split(".")
+        staging_table = f"{project_id}.{dataset_id}.{table_id}__stg_{uuid.uuid4().hex[:8]}"
+    staging_fq = _fq(staging_table)
+
+    merge_sql = _merge_template(dest_fq, tuple(merge_columns), tuple(key_cols)).format(staging=staging_fq)
+    try:
+        load(staging_fq.strip("`")).result()  # wait for load to finish
+        client.query(merge_sql).result()
+    except BadRequest:
+        # Most likely the destination schema changed under the cached copy
+        clear_schema_cache(dest_fq)
+        raise
+    finally:
+        # Drop staging table
+        client.delete_table(staging_fq.strip("`"), not_found_ok=True)
 
 
 def upsert_dataframe_to_bigquery(
@@ -64,81 +266,90 @@ def upsert_dataframe_to_bigquery(
         clustering_fields: optional clustering fields to apply when creating destination table.
         time_partitioning: optional TimePartitioning to apply on destination when creating it.
     """
-    if isinstance(key_columns, str):
-        key_cols = [key_columns]
-    else:
-        key_cols = list(key_columns)
-    if not key_cols:
-        raise ValueError("key_columns must be provided")
-
-    client = bigquery.Client(project=project, location=location)
-
+    key_cols = _key_list(key_columns)
+    client = get_bq_client(project=project, location=location)
     dest_fq = _fq(destination)
+    create_schema = (
+        _bigquery_schema(pa.Schema.from_pandas(df, preserve_index=False)) if create_if_missing else None
+    )
+    dest_schema = _destination_schema(client, dest_fq, create_schema, clustering_fields, time_partitioning)
 
-    # Check if destination table exists
-    if not _table_exists(client, dest_fq):
-        if not create_if_missing:
-            raise NotFound(f"Destination table {dest_fq} not found and create_if_missing=False")
-
-    # Get destination table schema to match data types
-    dest_table = client.get_table(dest_fq.strip("`"))
-    dest_schema = dest_table.schema
-
-    # Create a temporary staging table if not provided
-    if staging_table is None:
-        project_id, dataset_id, table_id = destination.strip("`").split(".")
-        staging_table = f"{project_id}.{dataset_id}.{table_id}__stg_{uuid.uuid4().hex[:8]}"
-    staging_fq = _fq(staging_table)
+    # Only destination columns present in the DataFrame are staged and merged
+    staged_schema = [field for field in dest_schema if field.name in df.columns]
+    merge_columns = [field.name for field in staged_schema]
 
     # Load DataFrame into staging table with destination schema
     job_config = bigquery.LoadJobConfig(
         write_disposition=write_disposition_staging,
-        schema=dest_schema,  # Use destination schema instead of autodetect
+        schema=staged_schema,  # Use destination schema instead of autodetect
         schema_update_options=[],  # Don't allow schema updates
     )
-    load_job = client.load_table_from_dataframe(
-        df, staging_fq.strip("`"), job_config=job_config
+    _merge_from_staging(
+        client, destination, dest_fq, merge_columns, key_cols, staging_table,
+        lambda staging_id: client.load_table_from_dataframe(df, staging_id, job_config=job_config),
     )
-    load_job.result()  # wait for load to finish
-
-    # Build MERGE statement
-    # Use destination schema to drive column list (ensures we don't try to write missing cols)
-    dest_columns = _list_cols_from_table(client, dest_fq)
-    # Only use columns present in staging as well
-    staging_columns = _list_cols_from_table(client, staging_fq)
-    merge_columns = [c for c in dest_columns if c in staging_columns]
-
-    if not set(key_cols).issubset(set(merge_columns)):
-        missing = set(key_cols) - set(merge_columns)
-        raise ValueError(f"Key columns {missing} not found in DataFrame/staging table")
 
-    # Deduplicate staging on key in case df has duplicates
-    key_expr = ", ".join([f"`{c}`" for c in key_cols])
-    on_expr = " AND ".join([f"T.`{c}` = S.`{c}`" for c in key_cols])
 
-    # Build update set list excluding key columns by default
-    update_cols = [c for c in merge_columns if c not in key_cols]
-    update_set = ", ".join([f"`{c}` = S.`{c}`" for c in update_cols]) if update_cols else ""
+def upsert_arrow_to_bigquery(
+    data: ArrowData,
+    destination: str,
+    key_columns: Union[str, Iterable[str]],
+    project: Optional[str] = None,
+    create_if_missing: bool = False,
+    staging_table: Optional[str] = None,
+    write_disposition_staging: str = "WRITE_TRUNCATE",
+    location: Optional[str] = None,
+) -> None:
+    """
+    Same upsert as upsert_dataframe_to_bigquery for a pyarrow Table, a
+    RecordBatch or a list of RecordBatches. The data is written to Parquet in
+    memory and loaded with load_table_from_file, skipping the pandas round trip.
+    Columns are cast to the Arrow type matching their destination column; a
+    column the destination does not have raises ValueError instead of being
+    dropped silently. With create_if_missing a missing destination is created
+    from the Arrow schema.
+    """
+    key_cols = _key_list(key_columns)
+    client = get_bq_client(project=project, location=location)
+    dest_fq = _fq(destination)
+    create_schema = _bigquery_schema(_arrow_schema(data)) if create_if_missing else None
+    dest_schema = _destination_schema(client, dest_fq, create_schema)
 
-    insert_cols = ", ".join([f"`{c}`" for c in merge_columns])
-    insert_vals = ", ".join([f"S.`{c}`" for c in merge_columns])
+    column_names = _column_names(data)
+    unknown = [name for name in column_names if name not in {field.name for field in dest_schema}]
+    if unknown:
+        # The cached schema may predate an ALTER TABLE; check the live one before failing
+        clear_schema_cache(dest_fq)
+        dest_schema = _destination_schema(client, dest_fq, create_schema)
+        unknown = [name for name in column_names if name not in {field.name for field in dest_schema}]
+    if unknown:
+        raise ValueError(
+            f"Columns {unknown} are not in {dest_fq}; add them to the table "
+            f"(ALTER TABLE ... ADD COLUMN) or drop them from the data"
+        )
 
-    merge_sql = f"""
-    MERGE {dest_fq} T
-    USING (
-      SELECT * EXCEPT(rn) FROM (
-        SELECT *, ROW_NUMBER() OVER (PARTITION BY {key_expr} ORDER BY CURRENT_TIMESTAMP()) rn
-        FROM {staging_fq}
-      )
-      WHERE rn = 1
-    ) S
-    ON {on_expr}
-    {"WHEN MATCHED THEN UPDATE SET " + update_set if update_set else ""}
-    WHEN NOT MATCHED THEN INSERT ({insert_cols}) VALUES ({insert_vals})
-    """
+    table = _to_arrow_table(data, dest_schema)
+    if not table.num_rows:
+        return
+    staged_schema = [field for field in dest_schema if field.name in table.column_names]
+    merge_columns = [field.name for field in staged_schema]
 
-    query_job = client.query(merge_sql)
-    query_job.result()
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    parquet = sink.getvalue()
 
-    # Drop staging table
-    client.delete_table(staging_fq.strip("`"), not_found_ok=True)
\ No newline at end of file
+    parquet_options = bigquery.ParquetOptions()
+    parquet_options.enable_list_inference = True  # list<T> columns load as REPEATED T
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        write_disposition=write_disposition_staging,
+        schema=staged_schema,
+        schema_update_options=[],
+        parquet_options=parquet_options,
+    )
+    _merge_from_staging(
+        client, destination, dest_fq, merge_columns, key_cols, staging_table,
+        lambda staging_id: client.load_table_from_file(
+            io.BytesIO(parquet), staging_id, job_config=job_config, rewind=True
+        ),
+    )
@@ -0,0 +1,126 @@
+"""
+Checkpoint state for incremental ingestion (one SQLite file, INGEST_STATE_PATH).
+
+- checkpoints: per dataset URL, how many items have been ingested (Apify
+  datasets are append-only, so the next run starts fetching at that offset).
+- row_hashes: content hash of the last uploaded version of every company and
+  job, so a re-fetched row is only upserted when something in it changed.
+
+Hashes and checkpoints are recorded only after the rows they cover have been
+upserted, so a failed run is retried from where the last good upload ended.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import pyarrow as pa
+
+INGEST_STATE_PATH = Path(os.getenv("INGEST_STATE_PATH", "storage/ingest_state.sqlite3"))
+
+# SQLite caps bound parameters per statement; look hashes up in chunks
+_LOOKUP_CHUNK = 500
+
+
+def _row_hash(row: Dict) -> str:
+    payload = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def batch_hashes(batch: pa.RecordBatch, key_column: str) -> Dict[str, str]:
+    """key -> content hash for every row of the batch."""
+    return {row[key_column]: _row_hash(row) for row in batch.to_pylist()}
+
+
+class IngestState:
+    def __init__(self, path: Path = INGEST_STATE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                dataset TEXT PRIMARY KEY,
+                item_offset INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS row_hashes (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (kind, key)
+            );
+            """
+        )
+
+    # -------------------------
+    # CHECKPOINTS
+    # -------------------------
+    def checkpoint(self, dataset: str) -> int:
+        """Items already ingested from the dataset."""
+        row = self.conn.execute(
+            "SELECT item_offset FROM checkpoints WHERE dataset = ?", (dataset,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def save_checkpoint(self, dataset: str, item_offset: int) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO checkpoints (dataset, item_offset, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(dataset) DO UPDATE SET
+                    item_offset = excluded.item_offset,
+                    updated_at = excluded.updated_at
+                """,
+                (dataset, item_offset, time.time()),
+            )
+
+    # -------------------------
+    # CONTENT HASHES
+    # -------------------------
+    def _known(self, kind: str, keys: List[str]) -> Dict[str, str]:
+        known: Dict[str, str] = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            known.update(self.conn.execute(
+                f"SELECT key, hash FROM row_hashes WHERE kind = ? AND key IN ({placeholders})",
+                [kind, *chunk],
+            ).fetchall())
+        return known
+
+    def changed_rows(self, kind: str, batch: pa.RecordBatch, key_column: str) -> Tuple[pa.RecordBatch, Dict[str, str]]:
+        """
+        The rows of batch that are new or differ from their last upload, and
+        their hashes (to pass to remember() once the upload has succeeded).
+        """
+        if not batch.num_rows:
+            return batch, {}
+        hashes = batch_hashes(batch, key_column)
+        known = self._known(kind, list(hashes))
+        keys = batch.column(key_column).to_pylist()
+        mask = [known.get(key) != hashes[key] for key in keys]
+        pending = {key: hashes[key] for key, keep in zip(keys, mask) if keep}
+        return batch.filter(pa.array(mask, type=pa.bool_())), pending
+
+    def remember(self, kind: str, hashes: Dict[str, str]) -> None:
+        if not hashes:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO row_hashes (kind, key, hash) VALUES (?, ?, ?)",
+                [(kind, key, value) for key, value in hashes.items()],
+            )
+
+    def forget(self, kinds: Iterable[str]) -> None:
+        with self.conn:
+            for kind in kinds:
+                self.conn.execute("DELETE FROM row_hashes WHERE kind = ?", (kind,))
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,126 @@
+"""
+JobEmbeddings.py — Embed job postings once, at ingestion time.
+
+Every posting is embedded from job_embedding_text(); the SHA-256 of that text
+is stored with the vector, so re-ingesting an unchanged posting (or a
+duplicate posting under another job_id) costs no embedding call. Vectors go
+to the local "jobs" VectorStore used by /api/chat and are returned as rows for
+the job_search.job_embeddings table, which ingestion creates when it is missing:
+
+    CREATE TABLE `agentic-jobsearch.job_search.job_embeddings` (
+        job_id STRING, content_hash STRING, embedding_model STRING,
+        embedding ARRAY<FLOAT64>
+    )
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from app.memory.embeddings import EMBEDDING_MODEL, embed_texts, job_embedding_text
+from app.memory.vector import VectorStore
+from app.services.semantic_match import JOB_STORE_NAME, content_hash
+
+
+class JobEmbeddingWriter:
+    """
+    The jobs VectorStore opened once and updated in memory across many
+    ingestion flushes, with its content hash -> job_id map built once and kept
+    current; save() rewrites the store files. One load and one rewrite per
+    save instead of per flush.
+    """
+
+    def __init__(self, store: Optional[VectorStore] = None):
+        self._store = store
+        self._known: Optional[Dict[str, str]] = None
+        self._dirty = False
+
+    @property
+    def store(self) -> VectorStore:
+        if self._store is None:
+            self._store = VectorStore(JOB_STORE_NAME)
+        return self._store
+
+    def _known_hashes(self) -> Dict[str, str]:
+        # content hash -> job_id already holding that vector
+        if self._known is None:
+            self._known = {}
+            for job_id in self.store.ids():
+                meta = self.store.get_metadata(job_id) or {}
+                if meta.get("content_hash"):
+                    self._known[meta["content_hash"]] = job_id
+        return self._known
+
+    def embed(self, jobs: Iterable[Dict]) -> List[Dict]:
+        """
+        Embed new or changed postings in batched calls and add them to the store.
+        Returns job_embeddings rows for the postings whose vectors changed.
+        """
+        store = self.store
+        known = self._known_hashes()
+
+        pending: Dict[str, str] = {}  # job_id -> content hash
+        texts: Dict[str, str] = {}  # content hash -> text still to embed
+        for job in jobs:
+            job_id = job.get("job_id")
+            if not job_id:
+                continue
+            text = job_embedding_text(job)
+            digest = content_hash(text)
+            current = store.get_metadata(job_id) or {}
+            if current.get("content_hash") == digest:
+                continue
+            pending[job_id] = digest
+            if digest not in known:
+                texts[digest] = text
+
+        if not pending:
+            return []
+
+        vectors: Dict[str, object] = {}
+        if texts:
+            digests = list(texts)
+            embedded = embed_texts([texts[digest] for digest in digests])
+            vectors.update(zip(digests, embedded))
+        for digest in set(pending.values()) - set(vectors):
+            vectors[digest] = store.get_vector(known[digest])
+
+        job_ids = list(pending)
+        for job_id in job_ids:
+            # The vector this job held until now no longer matches its old hash
+            previous = (store.get_metadata(job_id) or {}).get("content_hash")
+            if previous and known.get(previous) == job_id:
+                del known[previous]
+        matrix = [vectors[pending[job_id]] for job_id in job_ids]
+        store.add_vectors(
+            job_ids,
+            matrix,
+            [{"content_hash": pending[job_id], "model": EMBEDDING_MODEL} for job_id in job_ids],
+        )
+        for job_id in job_ids:
+            known[pending[job_id]] = job_id
+        self._dirty = True
+        print(f"Embedded {len(texts)} postings ({len(job_ids) - len(texts)} reused from cache)")
+
+        return [
+            {
+                "job_id": job_id,
+                "content_hash": pending[job_id],
+                "embedding_model": EMBEDDING_MODEL,
+                "embedding": [float(x) for x in store.get_vector(job_id)],
+            }
+            for job_id in job_ids
+        ]
+
+    def save(self) -> None:
+        if self._dirty:
+            self.store.save()
+            self._dirty = False
+
+
+def embed_jobs(jobs: Iterable[Dict], store: Optional[VectorStore] = None) -> List[Dict]:
+    """Embed postings and save the jobs store in one go (see JobEmbeddingWriter for batches)."""
+    writer = JobEmbeddingWriter(store)
+    rows = writer.embed(jobs)
+    writer.save()
+    return rows
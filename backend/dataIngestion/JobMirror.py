@@ -0,0 +1,238 @@
+"""
+JobMirror.py — Local Parquet/DuckDB mirror of job_search.job_details and job_search.company.
+
+The mirror is a directory of Parquet part files per table under JOB_MIRROR_DIR.
+refresh_mirror() pulls only rows newer than the stored posted_at_epoch /
+created_at_epoch high-water marks and appends them as a new part; readers see
+the latest version of every key through de-duplicating DuckDB views.
+
+Refresh from the backend directory with:
+    python -m dataIngestion.JobMirror [--full]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+# Default resolved against backend/ so ingestion and the API agree whatever their working directory
+MIRROR_DIR = Path(os.getenv("JOB_MIRROR_DIR", Path(__file__).resolve().parent.parent / "storage" / "mirror"))
+MAX_PARTS_BEFORE_COMPACT = int(os.getenv("JOB_MIRROR_MAX_PARTS", "20"))
+
+# table name -> primary key used to keep the latest row
+MIRROR_TABLES = {
+    "job_details": "job_id",
+    "company": "company_urn",
+}
+
+# Columns every mirror view exposes even when no part file has them yet
+# (parts pulled before the column was added to BigQuery): name -> DuckDB type
+MIRROR_COLUMNS = {
+    "job_details": {"skill_tags": "VARCHAR[]"},
+    "company": {},
+}
+
+_STATE_FILE = "state.json"
+
+
+def _table_dir(table: str) -> Path:
+    return MIRROR_DIR / table
+
+
+def _parts(table: str) -> List[Path]:
+    return sorted(_table_dir(table).glob("part-*.parquet"))
+
+
+def _load_state() -> Dict[str, int]:
+    path = MIRROR_DIR / _STATE_FILE
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    return {"posted_at_epoch": 0, "created_at_epoch": 0}
+
+
+def _save_state(state: Dict[str, int]) -> None:
+    MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MIRROR_DIR / f"{_STATE_FILE}.tmp"
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    tmp.replace(MIRROR_DIR / _STATE_FILE)
+
+
+def _write_part(table: str, arrow_table) -> Optional[Path]:
+    """Write an Arrow table as a new, lexicographically ordered part file."""
+    import pyarrow.parquet as pq
+
+    if arrow_table.num_rows == 0:
+        return None
+    directory = _table_dir(table)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"part-{time.time_ns():020d}.parquet"
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(arrow_table, tmp, compression="zstd")
+    tmp.replace(path)
+    return path
+
+
+def _latest_rows_sql(table: str) -> str:
+    glob = (_table_dir(table) / "part-*.parquet").as_posix()
+    key = MIRROR_TABLES[table]
+    return f"""
+    SELECT * EXCLUDE (filename)
+    FROM read_parquet('{glob}', filename = true, union_by_name = true)
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY filename DESC) = 1
+    """
+
+
+def mirror_available() -> bool:
+    return all(_parts(table) for table in MIRROR_TABLES)
+
+
+def compact_mirror(table: str) -> None:
+    """Rewrite all parts of `table` into a single de-duplicated part."""
+    parts = _parts(table)
+    if len(parts) <= 1:
+        return
+    con = duckdb.connect()
+    try:
+        merged = con.execute(_latest_rows_sql(table)).fetch_arrow_table()
+    finally:
+        con.close()
+    _write_part(table, merged)
+    for part in parts:
+        part.unlink(missing_ok=True)
+
+
+def refresh_mirror(full: bool = False) -> Dict[str, int]:
+    """
+    Pull new/changed rows from BigQuery into the local mirror.
+    Incremental by default: only job_details rows with posted_at_epoch or
+    created_at_epoch beyond the stored high-water marks, plus their companies.
+    Rows rewritten in place without newer epochs need full=True.
+    """
+    from google.cloud import bigquery
+
+    from dataIngestion.BigQuerySearch import get_bq_client
+
+    client = get_bq_client()
+    state = {"posted_at_epoch": 0, "created_at_epoch": 0} if full else _load_state()
+
+    # A full refresh replaces these once the new parts are written, so a failed
+    # query leaves the current mirror in place
+    stale_parts = {table: _parts(table) for table in MIRROR_TABLES} if full else {}
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("posted_hwm", "INT64", int(state["posted_at_epoch"])),
+            bigquery.ScalarQueryParameter("created_hwm", "INT64", int(state["created_at_epoch"])),
+        ]
+    )
+    jobs = client.query(
+        """
+        SELECT *
+        FROM `agentic-jobsearch.job_search.job_details`
+        WHERE posted_at_epoch > @posted_hwm OR created_at_epoch > @created_hwm
+        """,
+        job_config=job_config,
+    ).to_arrow()
+    _write_part("job_details", jobs)
+
+    companies_rows = 0
+    if jobs.num_rows:
+        urns = sorted({urn for urn in jobs.column("company_urn").to_pylist() if urn})
+        company_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("urns", "STRING", urns)]
+        )
+        companies = client.query(
+            """
+            SELECT company_urn, company, company_url
+            FROM `agentic-jobsearch.job_search.company`
+            WHERE company_urn IN UNNEST(@urns)
+            """,
+            job_config=company_config,
+        ).to_arrow()
+        _write_part("company", companies)
+        companies_rows = companies.num_rows
+
+        import pyarrow.compute as pc
+
+        state["posted_at_epoch"] = max(int(state["posted_at_epoch"]), int(pc.max(jobs.column("posted_at_epoch")).as_py() or 0))
+        state["created_at_epoch"] = max(int(state["created_at_epoch"]), int(pc.max(jobs.column("created_at_epoch")).as_py() or 0))
+
+    for parts in stale_parts.values():
+        for part in parts:
+            part.unlink(missing_ok=True)
+
+    for table in MIRROR_TABLES:
+        if len(_parts(table)) > MAX_PARTS_BEFORE_COMPACT:
+            compact_mirror(table)
+
+    _save_state(state)
+    print(f"Mirror refreshed: {jobs.num_rows} job rows, {companies_rows} company rows")
+    return {"job_details": jobs.num_rows, "company": companies_rows}
+
+
+class MirrorBackend:
+    """Search backend that answers the BigQuerySearch SQL from the local mirror."""
+
+    name = "mirror"
+
+    def __init__(self):
+        self._con = duckdb.connect()
+        self._lock = threading.Lock()
+        self._views_ready = False
+
+    def _ensure_views(self) -> None:
+        if self._views_ready:
+            return
+        if not mirror_available():
+            raise RuntimeError(
+                f"Job mirror at {MIRROR_DIR} is empty; run `python -m dataIngestion.JobMirror` first"
+            )
+        for table in MIRROR_TABLES:
+            self._con.execute(f"CREATE OR REPLACE VIEW {table} AS {_latest_rows_sql(table)}")
+            present = {row[0] for row in self._con.execute(f"DESCRIBE {table}").fetchall()}
+            missing = {
+                name: column_type
+                for name, column_type in MIRROR_COLUMNS[table].items()
+                if name not in present
+            }
+            if missing:
+                extra = ", ".join(f"CAST(NULL AS {column_type}) AS {name}" for name, column_type in missing.items())
+                self._con.execute(
+                    f"CREATE OR REPLACE VIEW {table} AS SELECT *, {extra} FROM ({_latest_rows_sql(table)})"
+                )
+        self._views_ready = True
+
+    def table(self, name: str) -> str:
+        return name
+
+    def param(self, name: str) -> str:
+        return f"${name}"
+
+    def in_list(self, column: str, name: str) -> str:
+        return f"list_contains(${name}, {column})"
+
+    def query(self, sql: str, params: Dict[str, Any]) -> List[Dict]:
+        with self._lock:
+            self._ensure_views()
+        # Each thread gets its own cursor; the views live on the parent connection.
+        cursor = self._con.cursor()
+        try:
+            result = cursor.execute(sql, {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()})
+            columns = [col[0] for col in result.description]
+            return [dict(zip(columns, row)) for row in result.fetchall()]
+        finally:
+            cursor.close()
+
+
+if __name__ == "__main__":
+    refresh_mirror(full="--full" in sys.argv[1:])
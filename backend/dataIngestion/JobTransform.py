@@ -0,0 +1,269 @@
+"""
+Apify job items -> typed Arrow record batches for the company and job_details tables.
+
+Works one page of items at a time so ingestion memory stays flat no matter
+how large the dataset is. Each column is built as one Arrow array and cleaned
+with Arrow compute kernels (list joins, casts, one combined key filter)
+instead of per-row pandas .apply(); a column whose values do not fit their
+expected type falls back to per-value conversion. Cleaning rules match what
+ingestion always did:
+
+- skills / benefits / job_insights lists are joined into "a, b, c" strings
+- applicant_count and the *_epoch columns are integers (unparseable -> 0)
+- posted_at / created_at become UTC timestamps (unparseable -> null)
+- rows without a job_id or company_urn are dropped
+- skill_tags holds the canonical skills found in title, skills and description
+
+scripts/benchmark_job_transform.py compares it with the old pandas transform.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from app.services.skill_matcher import get_skill_taxonomy
+
+COMPANY_SCHEMA = pa.schema([
+    ("company", pa.string()),
+    ("company_url", pa.string()),
+    ("company_urn", pa.string()),
+])
+
+JOB_SCHEMA = pa.schema([
+    ("job_id", pa.string()),
+    ("job_title", pa.string()),
+    ("job_url", pa.string()),
+    ("location", pa.string()),
+    ("work_type", pa.string()),
+    ("salary", pa.string()),
+    ("posted_at", pa.timestamp("us", tz="UTC")),
+    ("posted_at_epoch", pa.int64()),
+    ("skills", pa.string()),
+    ("benefits", pa.string()),
+    ("is_easy_apply", pa.bool_()),
+    ("is_promoted", pa.bool_()),
+    ("applicant_count", pa.int64()),
+    ("description", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("created_at_epoch", pa.int64()),
+    ("geo_id", pa.string()),
+    ("navigation_subtitle", pa.string()),
+    ("is_verified", pa.bool_()),
+    ("job_insights", pa.string()),
+    ("apply_url", pa.string()),
+    ("company_urn", pa.string()),
+    ("skill_tags", pa.list_(pa.string())),
+])
+
+LIST_COLUMNS = ("skills", "benefits", "job_insights")
+INT_COLUMNS = ("applicant_count", "posted_at_epoch", "created_at_epoch")
+TIMESTAMP_COLUMNS = ("posted_at", "created_at")
+BOOL_COLUMNS = ("is_easy_apply", "is_promoted", "is_verified")
+
+# Plain decimal or scientific notation (what pandas.to_numeric accepts)
+_NUMBER_PATTERN = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+# ISO 8601 date, optionally with a time and a UTC offset (what the timestamp cast accepts)
+_ISO_PATTERN = r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d{1,9})?)?(Z|[+-]\d{2}:?\d{2})?)?$"
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+
+# -------------------------
+# PER-VALUE FALLBACKS (for columns whose values do not fit the expected type)
+# -------------------------
+def _joined(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value) if value is not None else ""
+
+
+def _integer(value: Any) -> int:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if number == number else 0  # NaN -> 0
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _flag(value: Any) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+# -------------------------
+# COLUMN KERNELS
+# -------------------------
+def _values(items: List[Dict[str, Any]], field: str) -> List[Any]:
+    return [item.get(field) for item in items]
+
+
+def _typed_column(values: List[Any], arrow_type: pa.DataType, fallback: Callable[[Any], Any]) -> pa.Array:
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([fallback(v) for v in values], type=arrow_type)
+
+
+def _list_column(values: List[Any]) -> pa.Array:
+    # Arrow would split a bare string into a list of characters, so anything
+    # other than lists and nulls goes through the per-value path
+    if not set(map(type, values)) <= {list, type(None)}:
+        return pa.array([_joined(v) for v in values], type=pa.string())
+    try:
+        lists = pa.array(values, type=pa.list_(pa.string()))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([_joined(v) for v in values], type=pa.string())
+    # A null element would null out the whole joined string
+    lists = pa.ListArray.from_arrays(lists.offsets, pc.fill_null(lists.values, ""), mask=lists.is_null())
+    return pc.fill_null(pc.binary_join(lists, ", "), "")
+
+
+def _int_column(values: List[Any]) -> pa.Array:
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Numbers mixed with numeric strings: parse them all as text
+        array = pa.array(list(map(str, values)), type=pa.string())
+
+    if pa.types.is_string(array.type):
+        numeric = pc.fill_null(pc.match_substring_regex(array, _NUMBER_PATTERN), False)
+        array = pc.utf8_trim_whitespace(pc.if_else(numeric, array, pa.scalar(None, pa.string())))
+        array = pc.cast(array, pa.float64())
+    elif pa.types.is_null(array.type) or pa.types.is_boolean(array.type):
+        array = array.cast(pa.int64())
+    elif not (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)):
+        return pa.array([_integer(v) for v in values], type=pa.int64())
+
+    if pa.types.is_floating(array.type):
+        array = pc.trunc(pc.if_else(pc.is_nan(array), pa.scalar(None, array.type), array))
+    return pc.fill_null(pc.cast(array, pa.int64(), safe=False), 0)
+
+
+def _timestamp_column(values: List[Any]) -> pa.Array:
+    try:
+        array = pa.array([v if v else None for v in values], type=pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([_timestamp(v) for v in values], type=_TIMESTAMP)
+    valid = pc.fill_null(pc.match_substring_regex(array, _ISO_PATTERN), False)
+    if not pc.all(valid).as_py():
+        array = pc.if_else(valid, array, pa.scalar(None, pa.string()))
+    try:
+        # Offset-qualified ISO 8601 ("...Z", "...+02:00")
+        return pc.cast(array, _TIMESTAMP)
+    except pa.ArrowInvalid:
+        pass
+    try:
+        # Dates and naive datetimes are taken as UTC
+        return pc.cast(pc.cast(array, pa.timestamp("us")), _TIMESTAMP)
+    except pa.ArrowInvalid:
+        # Mixed or unparseable values: parse one by one, bad ones become null
+        return pa.array([_timestamp(v) for v in values], type=_TIMESTAMP)
+
+
+def _present(array: pa.Array) -> pa.Array:
+    """True where the value is non-null and not blank."""
+    return pc.fill_null(pc.not_equal(pc.utf8_trim_whitespace(array), ""), False)
+
+
+# -------------------------
+# TRANSFORMS
+# -------------------------
+def transform_jobs(items: List[Dict[str, Any]], tag_skills: bool = True) -> pa.RecordBatch:
+    """job_details rows for a page of items in JOB_SCHEMA, without rows missing a key."""
+    columns: List[pa.Array] = []
+    for field in JOB_SCHEMA:
+        if field.name == "skill_tags":
+            continue
+        values = _values(items, field.name)
+        if field.name in LIST_COLUMNS:
+            columns.append(_list_column(values))
+        elif field.name in INT_COLUMNS:
+            columns.append(_int_column(values))
+        elif field.name in TIMESTAMP_COLUMNS:
+            columns.append(_timestamp_column(values))
+        elif field.name in BOOL_COLUMNS:
+            columns.append(_typed_column(values, pa.bool_(), _flag))
+        else:
+            columns.append(_typed_column(values, pa.string(), _text))
+
+    batch = pa.RecordBatch.from_arrays(columns, schema=JOB_SCHEMA.remove(JOB_SCHEMA.get_field_index("skill_tags")))
+    # Every key rule in one mask, applied to all columns at once
+    batch = batch.filter(pc.and_(_present(batch.column("job_id")), _present(batch.column("company_urn"))))
+
+    if tag_skills:
+        # Aho-Corasick over each posting: the one step that stays per-row Python
+        taxonomy = get_skill_taxonomy()
+        text = pc.binary_join_element_wise(
+            pc.fill_null(batch.column("job_title"), ""),
+            batch.column("skills"),
+            pc.fill_null(batch.column("description"), ""),
+            "\n",
+        )
+        # Reposted and duplicated listings share text: scan each distinct posting once
+        encoded = pc.dictionary_encode(text)
+        distinct = pa.array(
+            [taxonomy.extract(value) for value in encoded.dictionary.to_pylist()],
+            type=pa.list_(pa.string()),
+        )
+        tags = distinct.take(encoded.indices)
+    else:
+        tags = pa.array([[]] * batch.num_rows, type=pa.list_(pa.string()))
+
+    return pa.RecordBatch.from_arrays([*batch.columns, tags], schema=JOB_SCHEMA)
+
+
+def transform_companies(
+    items: List[Dict[str, Any]],
+    seen_companies: Optional[Set[str]] = None,
+) -> pa.RecordBatch:
+    """
+    company rows for a page of items, first occurrence per company_urn.
+    Companies already in seen_companies are skipped and new ones are added to it.
+    """
+    urns = _typed_column(_values(items, "company_urn"), pa.string(), _text)
+    seen = seen_companies if seen_companies is not None else set()
+
+    first: Dict[str, int] = {}
+    for index, urn in enumerate(urns.to_pylist()):
+        if urn and urn.strip() and urn not in seen and urn not in first:
+            first[urn] = index
+    seen.update(first)
+
+    indices = pa.array(list(first.values()), type=pa.int64())
+    return pa.RecordBatch.from_arrays(
+        [
+            _typed_column(_values(items, "company"), pa.string(), _text).take(indices),
+            _typed_column(_values(items, "company_url"), pa.string(), _text).take(indices),
+            urns.take(indices),
+        ],
+        schema=COMPANY_SCHEMA,
+    )
+
+
+def transform_page(
+    items: List[Dict[str, Any]],
+    seen_companies: Optional[Set[str]] = None,
+) -> Tuple[pa.RecordBatch, pa.RecordBatch]:
+    """
+    (company batch, job batch) for one page of Apify items. Companies already
+    in seen_companies are skipped and new ones are added to it, so a company
+    is uploaded once per run rather than once per page.
+    """
+    return transform_companies(items, seen_companies), transform_jobs(items)
@@ -5,8 +5,6 @@ from pathlib import Path
 from dotenv import load_dotenv
 from app.core.env import require_env
 
-OPENAI_KEY = require_env("OPENAI_API_KEY")
-self.client = OpenAI(api_key=OPENAI_KEY)
 
 
 # Path to your service account key 
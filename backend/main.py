@@ -9,15 +9,20 @@ print(f"Loaded environment from: {ENV_PATH}")
 validate_environment()
 
 import uuid
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import BackgroundTasks, Depends, FastAPI, UploadFile, File, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from app.agents.PlannerAgent import PlannerAgent
 from app.agents.UploadResume import ResumeParser
 from app.memory.vector import VectorStore
 from app.api.routes import api_router
+from app.core.concurrency import run_blocking
+from app.core.container import container, get_planner, get_resume_parser, get_resume_store
 from app.state.user_profiles import get_profile
+from app.services.skill_matcher import get_skill_taxonomy
 
 app = FastAPI(title="JobSearch Co-Pilot API (Python Orchestrator)",debug=True)
 
@@ -34,11 +39,13 @@ app.include_router(api_router)
 
 
 # ------------------------------------------------------
-# GLOBAL AGENT SINGLETONS
+# SHARED AGENTS
 # ------------------------------------------------------
-planner = PlannerAgent()
-uploader = ResumeParser()
-vector_store = VectorStore()
+# Agents and clients come from app.core.container: created once per worker on
+# first use, so importing this module does no credential or network work.
+@app.on_event("startup")
+def warm_up():
+    get_skill_taxonomy()  # build the skill automaton once, before the first request
 
 # ------------------------------------------------------
 # MODELS
@@ -52,13 +59,13 @@ class StartWorkflowInput(BaseModel):
 # ------------------------------------------------------
 @app.get("/health")
 def health():
-    return {"status": "ok", "agents_loaded": list(planner.agents.keys())}
+    return {"status": "ok", "agents_loaded": container.loaded()}
 
 # ------------------------------------------------------
 # 1) START WORKFLOW
 # ------------------------------------------------------
 @app.post("/workflow/start")
-def start_workflow(payload: StartWorkflowInput):
+def start_workflow(payload: StartWorkflowInput, planner: PlannerAgent = Depends(get_planner)):
     user_data = payload.user_data or {}
     profile = user_data.get("profile")
     user_id = user_data.get("userId")
@@ -68,8 +75,8 @@ def start_workflow(payload: StartWorkflowInput):
         if stored_profile:
             user_data["profile"] = stored_profile
 
+    # Returns immediately; the tasks run on the workflow engine's worker pool
     plan = planner.create_workflow_plan(payload.user_message, user_data)
-    planner.active_workflows[plan.plan_id] = plan
 
     return {
         "workflow_id": plan.plan_id,
@@ -87,11 +94,15 @@ def start_workflow(payload: StartWorkflowInput):
 # 2) EXECUTE WORKFLOW (blocking)
 # ------------------------------------------------------
 @app.post("/workflow/{workflow_id}/execute")
-def execute_workflow(workflow_id: str):
-    if workflow_id not in planner.active_workflows:
+def execute_workflow(workflow_id: str, planner: PlannerAgent = Depends(get_planner)):
+    plan = planner.get_workflow(workflow_id)
+    if plan is None:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    plan = planner.active_workflows[workflow_id]
+
+    if planner.runs_elsewhere(plan):
+        # Nothing to wait on here; report the stored progress so the client polls /status
+        return JSONResponse(status_code=202, content=jsonable_encoder(planner.get_workflow_status(workflow_id)))
+
     results = planner.execute_workflow(plan)
     return results
 
@@ -99,29 +110,38 @@ def execute_workflow(workflow_id: str):
 # 3) CHECK STATUS
 # ------------------------------------------------------
 @app.get("/workflow/{workflow_id}/status")
-def workflow_status(workflow_id: str):
+def workflow_status(workflow_id: str, planner: PlannerAgent = Depends(get_planner)):
     return planner.get_workflow_status(workflow_id)
 
 # ------------------------------------------------------
 # 4) GET FINAL RESULTS
 # ------------------------------------------------------
 @app.get("/workflow/{workflow_id}/results")
-def workflow_results(workflow_id: str):
+def workflow_results(workflow_id: str, planner: PlannerAgent = Depends(get_planner)):
     return planner.combine_results(workflow_id)
 
 # ------------------------------------------------------
 # 5) UPLOAD DOCUMENTS (resume, transcript, etc.)
 # ------------------------------------------------------
 @app.post("/upload/documents")
-async def upload_docs(file: UploadFile = File(...)):
+async def upload_docs(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    uploader: ResumeParser = Depends(get_resume_parser),
+    vector_store: VectorStore = Depends(get_resume_store),
+):
     file_bytes = await file.read()
 
-    # Extract text and profile
-    parsed = uploader.process_file_bytes(file_bytes, file.filename)
+    # Extract text and profile straight from memory (no temp file)
+    parsed = await uploader.aprocess_file_bytes(file_bytes, file.filename)
+    if not parsed["text"]:
+        raise HTTPException(status_code=400, detail=parsed.get("error", "Could not extract text"))
 
-    # Store vector embedding
+    # Store vector embedding; it is searchable at once and written to disk after
+    # the response (uploads that arrive meanwhile share that one save)
     vector_id = str(uuid.uuid4())
-    vector_store.add_vector(vector_id, parsed["text"])
+    await run_blocking(vector_store.add_text, vector_id, parsed["text"], {"filename": file.filename})
+    background_tasks.add_task(vector_store.save_if_dirty)
 
     return {
         "filename": file.filename,
@@ -0,0 +1,186 @@
+"""
+Benchmark: the Arrow job transform (dataIngestion/JobTransform.py) against the
+pandas transform ingestion used before (kept below as legacy_transform).
+
+Generates synthetic Apify items in chunks (so 1M rows do not have to sit in
+memory at once), runs both transforms on each chunk, checks that they produce
+the same rows, and reports rows/sec for each. Skill tagging is timed
+separately because both versions run the same per-row Aho-Corasick scan.
+
+Usage (from backend/):
+    python scripts/benchmark_job_transform.py --rows 1000000 --chunk 50000
+"""
+
+import argparse
+import random
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.skill_matcher import get_skill_taxonomy  # noqa: E402
+from dataIngestion.JobTransform import JOB_SCHEMA, transform_jobs  # noqa: E402
+
+SKILLS = ["Python", "Java", "AWS", "Kubernetes", "React", "SQL", "Go", "Docker", "Terraform", "C++"]
+BENEFITS = ["401(k)", "Medical insurance", "Vision insurance", "Paid maternity leave", "Commuter benefits"]
+INSIGHTS = ["Remote", "Full-time", "Mid-Senior level", "Skills: Python, SQL"]
+
+
+# -------------------------
+# SYNTHETIC DATA
+# -------------------------
+def synthetic_items(start: int, count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Apify-shaped items, including the messy cases the transform must clean up."""
+    rng = random.Random(seed + start)
+    items = []
+    for i in range(start, start + count):
+        epoch = 1_700_000_000_000 + i * 1000
+        items.append({
+            "job_id": "" if i % 97 == 0 else str(4_000_000_000 + i),
+            "job_title": rng.choice(["Software Engineer", "Data Engineer", "Backend Developer", "ML Engineer"]),
+            "job_url": f"https://www.linkedin.com/jobs/view/{i}",
+            "location": rng.choice(["Remote", "New York, NY", "Austin, TX", None]),
+            "work_type": rng.choice(["Full-time", "Contract"]),
+            "salary": rng.choice(["$120K/yr - $150K/yr", "", None]),
+            "posted_at": rng.choice(["2025-10-01T12:00:00.000Z", "2025-10-02T08:30:00.000Z", "not a date", None]),
+            "posted_at_epoch": rng.choice([epoch, str(epoch), None]),
+            "skills": rng.sample(SKILLS, rng.randint(0, 4)) if i % 13 else None,
+            "benefits": rng.sample(BENEFITS, rng.randint(0, 3)),
+            "is_easy_apply": rng.random() < 0.5,
+            "is_promoted": rng.random() < 0.1,
+            "applicant_count": rng.choice([rng.randint(0, 500), str(rng.randint(0, 500)), "n/a", None]),
+            "description": "We build data platforms with " + ", ".join(rng.sample(SKILLS, 3)) + ". " * 20,
+            "created_at": "2025-10-01T12:00:00.000Z",
+            "created_at_epoch": epoch,
+            "geo_id": str(rng.randint(100000, 999999)),
+            "navigation_subtitle": "Acme · Remote",
+            "is_verified": rng.random() < 0.8,
+            "job_insights": rng.sample(INSIGHTS, rng.randint(0, 2)),
+            "apply_url": None,
+            "company": f"Company {i % 5000}",
+            "company_url": f"https://www.linkedin.com/company/{i % 5000}",
+            "company_urn": "" if i % 211 == 0 else str(10_000 + i % 5000),
+        })
+    return items
+
+
+# -------------------------
+# LEGACY (pandas, as ApiClient.py did it before the Arrow transform)
+# -------------------------
+def legacy_transform(data: List[Dict[str, Any]], tag_skills: bool = True) -> pd.DataFrame:
+    df = pd.DataFrame(data)
+    job_details_df = df[[
+        'job_id', 'job_title', 'job_url', 'location', 'work_type', 'salary',
+        'posted_at', 'posted_at_epoch', 'skills', 'benefits', 'is_easy_apply',
+        'is_promoted', 'applicant_count', 'description', 'created_at',
+        'created_at_epoch', 'geo_id', 'navigation_subtitle', 'is_verified',
+        'job_insights', 'apply_url', 'company_urn'
+    ]].copy()
+
+    for column in ('skills', 'benefits', 'job_insights'):
+        job_details_df[column] = job_details_df[column].apply(
+            lambda x: ', '.join(x) if isinstance(x, list) else str(x) if x is not None else ''
+        )
+
+    for column in ('applicant_count', 'posted_at_epoch', 'created_at_epoch'):
+        job_details_df[column] = pd.to_numeric(job_details_df[column], errors='coerce').fillna(0).astype(int)
+
+    for column in ('posted_at', 'created_at'):
+        # (pandas warns when a chunk starts with a value it cannot infer a format from)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            job_details_df[column] = pd.to_datetime(job_details_df[column], errors='coerce', utc=True)
+
+    job_details_df = job_details_df.dropna(subset=['job_id', 'company_urn'])
+    job_details_df = job_details_df[job_details_df['job_id'].str.strip() != '']
+    job_details_df = job_details_df[job_details_df['company_urn'].str.strip() != '']
+
+    if tag_skills:
+        taxonomy = get_skill_taxonomy()
+        job_details_df['skill_tags'] = [
+            taxonomy.extract(f"{title}\n{skills}\n{description}")
+            for title, skills, description in zip(
+                job_details_df['job_title'].fillna(''),
+                job_details_df['skills'].fillna(''),
+                job_details_df['description'].fillna(''),
+            )
+        ]
+    return job_details_df
+
+
+# -------------------------
+# EQUIVALENCE
+# -------------------------
+def assert_equivalent(legacy: pd.DataFrame, arrow_df: pd.DataFrame) -> None:
+    legacy = legacy.reset_index(drop=True)
+    assert list(arrow_df.columns) == JOB_SCHEMA.names, "column order differs from JOB_SCHEMA"
+    assert len(legacy) == len(arrow_df), f"row count differs: {len(legacy)} vs {len(arrow_df)}"
+    for column in legacy.columns:
+        expected, actual = legacy[column], arrow_df[column]
+        if column == "skill_tags":
+            mismatched = sum(list(a) != list(b) for a, b in zip(expected, actual))
+        elif column in ("posted_at", "created_at"):
+            mismatched = int((expected.dt.as_unit("us") != actual).sum() - (expected.isna() & actual.isna()).sum())
+        else:
+            mismatched = int((expected.fillna("<null>").astype(str) != actual.fillna("<null>").astype(str)).sum())
+        assert mismatched == 0, f"{column}: {mismatched} rows differ"
+
+
+# -------------------------
+# BENCHMARK
+# -------------------------
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--check-rows", type=int, default=20_000, help="rows compared column by column")
+    args = parser.parse_args()
+
+    get_skill_taxonomy()  # build the automaton outside the timed region
+
+    sample = synthetic_items(0, min(args.check_rows, args.rows))
+    assert_equivalent(legacy_transform(sample), transform_jobs(sample).to_pandas())
+    print(f"Outputs match on {len(sample)} rows")
+
+    timings = {"legacy": 0.0, "arrow": 0.0, "legacy_no_tags": 0.0, "arrow_no_tags": 0.0}
+    kept = 0
+    for start in range(0, args.rows, args.chunk):
+        items = synthetic_items(start, min(args.chunk, args.rows - start))
+
+        t0 = time.perf_counter()
+        legacy_transform(items, tag_skills=False)
+        t1 = time.perf_counter()
+        kept += transform_jobs(items, tag_skills=False).num_rows
+        t2 = time.perf_counter()
+        legacy_transform(items)
+        t3 = time.perf_counter()
+        transform_jobs(items)
+        t4 = time.perf_counter()
+
+        timings["legacy_no_tags"] += t1 - t0
+        timings["arrow_no_tags"] += t2 - t1
+        timings["legacy"] += t3 - t2
+        timings["arrow"] += t4 - t3
+        print(f"  {start + len(items):>9,} rows")
+
+    print(f"\n{args.rows:,} synthetic rows ({kept:,} kept), chunks of {args.chunk:,}")
+    for label, legacy_key, arrow_key in (
+        ("cleaning only", "legacy_no_tags", "arrow_no_tags"),
+        ("with skill tags", "legacy", "arrow"),
+    ):
+        legacy_rate = args.rows / timings[legacy_key]
+        arrow_rate = args.rows / timings[arrow_key]
+        print(
+            f"{label:>16}: pandas {legacy_rate:>10,.0f} rows/s | arrow {arrow_rate:>10,.0f} rows/s"
+            f" | {arrow_rate / legacy_rate:.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
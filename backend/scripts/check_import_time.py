@@ -0,0 +1,113 @@
+"""
+Startup import budget for the API.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (best of
+--runs), records the cumulative import time of every module, and exits
+non-zero when:
+
+- importing main takes longer than --budget-ms, or
+- a heavy library (BigQuery, pandas, reportlab, PDF/DOCX parsers, openai, ...)
+  is imported at startup instead of on the code path that needs it.
+
+Usage (from backend/):
+    python scripts/check_import_time.py --budget-ms 1500 --report storage/importtime.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+# Must stay off the startup path; each is imported where it is first used
+DEFERRED_MODULES = [
+    "google.cloud.bigquery",
+    "pandas",
+    "pyarrow",
+    "reportlab",
+    "PyPDF2",
+    "docx",
+    "openai",
+    "duckdb",
+]
+
+# load_env() falls back to the process environment; the values are never used at import time
+PLACEHOLDER_ENV = {
+    "OPENAI_API_KEY": "import-budget",
+    "GOOGLE_APPLICATION_CREDENTIALS": "/dev/null",
+}
+
+
+def measure(target: str) -> Dict[str, float]:
+    """Cumulative import time in ms per module for one cold `import target`."""
+    env = {**PLACEHOLDER_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+
+    modules: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1000.0
+    return modules
+
+
+def check(modules: Dict[str, float], target: str, budget_ms: float) -> List[str]:
+    errors = []
+    total = modules.get(target, 0.0)
+    if total > budget_ms:
+        errors.append(f"import {target} took {total:.0f} ms (budget {budget_ms:.0f} ms)")
+    for name in DEFERRED_MODULES:
+        if name in modules:
+            errors.append(f"{name} is imported at startup ({modules[name]:.0f} ms)")
+    return errors
+
+
+def slowest(modules: Dict[str, float], n: int = 15) -> List[Tuple[str, float]]:
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="main", help="module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N cold imports")
+    parser.add_argument("--report", type=Path, help="write per-module timings (ms) as JSON")
+    args = parser.parse_args()
+
+    runs = [measure(args.target) for _ in range(max(1, args.runs))]
+    modules = min(runs, key=lambda run: run.get(args.target, 0.0))
+
+    print(f"import {args.target}: {modules.get(args.target, 0.0):.0f} ms (best of {len(runs)})")
+    for name, ms in slowest(modules):
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(dict(sorted(modules.items())), indent=2))
+        print(f"Wrote {args.report}")
+
+    errors = check(modules, args.target, args.budget_ms)
+    for error in errors:
+        print(f"FAIL: {error}")
+    if not errors:
+        print("Import budget OK")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
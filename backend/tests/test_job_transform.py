@@ -0,0 +1,173 @@
+"""
+Tests for dataIngestion/JobTransform.py. The pandas transform ingestion used
+before (scripts/benchmark_job_transform.py:legacy_transform) is the oracle for
+the cleaning rules.
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(BACKEND / "scripts"))
+
+from benchmark_job_transform import assert_equivalent, legacy_transform, synthetic_items  # noqa: E402
+from dataIngestion.JobTransform import (  # noqa: E402
+    COMPANY_SCHEMA,
+    JOB_SCHEMA,
+    transform_companies,
+    transform_jobs,
+    transform_page,
+)
+
+
+def _item(**fields):
+    # Apify items carry every field (null when absent), which legacy_transform relies on
+    item = {name: None for name in JOB_SCHEMA.names if name != "skill_tags"}
+    item.update({
+        "job_id": "1",
+        "job_title": "Backend Engineer",
+        "description": "Python and Kubernetes",
+        "skills": ["Python"],
+        "benefits": [],
+        "job_insights": [],
+        "company": "Acme",
+        "company_url": "https://www.linkedin.com/company/acme",
+        "company_urn": "100",
+        "created_at_epoch": 1,
+    })
+    item.update(fields)
+    return item
+
+
+def _column(batch, name):
+    return batch.column(name).to_pylist()
+
+
+def test_matches_legacy_pandas_transform():
+    items = synthetic_items(0, 2000)
+    batch = transform_jobs(items)
+    assert batch.schema == JOB_SCHEMA
+    assert_equivalent(legacy_transform(items), batch.to_pandas())
+
+
+def test_list_columns_join_and_handle_nulls():
+    items = [
+        _item(job_id="1", skills=["Python", None, "SQL"]),
+        _item(job_id="2", skills=None, benefits=["401(k)"], job_insights=None),
+        _item(job_id="3", skills=[], benefits=[None]),
+    ]
+    batch = transform_jobs(items, tag_skills=False)
+    assert _column(batch, "skills") == ["Python, , SQL", "", ""]
+    assert _column(batch, "benefits") == ["", "401(k)", ""]
+    assert _column(batch, "job_insights") == ["", "", ""]
+
+
+def test_list_columns_fall_back_for_non_list_values():
+    items = [_item(job_id="1", skills="Python, Go"), _item(job_id="2", skills=["Rust", "C"])]
+    batch = transform_jobs(items, tag_skills=False)
+    assert _column(batch, "skills") == ["Python, Go", "Rust, C"]
+    assert _column(batch, "skills") == legacy_transform(items, tag_skills=False)["skills"].tolist()
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([12, "34", "n/a", None, "7.9", " 5 ", "1e3", ""], [12, 34, 0, 0, 7, 5, 1000, 0]),
+        ([1.5, float("nan"), None, 3], [1, 0, 0, 3]),
+        (["10", "oops", "-2"], [10, 0, -2]),
+        ([None, None], [0, 0]),
+    ],
+)
+def test_int_columns_coerce_like_pandas(values, expected):
+    items = [_item(job_id=str(i), applicant_count=value) for i, value in enumerate(values)]
+    batch = transform_jobs(items, tag_skills=False)
+    assert _column(batch, "applicant_count") == expected
+    assert _column(batch, "applicant_count") == legacy_transform(items, tag_skills=False)["applicant_count"].tolist()
+
+
+def test_timestamp_columns_parse_iso_naive_and_garbage():
+    items = [
+        _item(job_id="1", posted_at="2025-10-01T12:00:00.000Z"),
+        _item(job_id="2", posted_at="2025-10-01T14:00:00+02:00"),
+        _item(job_id="3", posted_at="2025-10-02"),
+        _item(job_id="4", posted_at="2025-10-02 08:30:00"),
+        _item(job_id="5", posted_at="not a date"),
+        _item(job_id="6", posted_at=None),
+        _item(job_id="7", posted_at=""),
+    ]
+    batch = transform_jobs(items, tag_skills=False)
+    assert batch.schema.field("posted_at").type == JOB_SCHEMA.field("posted_at").type
+    assert _column(batch, "posted_at") == [
+        datetime(2025, 10, 1, 12, tzinfo=timezone.utc),
+        datetime(2025, 10, 1, 12, tzinfo=timezone.utc),
+        datetime(2025, 10, 2, tzinfo=timezone.utc),
+        datetime(2025, 10, 2, 8, 30, tzinfo=timezone.utc),
+        None,
+        None,
+        None,
+    ]
+
+
+def test_uniform_timestamps_match_legacy():
+    items = [
+        _item(job_id=str(i), posted_at=value)
+        for i, value in enumerate(["2025-10-01T12:00:00.000Z", "garbage", None, "2025-10-03T00:00:00.000Z"])
+    ]
+    assert_equivalent(legacy_transform(items), transform_jobs(items).to_pandas())
+
+
+def test_rows_without_job_id_or_company_urn_are_dropped():
+    items = [
+        _item(job_id="1", company_urn="100"),
+        _item(job_id="", company_urn="100"),
+        _item(job_id="   ", company_urn="100"),
+        _item(job_id=None, company_urn="100"),
+        _item(job_id="5", company_urn=""),
+        _item(job_id="6", company_urn=None),
+        _item(job_id="7", company_urn=" 200 "),
+    ]
+    batch = transform_jobs(items, tag_skills=False)
+    assert _column(batch, "job_id") == ["1", "7"]
+    # Every column is filtered by the same mask
+    assert _column(batch, "company_urn") == ["100", " 200 "]
+    assert all(len(column) == 2 for column in batch.columns)
+
+
+def test_skill_tags_use_title_skills_and_description():
+    items = [_item(job_title="Golang Engineer", skills=["k8s"], description="Terraform on AWS")]
+    tags = _column(transform_jobs(items), "skill_tags")[0]
+    assert set(tags) == {"go", "kubernetes", "terraform", "aws"}
+    assert _column(transform_jobs(items, tag_skills=False), "skill_tags") == [[]]
+
+
+def test_companies_are_deduplicated_within_and_across_pages():
+    seen = set()
+    first = transform_companies(
+        [
+            _item(company_urn="100", company="Acme"),
+            _item(company_urn="100", company="Acme duplicate"),
+            _item(company_urn="", company="No urn"),
+            _item(company_urn="200", company="Globex"),
+        ],
+        seen,
+    )
+    assert first.schema == COMPANY_SCHEMA
+    assert _column(first, "company_urn") == ["100", "200"]
+    assert _column(first, "company") == ["Acme", "Globex"]
+
+    second = transform_companies([_item(company_urn="200"), _item(company_urn="300", company="Initech")], seen)
+    assert _column(second, "company_urn") == ["300"]
+    assert seen == {"100", "200", "300"}
+
+
+def test_transform_page_handles_empty_pages():
+    companies, jobs = transform_page([], set())
+    assert companies.num_rows == 0 and jobs.num_rows == 0
+    assert jobs.schema == JOB_SCHEMA
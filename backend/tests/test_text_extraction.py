@@ -0,0 +1,67 @@
+"""
+Tests for app/services/text_extraction.py: a timed-out extraction must not
+fail the other extractions running on the same worker pool.
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+
+from app.services import text_extraction  # noqa: E402
+
+
+def _sleepy_extract(data: bytes, ext: str, max_chars: int) -> str:
+    # Runs in a spawned worker, so it must be importable from this module
+    time.sleep(float(data.decode().split(":")[1]))
+    return data.decode()
+
+
+@pytest.fixture
+def sleepy_pool(monkeypatch):
+    monkeypatch.setattr(text_extraction, "EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(text_extraction, "_extract", _sleepy_extract)
+    # Warm a pool so worker start-up does not count against the timeouts
+    assert text_extraction.extract_text(b"sleep:0", ".txt", timeout=60) == "sleep:0"
+    yield
+    pool = text_extraction._pool
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+    text_extraction._pool = None
+
+
+def test_timeout_only_fails_the_stuck_extraction(sleepy_pool):
+    stale = text_extraction._pool
+    with ThreadPoolExecutor(max_workers=2) as threads:
+        stuck = threads.submit(text_extraction.extract_text, b"sleep:30", ".txt", timeout=0.5)
+        running = threads.submit(text_extraction.extract_text, b"sleep:2", ".txt", timeout=30)
+        assert stuck.result() == ""
+        assert running.result() == "sleep:2"
+
+    # The stuck worker's pool is shut down once the other extraction finished
+    assert text_extraction._pool is not stale
+    deadline = time.monotonic() + 10
+    while any(p.is_alive() for p in (stale._processes or {}).values()) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not any(p.is_alive() for p in (stale._processes or {}).values())
+    assert stale not in text_extraction._retired
+    assert text_extraction.extract_text(b"sleep:0", ".txt", timeout=60) == "sleep:0"
+
+
+def test_async_timeout_only_fails_the_stuck_extraction(sleepy_pool):
+    async def both():
+        return await asyncio.gather(
+            text_extraction.aextract_text(b"sleep:30", ".txt", timeout=0.5),
+            text_extraction.aextract_text(b"sleep:2", ".txt", timeout=30),
+        )
+
+    assert asyncio.run(both()) == ["", "sleep:2"]
@@ -6,9 +6,8 @@ import "./App.css";
 
 import {
   uploadDocs,
-  startWorkflow,
-  getWorkflowStatus,
-  submitApplication
+  streamChat,
+  streamApplication
 } from "./api/jobcopilot.js";
 
 const generateMessageId = () => `${Date.now()}-${Math.random().toString(16).slice(2)}`;
@@ -38,19 +37,12 @@ function App() {
   const [preparedJobs, setPreparedJobs] = useState(new Set());
   const [appliedJobCards, setAppliedJobCards] = useState([]);
   const [isPreparingApplication, setIsPreparingApplication] = useState(false);
+  const [preparingPreview, setPreparingPreview] = useState("");
 
   const cvInputRef = useRef(null);
   const transcriptInputRef = useRef(null);
-  const typingTimers = useRef([]);
   const uploadedFilesRef = useRef([]);
 
-  useEffect(() => {
-    return () => {
-      typingTimers.current.forEach((timer) => clearInterval(timer));
-      typingTimers.current = [];
-    };
-  }, []);
-
   useEffect(() => {
     uploadedFilesRef.current = uploadedFiles;
   }, [uploadedFiles]);
@@ -108,37 +100,6 @@ function App() {
     return msg;
   };
 
-  const addAssistantMessageAnimated = (text) => {
-    const safeText = text || "I processed your request.";
-    const id = generateMessageId();
-    const typingMessage = { id, role: "assistant", content: "", typing: true };
-    setMessages((prev) => [...prev, typingMessage]);
-
-    let index = 0;
-    const interval = setInterval(() => {
-      index += 1;
-      setMessages((prev) =>
-        prev.map((msg) =>
-          msg.id === id
-            ? { ...msg, content: safeText.slice(0, index) }
-            : msg
-        )
-      );
-
-      if (index >= safeText.length) {
-        clearInterval(interval);
-        typingTimers.current = typingTimers.current.filter((t) => t !== interval);
-        setMessages((prev) =>
-          prev.map((msg) =>
-            msg.id === id ? { ...msg, typing: false, content: safeText } : msg
-          )
-        );
-      }
-    }, 15);
-
-    typingTimers.current.push(interval);
-  };
-
   const buildClientId = (job, idx = 0) => {
     return (
       job._clientId ||
@@ -212,67 +173,32 @@ function App() {
   };
 
 
-  const sendMessage = async (text) => {
-  if (!text.trim()) return;
-  pushMessage({ role: "user", content: text });
-  setIsSending(true);
-
-  try {
-    // 1. Start workflow
-    const start = await startWorkflow(text, language, profile);
-    if (!start.workflow_id) throw new Error("No workflow_id received");
-
-    // 2. Poll status until finished
-    let done = false;
-    let pollInterval = 1200;
-    let result = null;
-    let maxAttempts = 50; // 1 minute at 1200ms intervals
-    let attempts = 0;
-
-    while (!done && attempts < maxAttempts) {
-      attempts++;
-      const status = await getWorkflowStatus(start.workflow_id);
-
-      if (status.status === "completed") {
-        done = true;
-        result = status;
-      } else if (status.status === "failed") {
-        throw new Error("Workflow failed");
-      }
-
-      if (!done) {
-        await new Promise((res) => setTimeout(res, pollInterval));
-      }
-    }
-
-    if (attempts >= maxAttempts) {
-      throw new Error("Workflow timeout");
-    }
-
-    const analysisTask = result.tasks?.find(
-      (t) => t.task_id === "goal_understanding" || t.task_type === "analysis"
-    );
-    const jobTask = result.tasks?.find((t) => t.task_type === "job_search");
-    const rawJobMatches = jobTask?.output?.top_matches || [];
-    const jobMatches = rawJobMatches.map((job, idx) => ({
+  const toJobMatches = (rawJobs) =>
+    (rawJobs || []).map((job, idx) => ({
       ...job,
       _clientId: buildClientId(job, idx)
     }));
 
+  const showJobs = (jobMatches) => {
+    setJobs(jobMatches.filter((job) => !removedJobIds.has(job._clientId)));
+    setVisibleJobs(5);
+  };
+
+  const buildReply = (plan, jobMatches) => {
     const replySections = [];
 
-    const actions = analysisTask?.output?.actions;
+    const actions = plan?.actions;
     if (actions?.length) {
       const bullets = actions.map((action) => `• ${action}`).join("\n");
       replySections.push(`Suggested plan:\n${bullets}`);
     }
 
-    const notes = analysisTask?.output?.notes;
+    const notes = plan?.notes;
     if (notes) {
       replySections.push(notes);
     }
 
-    const insights = analysisTask?.output?.profile_insights;
+    const insights = plan?.profile_insights;
     if (insights?.headline) {
       replySections.push(`Profile: ${insights.headline}`);
     }
@@ -283,16 +209,6 @@ function App() {
       replySections.push(`Recent role: ${insights.recent_role}`);
     }
 
-    const insightSummary = analysisTask?.output?.insight_summary;
-    if (insightSummary?.skills?.length && !insights?.skills?.length) {
-      replySections.push(`Key skills: ${insightSummary.skills.join(", ")}`);
-    }
-    if (insightSummary?.recent_role && !insights?.recent_role) {
-      replySections.push(`Recent role: ${insightSummary.recent_role}`);
-    }
-
-    const jobSearchRan = jobTask?.output?.searched;
-
     if (jobMatches.length) {
       const sampleCount = Math.min(jobMatches.length, 5);
       const jobLines = jobMatches.slice(0, sampleCount).map((job) => {
@@ -306,49 +222,126 @@ function App() {
       if (jobMatches.length > sampleCount) {
         replySections.push(`Open the Matched Jobs panel to view ${jobMatches.length - sampleCount} more.`);
       }
-    } else if (jobSearchRan) {
+    } else if (plan?.searched_bigquery) {
       replySections.push("No strong matches yet. Try refining the goal or location.");
     }
 
+    if (!replySections.length && plan?.text) {
+      replySections.push(plan.text);
+    }
     if (!replySections.length) {
       replySections.push("I'm processing your request.");
     }
+    return replySections.join("\n\n");
+  };
 
-    addAssistantMessageAnimated(replySections.join("\n\n"));
-    const filteredJobs = jobMatches.filter((job) => !removedJobIds.has(job._clientId));
+  const updateMessage = (id, changes) => {
+    setMessages((prev) => prev.map((msg) => (msg.id === id ? { ...msg, ...changes } : msg)));
+  };
 
-    setJobs(filteredJobs);
-    setVisibleJobs(5);
+  const sendMessage = async (text) => {
+    if (!text.trim()) return;
+    pushMessage({ role: "user", content: text });
+    setIsSending(true);
 
-  } catch (err) {
-    console.error(err);
-    pushMessage({ role: "assistant", content: "Something went wrong." });
-  } finally {
-    setIsSending(false);
-  }
-};
+    // The plan is drafted live in this bubble and replaced by the summary once it is complete
+    const replyId = generateMessageId();
+    setMessages((prev) => [...prev, { id: replyId, role: "assistant", content: "", typing: true }]);
+    let draft = "";
+    let jobMatches = [];
+    let failed = false;
+
+    try {
+      await streamChat(
+        text,
+        {
+          token: (delta) => {
+            draft += delta;
+            updateMessage(replyId, { content: draft });
+          },
+          // Jobs arrive as soon as the search finishes, usually before the plan
+          jobs: (rawJobs) => {
+            jobMatches = toJobMatches(rawJobs);
+            showJobs(jobMatches);
+          },
+          plan: (result) => {
+            const plan = result?.plan || {};
+            if (plan.bigquery_jobs && !jobMatches.length) {
+              jobMatches = toJobMatches(plan.bigquery_jobs);
+              showJobs(jobMatches);
+            }
+            updateMessage(replyId, { content: buildReply(plan, jobMatches), typing: false });
+          },
+          error: (err) => {
+            failed = true;
+            console.error(err);
+            updateMessage(replyId, { content: "Something went wrong.", typing: false });
+          }
+        },
+        language
+      );
+    } catch (err) {
+      failed = true;
+      console.error(err);
+      updateMessage(replyId, { content: "Something went wrong.", typing: false });
+    } finally {
+      if (!failed) {
+        setMessages((prev) =>
+          prev.map((msg) =>
+            msg.id === replyId && msg.typing
+              ? { ...msg, typing: false, content: msg.content || "I processed your request." }
+              : msg
+          )
+        );
+      }
+      setIsSending(false);
+    }
+  };
 
   const handlePrepareJob = async (job) => {
     const jobKey = job._clientId || buildClientId(job);
     setIsPreparingApplication(true);
+    setPreparingPreview("");
+    const drafts = { resume: "", coverLetter: "" };
+    const docs = { resumePdf: null, coverPdf: null, textResume: "", textCover: "" };
+    let failure = null;
+
     try {
-      const response = await submitApplication(job);
+      await streamApplication(job, {
+        // Show the resume (then the cover letter) as it is written
+        resume_token: (delta) => {
+          drafts.resume += delta;
+          setPreparingPreview(drafts.resume);
+        },
+        cover_letter_token: (delta) => {
+          drafts.coverLetter += delta;
+          if (docs.textResume) setPreparingPreview(drafts.coverLetter);
+        },
+        resume: ({ text, pdf }) => {
+          docs.textResume = text || "";
+          docs.resumePdf = pdf || null;
+          setPreparingPreview(drafts.coverLetter);
+        },
+        cover_letter: ({ text, pdf }) => {
+          docs.textCover = text || "";
+          docs.coverPdf = pdf || null;
+        },
+        error: (err) => {
+          failure = new Error(err?.detail || "Document preparation failed.");
+        }
+      });
+      if (failure) throw failure;
 
       setGeneratedDocs({
-        cv: stripMarkdownFence(response.resume) || "",
-        coverLetter: stripMarkdownFence(response.cover_letter) || "",
-        cvPdf: response.resume_pdf || null,
-        coverPdf: response.cover_letter_pdf || null
+        cv: stripMarkdownFence(docs.textResume) || "",
+        coverLetter: stripMarkdownFence(docs.textCover) || "",
+        cvPdf: docs.resumePdf,
+        coverPdf: docs.coverPdf
       });
 
       setJobDocuments((prev) => ({
         ...prev,
-        [jobKey]: {
-          resumePdf: response.resume_pdf || null,
-          coverPdf: response.cover_letter_pdf || null,
-          textResume: response.resume || "",
-          textCover: response.cover_letter || ""
-        }
+        [jobKey]: docs
       }));
       setPreparedJobs((prev) => {
         const next = new Set(prev);
@@ -365,6 +358,7 @@ function App() {
       pushMessage({ role: "assistant", content: err.message || "Document preparation failed." });
     } finally {
       setIsPreparingApplication(false);
+      setPreparingPreview("");
     }
   };
 
@@ -575,7 +569,7 @@ const confirmApply = () => {
           onCancel={() => setShowConsent(false)}
         />
       )}
-      {isPreparingApplication && <PreparingModal />}
+      {isPreparingApplication && <PreparingModal preview={preparingPreview} />}
     </div>
   );
 }
@@ -596,7 +590,7 @@ function FeatureCard({ title, percent, color }) {
 
 export default App;
 
-function PreparingModal() {
+function PreparingModal({ preview }) {
   return (
     <div className="modal-backdrop preparing">
       <div className="preparing-modal">
@@ -606,6 +600,7 @@ function PreparingModal() {
           <span />
         </div>
         <p>Preparing your application…</p>
+        {preview && <pre className="preparing-preview">{preview.slice(-600)}</pre>}
       </div>
     </div>
   );
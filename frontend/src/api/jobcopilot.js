@@ -45,3 +45,54 @@ export async function submitApplication(job, userId = "demo-user") {
   if (!res.ok) throw new Error("Apply failed");
   return res.json();
 }
+
+// Reads a text/event-stream response and calls handlers[eventName](data) per event.
+async function readEventStream(res, handlers) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      const handler = handlers[event];
+      if (handler) handler(data ? JSON.parse(data) : null);
+    }
+  }
+}
+
+// Streaming chat: handlers.token(text), handlers.jobs(jobs), handlers.plan(result), handlers.error(err), handlers.done()
+export async function streamChat(message, handlers, language = "en", userId = "demo-user") {
+  const res = await fetch(`${API_BASE}/api/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ message, language, userId })
+  });
+  if (!res.ok) throw new Error("Chat failed");
+  await readEventStream(res, handlers);
+}
+
+// Streaming documents: handlers.resume_token(text), handlers.cover_letter_token(text),
+// handlers.resume({ text, pdf }), handlers.cover_letter({ text, pdf }), handlers.error(err), handlers.done()
+export async function streamApplication(job, handlers, userId = "demo-user") {
+  const res = await fetch(`${API_BASE}/api/apply/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ job, userId })
+  });
+  if (!res.ok) throw new Error("Apply failed");
+  await readEventStream(res, handlers);
+}